@@ -0,0 +1,448 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Benchmark the request pipeline
+
+This drives `Application` directly through its ASGI and WSGI interfaces
+with synthetic scopes and environs, so no server or network is involved
+and the numbers are just the cost of endpoints handling the request
+
+:example:
+    # run every benchmark and save the results
+    $ python -m benchmarks --output results.json
+
+    # after a change, compare against the saved results
+    $ python -m benchmarks --compare results.json
+"""
+import sys
+import io
+import json
+import time
+import asyncio
+import argparse
+import platform
+import statistics
+import logging
+from collections.abc import Iterable
+
+from endpoints import __version__, Application
+
+
+class Scenario(object):
+    """A request that will be made over and over"""
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        method: str = "GET",
+        body: bytes = b"",
+        headers: dict[str, str]|None = None,
+        code: int = 200,
+        interfaces: Iterable[str] = ("asgi", "wsgi"),
+    ):
+        """
+        :param name: the benchmark's name
+        :param path: the request path
+        :param method: the http method, "MESSAGE" sends the request as a
+            message over a websocket connection
+        :param body: the request body
+        :param headers: the request headers
+        :param code: the response code every request should have, this
+            makes sure the benchmark is measuring what it means to
+        :param interfaces: the interfaces the scenario runs on
+        """
+        self.name = name
+        self.path = path
+        self.method = method
+        self.body = body
+        self.headers = {"Host": "localhost:4000", **(headers or {})}
+        self.code = code
+        self.interfaces = list(interfaces)
+
+        if body:
+            self.headers["Content-Length"] = str(len(body))
+
+    def create_scope(self) -> dict:
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": self.method,
+            "scheme": "http",
+            "path": self.path,
+            "query_string": b"",
+            "server": ("localhost", 4000),
+            "client": ("127.0.0.1", 50000),
+            "headers": [
+                (k.lower().encode("latin-1"), v.encode("latin-1"))
+                for k, v in self.headers.items()
+            ],
+        }
+
+    def create_environ(self) -> dict:
+        environ = {
+            "REQUEST_METHOD": self.method,
+            "PATH_INFO": self.path,
+            "QUERY_STRING": "",
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "4000",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "REMOTE_ADDR": "127.0.0.1",
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(self.body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": False,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+
+        for k, v in self.headers.items():
+            k = k.upper().replace("-", "_")
+            if k in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                environ[k] = v
+
+            else:
+                environ[f"HTTP_{k}"] = v
+
+        return environ
+
+
+class MessageScenario(Scenario):
+    """A message sent over an already open websocket connection"""
+    def __init__(self, name, path, body=None, **kwargs):
+        kwargs.setdefault("interfaces", ["asgi"])
+        super().__init__(name, path, method="MESSAGE", **kwargs)
+        self.message_body = body
+
+    def create_scope(self) -> dict:
+        scope = super().create_scope()
+        scope["type"] = "websocket"
+        scope["scheme"] = "ws"
+        return scope
+
+    def create_message(self, application) -> dict:
+        return {
+            "type": "websocket.receive",
+            "text": application.get_websocket_dumps(
+                method="GET",
+                path=self.path,
+                body=self.message_body,
+            ).decode(),
+        }
+
+
+def json_body(body) -> bytes:
+    return json.dumps(body).encode()
+
+
+SCENARIOS = [
+    Scenario("routing.root", "/"),
+    Scenario("routing.path_param", "/users/123"),
+    Scenario("routing.not_found", "/foo/bar/che", code=404),
+    Scenario(
+        "body.json",
+        "/echo",
+        method="POST",
+        body=json_body({"foo": 1, "bar": "two", "che": [1, 2, 3]}),
+        headers={"Content-Type": "application/json"},
+    ),
+    Scenario(
+        "body.urlencoded",
+        "/echo",
+        method="POST",
+        body=b"foo=1&bar=two&che=3",
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    ),
+    Scenario(
+        "body.typed",
+        "/sum",
+        method="POST",
+        body=json_body({"values": list(range(50))}),
+        headers={"Content-Type": "application/json"},
+    ),
+    Scenario(
+        "decorators.stack",
+        "/decorated",
+        headers={"Authorization": "Bearer benchmark"},
+    ),
+    Scenario(
+        "decorators.denied",
+        "/decorated",
+        headers={"Authorization": "Bearer nope"},
+        code=401,
+    ),
+    Scenario("json.items", "/items"),
+    Scenario("errors.exception", "/error", code=500),
+    Scenario("errors.call_error", "/invalid", code=400),
+    MessageScenario("websocket.message", "/users/123"),
+]
+
+
+class Benchmark(object):
+    """Runs the scenarios and collects each request's latency"""
+    def __init__(self, application: Application, iterations, warmup):
+        self.application = application
+        self.iterations = iterations
+        self.warmup = warmup
+
+        # the interfaces are shared by all the scenarios, the WSGI interface
+        # can't be garbage collected while the ASGI event loop is running
+        self.asgi_interface = application.create_asgi_interface()
+        self.wsgi_interface = application.create_wsgi_interface()
+
+    def run(self, scenario: Scenario, interface_name: str) -> dict:
+        if interface_name == "asgi":
+            timings = asyncio.run(self.run_asgi(scenario))
+
+        else:
+            timings = self.run_wsgi(scenario)
+
+        return self.create_result(scenario, interface_name, timings)
+
+    async def run_asgi(self, scenario: Scenario) -> list[int]:
+        interface = self.asgi_interface
+        sent = []
+
+        async def send(d):
+            sent.append(d)
+
+        if isinstance(scenario, MessageScenario):
+            async def request():
+                await interface.handle_websocket_recv(
+                    scenario.create_message(self.application),
+                    scope=scope,
+                    receive=None,
+                    send=send,
+                )
+
+            def get_code():
+                d = self.application.get_websocket_loads(sent[-1]["bytes"])
+                return d["code"]
+
+        else:
+            async def request():
+                body = [scenario.body]
+                async def receive():
+                    return {
+                        "type": "http.request",
+                        "body": body.pop() if body else b"",
+                        "more_body": False,
+                    }
+
+                await interface(scope, receive, send)
+
+            def get_code():
+                return sent[0]["status"]
+
+        timings = []
+        for i in range(self.warmup + self.iterations):
+            scope = scenario.create_scope()
+            sent.clear()
+
+            start = time.perf_counter_ns()
+            await request()
+            stop = time.perf_counter_ns()
+
+            if i == 0:
+                self.check_code(scenario, "asgi", get_code())
+
+            if i >= self.warmup:
+                timings.append(stop - start)
+
+        return timings
+
+    def run_wsgi(self, scenario: Scenario) -> list[int]:
+        interface = self.wsgi_interface
+        started = []
+
+        def start_response(status, headers):
+            started.append(status)
+
+        timings = []
+        for i in range(self.warmup + self.iterations):
+            environ = scenario.create_environ()
+            started.clear()
+
+            start = time.perf_counter_ns()
+            chunks = interface(environ, start_response)
+            b"".join(chunks)
+            if close := getattr(chunks, "close", None):
+                close()
+            stop = time.perf_counter_ns()
+
+            if i == 0:
+                self.check_code(
+                    scenario,
+                    "wsgi",
+                    int(started[0].split(" ", 1)[0]),
+                )
+
+            if i >= self.warmup:
+                timings.append(stop - start)
+
+        return timings
+
+    def check_code(self, scenario, interface_name, code):
+        if code != scenario.code:
+            raise ValueError(
+                f"{scenario.name} ({interface_name}) responded with {code}"
+                f" instead of {scenario.code}"
+            )
+
+    def create_result(self, scenario, interface_name, timings) -> dict:
+        total = sum(timings)
+        timings.sort()
+        n = len(timings)
+        return {
+            "name": scenario.name,
+            "interface": interface_name,
+            "iterations": n,
+            "rps": n / (total / 1e9) if total else 0.0,
+            "mean_us": statistics.fmean(timings) / 1000,
+            "p50_us": timings[n // 2] / 1000,
+            "p99_us": timings[min(n - 1, int(n * 0.99))] / 1000,
+        }
+
+
+def compare(results, baseline, tolerance) -> list[dict]:
+    """Compare results to the baseline results
+
+    :returns: the results whose requests/sec dropped by more than tolerance
+    """
+    baseline = {(r["name"], r["interface"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        if b := baseline.get((r["name"], r["interface"])):
+            r["baseline_rps"] = b["rps"]
+            r["change"] = (r["rps"] - b["rps"]) / b["rps"]
+            if r["change"] < -tolerance:
+                regressions.append(r)
+
+    return regressions
+
+
+def print_results(results):
+    row = "{:<24} {:<6} {:>12} {:>10} {:>10} {:>10}"
+    print(row.format("name", "iface", "req/s", "mean us", "p50 us", "p99 us"))
+    for r in results:
+        line = row.format(
+            r["name"],
+            r["interface"],
+            f"{r['rps']:,.0f}",
+            f"{r['mean_us']:.1f}",
+            f"{r['p50_us']:.1f}",
+            f"{r['p99_us']:.1f}",
+        )
+        if "change" in r:
+            line += f" {r['change']:+.1%}"
+
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the endpoints request pipeline",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "--iterations", "-n",
+        type=int,
+        default=2000,
+        help="How many requests each benchmark makes",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=200,
+        help="How many requests are made before timing starts",
+    )
+    parser.add_argument(
+        "--filter", "-k",
+        dest="filters",
+        action="append",
+        default=[],
+        help="Only run benchmarks whose name starts with this",
+    )
+    parser.add_argument(
+        "--interface", "-i",
+        dest="interfaces",
+        action="append",
+        choices=["asgi", "wsgi"],
+        default=[],
+        help="Only run benchmarks on this interface",
+    )
+    parser.add_argument(
+        "--output", "-o",
+        help="Write the results as json to this path",
+    )
+    parser.add_argument(
+        "--compare", "-c",
+        help="A json results file to compare the results to",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help=(
+            "With --compare, exit with an error if any benchmark's req/s"
+            " drops by more than this fraction"
+        ),
+    )
+    parser.add_argument(
+        "--log-level",
+        default="CRITICAL",
+        help="The endpoints log level, logging is part of what is measured",
+    )
+    args = parser.parse_args()
+
+    logging.getLogger("endpoints").setLevel(args.log_level)
+
+    application = Application(controller_prefixes=["benchmarks.controllers"])
+    benchmark = Benchmark(application, args.iterations, args.warmup)
+
+    results = []
+    for scenario in SCENARIOS:
+        if args.filters and not any(
+            scenario.name.startswith(f) for f in args.filters
+        ):
+            continue
+
+        for interface_name in scenario.interfaces:
+            if args.interfaces and interface_name not in args.interfaces:
+                continue
+
+            results.append(benchmark.run(scenario, interface_name))
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as fp:
+            regressions = compare(results, json.load(fp), args.tolerance)
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(
+                {
+                    "endpoints": __version__,
+                    "python": platform.python_version(),
+                    "implementation": platform.python_implementation(),
+                    "platform": platform.platform(),
+                    "created": time.time(),
+                    "iterations": args.iterations,
+                    "results": results,
+                },
+                fp,
+                indent=2,
+            )
+
+    if regressions:
+        names = ", ".join(f"{r['name']} ({r['interface']})" for r in regressions)
+        print(f"Regressed more than {args.tolerance:.0%}: {names}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
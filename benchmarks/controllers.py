@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""The controllers the benchmarks make requests to, each controller
+exercises a different part of the request pipeline"""
+
+from endpoints import Controller, CallError
+from endpoints.decorators import (
+    RateLimitDecorator,
+    auth_bearer,
+    httpcache,
+)
+
+
+ITEMS = [
+    {
+        "id": i,
+        "name": f"item {i}",
+        "price": i * 1.5,
+        "tags": ["foo", "bar", "che"],
+        "active": bool(i % 2),
+    }
+    for i in range(100)
+]
+
+
+def check_token(controller, token):
+    return token == "benchmark"
+
+
+class ratelimit(RateLimitDecorator):
+    async def get_key(self, controller, method_args, method_kwargs):
+        return controller.request.get_auth_bearer()
+
+
+class Default(Controller):
+    async def GET(self):
+        return "hello world"
+
+
+class Users(Controller):
+    async def GET(self, user_id: int):
+        return {"id": user_id}
+
+
+class Echo(Controller):
+    async def POST(self, **kwargs):
+        return kwargs
+
+
+class Sum(Controller):
+    async def POST(self, values: list[int]):
+        return sum(values)
+
+
+class Decorated(Controller):
+    @auth_bearer(target=check_token)
+    @ratelimit(limit=1_000_000_000, ttl=3600)
+    @httpcache(60)
+    async def GET(self):
+        return "hello world"
+
+
+class Items(Controller):
+    async def GET(self):
+        return ITEMS
+
+
+class Error(Controller):
+    async def GET(self):
+        raise ValueError("benchmark error")
+
+
+class Invalid(Controller):
+    async def GET(self):
+        raise CallError(400, "benchmark bad request")
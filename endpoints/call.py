@@ -4,26 +4,18 @@ import inspect
 import re
 import io
 from collections import defaultdict
-from collections.abc import AsyncGenerator
-from types import NoneType, MappingProxyType
+from collections.abc import AsyncGenerator, AsyncIterator, Iterator
+from types import NoneType, MappingProxyType, MemberDescriptorType
 from typing import Annotated
 import json
 from functools import cached_property
 
-try:
-    import orjson
-
-except ImportError:
-    orjson = None
-
 from datatypes import (
     HTTPHeaders,
     NamingConvention,
     Dirpath,
-    ReflectType,
 )
 from datatypes.reflection import ReflectABC
-from datatypes.http import Multipart
 
 from .compat import *
 from .exception import (
@@ -41,14 +33,156 @@ from .utils import (
     Deepcopy,
     Url,
     Status,
-    JSONEncoder,
+    JSONCodec,
+    MultipartParser,
+    SpooledFile,
+    Compressor,
+)
+from .reflection.inspect import (
+    Pathfinder,
+    MediaTypeTable,
+    BodyDecoder,
 )
-from .reflection.inspect import Pathfinder
 
 
 logger = logging.getLogger(__name__)
 
 
+class RequestBody(object):
+    """An async file-like reader over a request body that is received in
+    chunks, interfaces can set an instance of this into `Request.body` so
+    the body is only read when the controller actually needs it
+
+    :example:
+        async def chunks():
+            yield b"foo"
+            yield b"bar"
+
+        body = RequestBody(chunks())
+        await body.read(4) # b"foob"
+        await body.read() # b"ar"
+    """
+    def __init__(
+        self,
+        chunks: AsyncIterator[bytes],
+        spool_size: int|None = None,
+        max_size: int|None = None,
+    ):
+        """
+        :param chunks: yields the body in chunks of bytes
+        :param spool_size: when the body is spooled, anything bigger than
+            this many bytes will spill to a temp file on disk, defaults to
+            `environ.REQUEST_BODY_SPOOL_SIZE`
+        :param max_size: a 413 error will be raised if the body is bigger
+            than this many bytes, defaults to
+            `environ.MAX_REQUEST_BODY_SIZE`, 0 means unlimited
+        """
+        self.chunks = aiter(chunks)
+        self.spool_size = (
+            environ.REQUEST_BODY_SPOOL_SIZE
+            if spool_size is None
+            else spool_size
+        )
+        self.max_size = (
+            environ.MAX_REQUEST_BODY_SIZE
+            if max_size is None
+            else max_size
+        )
+        self.buffer = bytearray()
+        self.consumed = False
+        self.length = 0
+
+    async def receive(self) -> bytes:
+        """Internal method. Receive the next non-empty chunk from `.chunks`
+        and make sure the body hasn't gotten too big
+
+        :returns: empty bytes if there are no more chunks
+        """
+        while not self.consumed:
+            try:
+                chunk = await anext(self.chunks)
+
+            except StopAsyncIteration:
+                self.consumed = True
+
+            else:
+                if chunk:
+                    self.length += len(chunk)
+                    if self.max_size and self.length > self.max_size:
+                        self.consumed = True
+                        break
+
+                    return chunk
+
+        if self.max_size and self.length > self.max_size:
+            raise CallError(
+                413,
+                f"Request body is bigger than {self.max_size} bytes",
+            )
+
+        return b""
+
+    async def readchunk(self) -> bytes:
+        """Read the next chunk of the body
+
+        :returns: empty bytes if the body has been completely read
+        """
+        if self.buffer:
+            chunk = bytes(self.buffer)
+            self.buffer.clear()
+
+        else:
+            chunk = await self.receive()
+
+        return chunk
+
+    async def read(self, size: int = -1) -> bytes:
+        """Read size bytes from the body, or the rest of the body if size is
+        negative
+
+        :param size: how many bytes to read
+        :returns: less than size bytes will be returned when the body has
+            been completely read
+        """
+        if size is None or size < 0:
+            chunks = [bytes(self.buffer)]
+            self.buffer.clear()
+            async for chunk in self:
+                chunks.append(chunk)
+
+            return b"".join(chunks)
+
+        else:
+            buffer = self.buffer
+            while len(buffer) < size:
+                if chunk := await self.receive():
+                    buffer.extend(chunk)
+
+                else:
+                    break
+
+            chunk = bytes(buffer[:size])
+            del buffer[:size]
+            return chunk
+
+    async def spool(self) -> io.IOBase:
+        """Read the rest of the body into a temp file that is only written to
+        disk if the body is bigger than `.spool_size`
+
+        :returns: the file pointer, it will be at the start of the file
+        """
+        fp = SpooledFile(max_size=self.spool_size)
+        async for chunk in self:
+            fp.write(chunk)
+
+        fp.seek(0)
+        return fp
+
+    async def __aiter__(self) -> AsyncGenerator[bytes]:
+        while chunk := await self.readchunk():
+            yield chunk
+
+
 class ETL(object):
     """Contains Extract, Transform, and Load methods that Controller uses
 
@@ -63,6 +197,45 @@ class ETL(object):
     methods defined in this class to translate it into something the
     Application can send back down to the client
     """
+    json_codec: JSONCodec|None = None
+    """The codec that dumps and loads json, see `.get_json_codec`"""
+
+    @classmethod
+    def create_json_codec(cls, **kwargs) -> JSONCodec:
+        """Create the json codec
+
+        :keyword json_codec_class: type[JSONCodec], defaults to the first
+            available codec in `environ.JSON_CODECS`
+        :returns: JSONCodec
+        """
+        codec_class = kwargs.pop("json_codec_class", None)
+        if codec_class is None:
+            codec_class = JSONCodec.find_class(environ.JSON_CODECS)
+
+        return codec_class(**kwargs)
+
+    @classmethod
+    def get_json_codec(cls) -> JSONCodec:
+        """Get the json codec, the codec is created the first time it is
+        needed and shared by all the controllers, set `.json_codec` on a
+        child class to give it its own codec (if it is set to None the
+        child class's codec is created the first time it is needed)
+
+        :example:
+            Controller.get_json_codec().register(Decimal, str)
+        """
+        codec = cls.json_codec
+        if codec is None:
+            codec = cls.create_json_codec()
+
+            # save the codec on the class that declared the None value
+            for klass in cls.__mro__:
+                if "json_codec" in klass.__dict__:
+                    klass.json_codec = codec
+                    break
+
+        return codec
+
     @classmethod
     def load_json(cls, body, **kwargs):
         """Internal method. Used by .decode_json and
@@ -72,11 +245,7 @@ class ETL(object):
         :param body: str|bytes
         :returns: str
         """
-        if orjson:
-            return orjson.loads(body)
-
-        else:
-            return json.loads(body)
+        return cls.get_json_codec().loads(body)
 
     @classmethod
     def decode_json(cls, headers: HTTPHeaders, body: bytes) -> object:
@@ -130,6 +299,79 @@ class ETL(object):
 
         return body
 
+    @classmethod
+    async def decode_stream(
+        cls,
+        headers: HTTPHeaders,
+        body: RequestBody,
+    ) -> bytes|io.IOBase:
+        """Read a streamed body
+
+        Bodies that will be parsed (eg, json) are read into memory, anything
+        that will be treated like a file is spooled so large bodies spill
+        to disk instead of being held in memory
+
+        :param headers: HTTPHeaders
+        :param body: RequestBody
+        :returns: the raw body or a file pointer at the start of the body
+        """
+        if (
+            headers.is_json()
+            or headers.is_urlencoded()
+            or headers.is_plain()
+        ):
+            return await body.read()
+
+        else:
+            return await body.spool()
+
+    @classmethod
+    async def decode_multipart(
+        cls,
+        headers: HTTPHeaders,
+        body: bytes|io.IOBase|RequestBody,
+        chunk_size: int = 65536,
+    ) -> list[tuple[HTTPHeaders, bytes|io.IOBase]]:
+        """Parse a multipart body as it is read, file parts are written to
+        spooled temp files instead of being held in memory
+
+        A multipart body has a content-type like:
+
+            multipart/form-data; boundary=...
+
+        :param headers: HTTPHeaders
+        :param body: the raw body, if it is a file pointer then
+            Content-Length bytes will be read from it
+        :param chunk_size: how many bytes to read at a time from a file
+            pointer
+        :returns: the headers and body of each part
+        :raises: CallError 400 if the body is malformed (eg, truncated)
+        """
+        try:
+            parser = MultipartParser.from_headers(headers)
+
+            if isinstance(body, RequestBody):
+                async for chunk in body:
+                    parser.feed(chunk)
+
+            elif isinstance(body, io.IOBase):
+                length = int(headers.get("Content-Length", -1) or -1)
+                while length > 0:
+                    chunk = body.read(min(chunk_size, length))
+                    if not chunk:
+                        break
+
+                    length -= len(chunk)
+                    parser.feed(chunk)
+
+            elif body:
+                parser.feed(body)
+
+            return parser.close()
+
+        except ValueError as e:
+            raise CallError(400, String(e)) from e
+
     @classmethod
     def decode_form_data(cls, headers: HTTPHeaders, body: bytes) -> Mapping:
         value, params = headers.parse("Content-Disposition")
@@ -145,13 +387,22 @@ class ETL(object):
             }
 
     @classmethod
-    def decode_attachment(cls, headers: HTTPHeaders, body: bytes) -> Mapping:
+    def decode_attachment(
+        cls,
+        headers: HTTPHeaders,
+        body: bytes|io.IOBase,
+    ) -> Mapping:
         value, params = headers.parse("Content-Disposition")
-        fp = io.BytesIO(body)
+        if isinstance(body, io.IOBase):
+            fp = body
+
+        else:
+            fp = io.BytesIO(body)
 
         if "filename" in params:
             fp.filename = params["filename"]
-            fp.name = params["filename"]
+            if isinstance(fp, io.BytesIO):
+                fp.name = params["filename"]
 
         if "name" in params:
             #d[params["name"]] = fp
@@ -167,9 +418,12 @@ class ETL(object):
         cls,
         body: io.IOBase,
         encoding: str|None = None,
+        chunk_size: int|None = None,
     ) -> AsyncGenerator[bytes]:
         """Internal method called when response body is a file
 
+        :param chunk_size: how many bytes to read from the file at a time,
+            defaults to `environ.FILE_CHUNK_SIZE`
         :returns: generator[bytes], a generator that yields bytes strings
         """
         if body.closed:
@@ -177,9 +431,11 @@ class ETL(object):
                 "cannot read streaming body because pointer is closed"
             )
 
+        chunk_size = chunk_size or environ.FILE_CHUNK_SIZE
+
         try:
             while True:
-                chunk = body.read(8192)
+                chunk = body.read(chunk_size)
                 if chunk:
                     if not isinstance(chunk, bytes):
                         chunk = bytes(chunk, encoding)
@@ -199,34 +455,22 @@ class ETL(object):
         place to customize json dumping
 
         :param body: Any, it just has to be json encodable
-        :keyword json_encoder: Optional[JSONEncoder]
+        :keyword json_encoder: Optional[JSONEncoder], if passed in then
+            python's builtin json will dump body with this encoder instead
+            of using the json codec
         :keyword encoding: Optional[str], defaults to `environ.ENCODING` 
             because python's builtin json makes everything ascii by default so
             the encoding used for encoding text to bytes doesn't really matter
         :returns: bytes
         """
-        json_encoder = kwargs.get("json_encoder", JSONEncoder)
-
-        if orjson:
-            # https://github.com/ijl/orjson
-            # Evidently keys can't be child classes of str either unless this
-            # option is set. From the docs:
-            #    "raises JSONEncodeError if a dict has a key of a type
-            #    other than str, unless OPT_NON_STR_KEYS is specified"
-            encoder = json_encoder()
-
-            return orjson.dumps(
-                body,
-                option=orjson.OPT_NON_STR_KEYS,
-                default=encoder.default,
-            )
-
-        else:
+        if json_encoder := kwargs.get("json_encoder", None):
             return bytes(
                 json.dumps(body, cls=json_encoder),
                 kwargs.get("encoding", environ.ENCODING)
             )
 
+        return cls.get_json_codec().dumps(body)
+
     @classmethod
     async def encode_json(cls, body) -> AsyncGenerator[bytes]:
         """Internal method called when response body should be dumped to
@@ -236,6 +480,123 @@ class ETL(object):
         """
         yield cls.dump_json(body)
 
+    @classmethod
+    async def iterate_body(
+        cls,
+        body: Iterator|AsyncIterator,
+    ) -> AsyncGenerator:
+        """Internal method. Yields the items of a (async) generator or
+        iterator body as they are produced"""
+        if isinstance(body, AsyncIterator):
+            async for item in body:
+                yield item
+
+        else:
+            for item in body:
+                yield item
+
+    @classmethod
+    async def encode_iterator(
+        cls,
+        body: Iterator|AsyncIterator,
+        encoding: str|None = None,
+    ) -> AsyncGenerator[bytes]:
+        """Internal method called when response body is a (async) generator
+        or iterator that isn't json, each item is encoded and sent as it is
+        produced"""
+        async for item in cls.iterate_body(body):
+            if isinstance(item, (bytes, bytearray, memoryview)):
+                chunk = bytes(item)
+
+            else:
+                chunk = String(item, encoding=encoding).encode()
+
+            if chunk:
+                yield chunk
+
+    @classmethod
+    async def encode_json_iterator(
+        cls,
+        body: Iterator|AsyncIterator,
+    ) -> AsyncGenerator[bytes]:
+        """Internal method called when response body is a (async) generator
+        or iterator that should be dumped to json, the body is sent as a
+        json array with each item dumped as it is produced
+
+        :returns: generator[bytes], a generator that yields bytes strings
+        """
+        prefix = b"["
+        async for item in cls.iterate_body(body):
+            # the separator is sent with the item so nothing is sent until
+            # the first item is successfully produced
+            yield prefix + cls.dump_json(item)
+            prefix = b","
+
+        yield b"[]" if prefix == b"[" else b"]"
+
+    @classmethod
+    async def encode_ndjson(
+        cls,
+        body: Iterator|AsyncIterator,
+    ) -> AsyncGenerator[bytes]:
+        """Internal method called when response body is a (async) generator
+        or iterator and the response is newline delimited json, each item
+        is dumped to json on its own line as it is produced
+
+        https://github.com/ndjson/ndjson-spec
+
+        :returns: generator[bytes], a generator that yields bytes strings
+        """
+        async for item in cls.iterate_body(body):
+            yield cls.dump_json(item) + b"\n"
+
+    @classmethod
+    async def encode_compressed(
+        cls,
+        chunks: AsyncIterator[bytes],
+        response: "Response",
+    ) -> AsyncGenerator[bytes]:
+        """Internal method called when the encoded body chunks should be
+        compressed
+
+        Chunks are held until there are at least `.min_size` bytes, so the
+        Content-Encoding header can still be left off of small bodies since
+        the headers aren't sent until the first chunk is yielded
+
+        :param chunks: the encoded body
+        :param response: the response with a `.compressor`
+        :returns: generator[bytes], a generator that yields bytes strings
+        """
+        compressor = response.compressor
+        # streamed bodies are flushed each chunk so the client gets each
+        # item as it is produced
+        flush = response.is_iterator()
+        buffer = []
+        size = 0
+
+        async for chunk in chunks:
+            if buffer is not None:
+                buffer.append(chunk)
+                size += len(chunk)
+                if size < compressor.min_size:
+                    continue
+
+                response.headers["Content-Encoding"] = compressor.encoding
+                response.headers.pop("Content-Length", None)
+                chunk = b"".join(buffer)
+                buffer = None
+
+            if chunk := compressor.compress(chunk, flush=flush):
+                yield chunk
+
+        if buffer is None:
+            if chunk := compressor.flush():
+                yield chunk
+
+        elif buffer:
+            # the body was too small to compress
+            yield b"".join(buffer)
+
     @classmethod
     async def encode_value(
         cls,
@@ -485,10 +846,32 @@ class Controller(ETL):
             (NoneType, kwargs.get("none_media_type", handle_nonetype)),
             (Exception, kwargs.get("exception_media_type", media_type)),
             (io.IOBase, kwargs.get("file_media_type", handle_file)),
+            (
+                (Iterator, AsyncIterator),
+                kwargs.get("iterator_media_type", media_type),
+            ),
             # this is the catch-all since everything is an object
             (object, kwargs.get("any_media_type", media_type))
         ]
 
+    @classmethod
+    def get_media_type_table(cls) -> MediaTypeTable:
+        """Get the table that maps response bodies to their media types for
+        requests that don't have an http method, this is usually an error
+        response
+
+        The table is created the first time it is needed and then saved on
+        the class
+
+        :returns: MediaTypeTable, built from `.get_response_media_types`
+        """
+        table = cls.__dict__.get("_media_type_table", None)
+        if table is None:
+            table = MediaTypeTable([], cls.get_response_media_types())
+            cls._media_type_table = table
+
+        return table
+
     def __init__(self, request, response, **kwargs):
         self.request = request
         self.response = response
@@ -539,30 +922,23 @@ class Controller(ETL):
 
         :returns: tuple[Iterable[Any, ...], Mapping[str, Any]]
         """
-        method_args = []
-        method_kwargs = {}
-
-        ras = self.request.reflect_method.reflect_arguments(
-            *self.request.positionals,
-            **self.request.keywords,
+        request = self.request
+        binder = request.reflect_method.get_argument_binder()
+        return binder.bind(
+            request.positionals,
+            request.keywords,
+            request.body_typed_keywords,
         )
 
-        for ra in ras:
-            if ra.has_multiple_values():
-                # method call is going to fail anyway so short-circuit
-                # processing
-                method_args = self.request.positionals
-                method_kwargs = self.request.keywords
-                break
-
-            else:
-                if ra.is_positional():
-                    method_args.extend(ra.get_positional_values())
-
-                elif ra.is_keyword():
-                    method_kwargs.update(ra.get_keyword_values())
+    def get_body_decoder(self) -> BodyDecoder|None:
+        """Get the decoder that converts a json body straight into the
+        http method's param types
 
-        return method_args, method_kwargs
+        :returns: None unless `environ.TYPED_REQUEST_BODY` is on
+        """
+        if environ.TYPED_REQUEST_BODY:
+            if rm := self.request.reflect_method:
+                return rm.get_body_decoder()
 
     async def _update_request(self):
         """Internal method. Called by `.handle` to get the request ready
@@ -571,6 +947,7 @@ class Controller(ETL):
 
         body_positionals = request.body_positionals or []
         body_keywords = request.body_keywords or {}
+        body_typed_keywords = request.body_typed_keywords or set()
 
 #         if request.body_positionals:
 #             body_positionals.extend(request.body_positionals)
@@ -584,21 +961,33 @@ class Controller(ETL):
                 request.query,
             )
 
-        if request.headers.is_chunked():
-            raise IOError("Chunked bodies are not supported")
+        if max_size := environ.MAX_REQUEST_BODY_SIZE:
+            # chunked bodies don't have a length so they are checked as
+            # they are read by RequestBody
+            length = int(request.headers.get("Content-Length", 0) or 0)
+            if length > max_size:
+                raise CallError(
+                    413,
+                    f"Request body is bigger than {max_size} bytes",
+                )
 
         body = request.body
 
-        if isinstance(request.body, io.IOBase):
-            body = self.decode_io(request.headers, body)
-
         bodies = []
-        if body:
-            if request.headers.is_multipart():
-                body = Multipart.decode(request.headers, body)
-                bodies = ((p.headers, p.body) for p in body)
+        if (
+            request.headers.is_multipart()
+            and isinstance(body, (bytes, io.IOBase, RequestBody))
+        ):
+            bodies = await self.decode_multipart(request.headers, body)
 
-            else:
+        else:
+            if isinstance(body, io.IOBase):
+                body = self.decode_io(request.headers, body)
+
+            elif isinstance(body, RequestBody):
+                body = await self.decode_stream(request.headers, body)
+
+            if body:
                 bodies.append((request.headers, body))
 
         for headers, body in bodies:
@@ -612,6 +1001,9 @@ class Controller(ETL):
                 jb = self.decode_json(headers, body)
 
                 if isinstance(jb, dict):
+                    if body_decoder := self.get_body_decoder():
+                        body_typed_keywords.update(body_decoder.decode(jb))
+
                     body_keywords.update(jb)
 
                 elif isinstance(jb, list):
@@ -635,13 +1027,14 @@ class Controller(ETL):
                 # treat anything else like a file
                 d = self.decode_attachment(headers, body)
                 if len(d) == 1 and "" in d:
-                    body_positionals.append(fp)
+                    body_positionals.append(d[""])
 
                 else:
                     body_keywords.update(d)
 
         request.body_positionals = body_positionals
         request.body_keywords = body_keywords
+        request.body_typed_keywords = body_typed_keywords
 
         request.positionals, request.keywords = await self.get_request_params()
 
@@ -659,11 +1052,28 @@ class Controller(ETL):
             `.response` and pulls any request information directly
             from `.request`
         """
+        timer = self.request.timer
+
         try:
+            if timer:
+                start = timer.start()
+
             await self._update_request()
+
+            if timer:
+                timer.stop("decode", start)
+
             method = self._get_handler_method()
+
+            if timer:
+                start = timer.start()
+
             method_args, method_kwargs = await self.get_method_params()
 
+            if timer:
+                timer.stop("bind", start)
+                start = timer.start()
+
             # we pull the method from self because rm is unbounded since it
             # was created from the reflect Controller class and not the
             # reflected instance
@@ -672,11 +1082,20 @@ class Controller(ETL):
             while inspect.iscoroutine(body):
                 body = await body
 
+            if timer:
+                timer.stop("handler", start)
+
             self.response.body = body
 
         except Exception as e:
+            if timer:
+                start = timer.start()
+
             await self.handle_error(e)
 
+            if timer:
+                timer.stop("error", start)
+
         else:
             await self._update_response()
 
@@ -705,6 +1124,8 @@ class Controller(ETL):
         # or a success code with an error body
         response.body = e
         response.code = 500
+        # wrappers were added for the success body
+        response.chunk_wrappers = None
 
         if isinstance(e, CloseConnection):
             raise
@@ -786,7 +1207,14 @@ class Controller(ETL):
         request = self.request
         response = self.response
 
+        if timer := request.timer:
+            start = timer.start()
+
         response.media_type = await self.get_response_media_type(response.body)
+
+        if timer:
+            timer.stop("media_type", start)
+
         response.body = await self.get_response_body(response.body)
 
         if response.code is None:
@@ -818,6 +1246,76 @@ class Controller(ETL):
             else:
                 response.headers["Content-Type"] = response.media_type
 
+        response.compressor = await self.get_response_compressor()
+
+    async def get_response_compressor(self) -> Compressor|None:
+        """Decide if the response body should be compressed
+
+        Compression is on for every response if `environ.COMPRESS_RESPONSE`
+        is True, or for responses that have `Response.compression` set,
+        which is what the `compress` decorator does
+
+        :returns: the compressor that will compress the body as it is sent
+            to the client, or None if the body shouldn't be compressed
+        """
+        request = self.request
+        response = self.response
+
+        options = response.compression
+        if options is None:
+            if not environ.COMPRESS_RESPONSE:
+                return None
+
+            options = {}
+
+        if (
+            not response.has_body()
+            or response.code < 200
+            or response.code in (204, 304)
+            or "Content-Encoding" in response.headers
+        ):
+            return None
+
+        media_types = options.get("media_types", None)
+        if media_types is None:
+            media_types = environ.COMPRESS_MEDIA_TYPES.split(",")
+
+        if not Compressor.is_compressible(response.media_type, media_types):
+            return None
+
+        # the response can be different depending on what the client accepts
+        # so caches need to know that
+        if vary := response.headers.get("Vary", ""):
+            if "accept-encoding" not in vary.lower():
+                response.headers["Vary"] = f"{vary}, Accept-Encoding"
+
+        else:
+            response.headers["Vary"] = "Accept-Encoding"
+
+        min_size = options.get("min_size", None)
+        if min_size is None:
+            min_size = environ.COMPRESS_MIN_SIZE
+
+        length = int(response.headers.get("Content-Length", -1) or -1)
+        if 0 <= length < min_size:
+            return None
+
+        encodings = options.get("encodings", None)
+        if encodings is None:
+            encodings = environ.COMPRESS_ENCODINGS.split(",")
+
+        compressor_class = Compressor.find_class(
+            request.headers.get("Accept-Encoding", ""),
+            encodings,
+        )
+        if compressor_class:
+            return compressor_class(
+                level=options.get("level", None),
+                min_size=min_size,
+            )
+
+        return None
+
     async def get_response_media_type(self, body) -> str|None:
         """Get the media type for this response based on `body`
 
@@ -828,31 +1326,20 @@ class Controller(ETL):
         media_type = self.response.media_type
         if not media_type:
             if rm := self.request.reflect_method:
-                info = rm.get_method_info()
-                for t in info.get("response_media_types", []):
-                    body_object_type, body_media_type = t
-                    rt = ReflectType(body_object_type)
-                    if rt.is_type(body):
-                        if callable(body_media_type):
-                            body_media_type(self.response)
-                            media_type = self.response.media_type
-
-                        else:
-                            media_type = body_media_type
+                table = rm.get_media_type_table()
 
-                        break
+            else:
+                table = self.get_media_type_table()
 
-        if not media_type:
-            for t in self.get_response_media_types():
-                body_object_type, body_media_type = t
-                if isinstance(body, body_object_type):
-                    if callable(body_media_type):
-                        body_media_type(self.response)
-                        media_type = self.response.media_type
+            for body_media_type in table.get(body):
+                if callable(body_media_type):
+                    body_media_type(self.response)
+                    media_type = self.response.media_type
 
-                    else:
-                        media_type = body_media_type
+                else:
+                    media_type = body_media_type
 
+                if media_type:
                     break
 
         return media_type
@@ -884,6 +1371,19 @@ class Controller(ETL):
                         response.encoding,
                     )
 
+                elif response.is_iterator():
+                    if response.is_ndjson():
+                        chunks = self.encode_ndjson(response.body)
+
+                    elif response.is_json():
+                        chunks = self.encode_json_iterator(response.body)
+
+                    else:
+                        chunks = self.encode_iterator(
+                            response.body,
+                            response.encoding,
+                        )
+
                 elif response.is_json():
                     chunks = self.encode_json(response.body)
 
@@ -893,6 +1393,16 @@ class Controller(ETL):
                         response.encoding,
                     )
 
+                if response.chunk_wrappers:
+                    for wrapper in response.chunk_wrappers:
+                        chunks = wrapper(chunks)
+
+                if response.compressor:
+                    chunks = self.encode_compressed(chunks, response)
+
+                if timer := request.timer:
+                    chunks = timer.time_chunks("encode", chunks)
+
                 async for chunk in chunks:
                     yield chunk
 
@@ -1031,13 +1541,80 @@ class TRACEMixin(object):
 
 
 class Call(object):
-    headers_class = HTTPHeaders
+    """Base class for the request and response
 
-    body = None
-    """Any, Holds the body for this instance"""
+    The attributes every instance has are declared in `__slots__`, these are
+    the attributes `.reset` puts back so an instance can be reused (see
+    `utils.ObjectPool`). `__dict__` is kept for cached properties and
+    anything interfaces or controllers set, so instances aren't any smaller
+    than a normal instance would be
+    """
+    __slots__ = {
+        "headers": "HTTPHeaders, Holds the headers for this instance",
+        "body": "Any, Holds the body for this instance",
+        "__dict__": "Holds cached properties and any other attributes",
+        "__weakref__": "Allows weak references to instances",
+    }
+
+    headers_class = HTTPHeaders
 
     def __init__(self):
-        self.headers = self.create_headers()
+        self.reset()
+
+    def reset(self):
+        """Set the instance back to how it was when it was created so it
+        can be reused for another request
+
+        Every attribute declared in `__slots__` (other than the headers) is
+        set back to its class value, so a child class can give any of them
+        a default (eg, `code = 201`), and the value is None otherwise. Child
+        classes that add other attributes should reset them here
+        """
+        self.__dict__.clear()
+
+        klass = type(self)
+        for name in self.get_slot_names():
+            value = getattr(klass, name, None)
+            if isinstance(value, MemberDescriptorType):
+                # the slot itself, no class has given it a value
+                value = None
+
+            setattr(self, name, value)
+
+        try:
+            headers = self.headers
+
+        except AttributeError:
+            self.headers = self.create_headers()
+
+        else:
+            if isinstance(headers, HTTPHeaders):
+                # HTTPHeaders is a wsgiref Headers, which holds the headers
+                # in this list, so we can reuse the instance
+                headers._headers = []
+
+            else:
+                self.headers = self.create_headers()
+
+    @classmethod
+    def get_slot_names(cls) -> list[str]:
+        """Returns the names of all the attributes that are declared in the
+        `__slots__` of this class and its parents that `.reset` sets"""
+        try:
+            # we check the class's own __dict__ so a child class doesn't use
+            # its parent's cached names
+            return cls.__dict__["_slot_names"]
+
+        except KeyError:
+            skip = set(["__dict__", "__weakref__", "headers"])
+            names = []
+            for klass in reversed(cls.__mro__):
+                for name in klass.__dict__.get("__slots__", ()):
+                    if name not in skip and name not in names:
+                        names.append(name)
+
+            cls._slot_names = names
+            return names
 
     def create_headers(self, **kwargs) -> HTTPHeaders:
         return self.headers_class()
@@ -1070,43 +1647,34 @@ class Request(Call):
         * query_kwargs -- tied to query, the values in query but converted to a
             dict {name: val}
     '''
-    method: str|None = None
-    """the http method (GET, POST)"""
-
-    pathfinder_node: Mapping|None = None
-    """Readonly. Holds the requested pathfinder node"""
-
-    body: bytes|io.IOBase|None = None
-    """Holds the raw body"""
-
-    body_positionals: Sequence|None = None
-    """Holds the body positionals pulled from `.body`"""
-
-    body_keywords: Mapping|None = None
-    """Holds the body keywords that were pulled out of `.body`"""
-
-    query: str|None = None
-    """Holds the raw query (everything after the ? in the url)"""
-
-    query_keywords: Mapping|None = None
-    """Holds the body keywords that were pulled out of `.query`"""
-
-    path: str|None = None
-    """Holds the full path"""
-
-    path_positionals: Sequence|None = None
-    """Holds any path parts after the controller path"""
-
-    positionals: Sequence|None = None
-    """Holds the positionals for the request that will be used as the base
-    for each HTTP method that is called while trying to answer the request"""
-
-    keywords: Mapping|None = None
-    """Holds the keywords for the request that will be used as the base
-    for each HTTP method that is called while trying to answer the request"""
-
-    protocol: str|None = None
-    """The HTTP protocol (eg, HTTP/1.1)"""
+    __slots__ = {
+        "method": "str|None, the http method (GET, POST)",
+        "pathfinder_node": "Mapping|None, Readonly. Holds the requested"
+            " pathfinder node",
+        "body_positionals": "Sequence|None, Holds the body positionals"
+            " pulled from `.body`",
+        "body_keywords": "Mapping|None, Holds the body keywords that were"
+            " pulled out of `.body`",
+        "body_typed_keywords": "set[str]|None, Holds the names of the body"
+            " keywords that were decoded straight into their param's type,"
+            " see `environ.TYPED_REQUEST_BODY`",
+        "query": "str|None, Holds the raw query (everything after the ? in"
+            " the url)",
+        "query_keywords": "Mapping|None, Holds the body keywords that were"
+            " pulled out of `.query`",
+        "path": "str|None, Holds the full path",
+        "path_positionals": "Sequence|None, Holds any path parts after the"
+            " controller path",
+        "positionals": "Sequence|None, Holds the positionals for the request"
+            " that will be used as the base for each HTTP method that is"
+            " called while trying to answer the request",
+        "keywords": "Mapping|None, Holds the keywords for the request that"
+            " will be used as the base for each HTTP method that is called"
+            " while trying to answer the request",
+        "protocol": "str|None, The HTTP protocol (eg, HTTP/1.1)",
+        "timer": "Timer|None, Times each stage of handling the request,"
+            " this is only set if the application has a collector",
+    }
 
     @property
     def pathfinder_value(self) -> Mapping|None:
@@ -1155,6 +1723,11 @@ class Request(Call):
 
         return uuid or ""
 
+    @cached_property
+    def accept_header(self) -> AcceptHeader:
+        """The parsed Accept header"""
+        return AcceptHeader.get_instance(self.headers.get("accept", ""))
+
     @cached_property
     def accept_media_type(self) -> str:
         """Return the requested media type
@@ -1166,18 +1739,31 @@ class Request(Call):
             media type has no wildcards
         """
         v = ""
-        accept_header = self.headers.get("accept", "")
-        if accept_header:
-            a = AcceptHeader(accept_header)
-            for mt in a:
-                # we only care about the first value, and only if it has no
-                # wildcards
-                if "*" not in mt[0]:
-                    v = "/".join(mt[0])
-                break
+        for mt in self.accept_header:
+            # we only care about the first value, and only if it has no
+            # wildcards
+            if "*" not in mt[0]:
+                v = "/".join(mt[0])
+            break
 
         return v
 
+    def negotiate_media_type(self, media_types=None) -> str:
+        """Choose the response media type the client prefers
+
+        :param media_types: Iterable[str], the media types the response
+            could be sent as in order of preference, defaults to the media
+            types the requested http method declared
+        :returns: str, the best media type, empty if the client doesn't
+            accept any of them
+        """
+        if media_types is None:
+            media_types = []
+            if rm := self.reflect_method:
+                media_types = rm.get_media_type_table().media_type_names
+
+        return self.accept_header.negotiate(media_types)
+
     @cached_property
     def response_encoding(self) -> str:
         """The encoding the client requested the response to use
@@ -1316,9 +1902,6 @@ class Request(Call):
 
         return uri
 
-    def __init__(self):
-        super().__init__()
-
     def version(self, content_type="*/*"):
         """by default, versioning is based off of this post 
         http://urthen.github.io/2013/05/09/ways-to-version-your-api/
@@ -1334,13 +1917,10 @@ class Request(Call):
         :returns: str, the found version
         """
         v = ""
-        accept_header = self.headers.get("accept", "")
-        if accept_header:
-            a = AcceptHeader(accept_header)
-            for mt in a.filter(content_type):
-                v = mt[2].get("version", "")
-                if v:
-                    break
+        for mt in self.accept_header.filter(content_type):
+            v = mt[2].get("version", "")
+            if v:
+                break
 
         return v
 
@@ -1440,16 +2020,41 @@ class Response(Call):
     an instance of this class is used to create the text response that will be
     sent back to the client
     """
-    encoding = None
-
-    code = None
-    """the http status code to return to the client"""
-
-    media_type = None
-    """Set this to the media type to return to the client"""
+    __slots__ = {
+        "encoding": "str|None, the encoding of the body",
+        "code": "int|None, the http status code to return to the client",
+        "media_type": "str|None, Set this to the media type to return to"
+            " the client",
+        "compression": "Mapping|None, Compression options (eg, min_size,"
+            " media_types, encodings, level), if this is set then the body"
+            " will be compressed if the client accepts it, see the compress"
+            " decorator",
+        "compressor": "Compressor|None, The negotiated Compressor instance"
+            " that will compress the body",
+        "chunk_wrappers": "list[Callable]|None, Each callable is passed the"
+            " encoded body chunks and returns the chunks that will be sent,"
+            " see `.add_chunk_wrapper`",
+    }
+
+    def add_chunk_wrapper(
+        self,
+        wrapper: Callable[[AsyncIterator[bytes]], AsyncIterator[bytes]],
+    ) -> None:
+        """Add a wrapper around the encoded body chunks, this lets
+        decorators see (or change) the body as it is sent to the client
+
+        Wrappers are called in the order they were added and see the body
+        before it is compressed. The headers aren't sent until the first
+        chunk is produced so a wrapper can still change them until it
+        yields its first chunk
+
+        :param wrapper: passed the encoded body chunks, returns the chunks
+            that will be sent
+        """
+        if self.chunk_wrappers is None:
+            self.chunk_wrappers = []
 
-    body = None
-    """The body that will be returned to the client"""
+        self.chunk_wrappers.append(wrapper)
 
     @property
     def status_code(self):
@@ -1475,6 +2080,39 @@ class Response(Call):
         """Return True if the response body is a binary file"""
         return self.is_file() and not isinstance(self.body, io.TextIOBase)
 
+    def get_file_path(self) -> str:
+        """Return the filesystem path of the response body if the body is a
+        binary file that can be sent to the client straight from disk
+
+        :returns: the absolute path, or empty string if the body isn't a
+            file on disk, or some of it has already been read
+        """
+        if self.is_binary_file() and not self.body.closed:
+            path = getattr(self.body, "name", None)
+            if isinstance(path, str) and os.path.isfile(path):
+                try:
+                    if self.body.tell() == 0:
+                        return os.path.abspath(path)
+
+                except (OSError, ValueError):
+                    pass
+
+        return ""
+
+    def is_iterator(self):
+        """Return True if the response body is a (async) generator or
+        iterator whose items should be sent to the client as they are
+        produced"""
+        return (
+            isinstance(self.body, (Iterator, AsyncIterator))
+            and not self.is_file()
+        )
+
+    def is_ndjson(self):
+        """Return True if the response is newline delimited json"""
+        ct = self.headers.get("Content-Type", "")
+        return "ndjson" in ct or "jsonl" in ct
+
     def is_success(self):
         """return True if this response is considered a "successful" response
         """
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+from datatypes import Boolean
 from datatypes.config import (
     Environ,
 )
@@ -21,6 +22,11 @@ class Environ(Environ):
         # the primary request media type a controller will expect
         self.setdefault("REQUEST_MEDIA_TYPE", "application/json")
 
+        # the json codecs in order of preference, the first one whose
+        # library is installed is used, available codecs are orjson,
+        # msgspec, and json (python's builtin json module)
+        self.setdefault("JSON_CODECS", "orjson,json")
+
         # The host string, usually just domain or domain:port, this is used by
         # the server classes and also the tests
         self.setdefault("HOST", "")
@@ -31,6 +37,88 @@ class Environ(Environ):
         # the name of the autodiscover module name
         self.setdefault("AUTODISCOVER_NAME", "controllers")
 
+        # how many (method, path) resolutions Application will remember, 0
+        # turns the route cache off
+        self.setdefault("ROUTE_CACHE_SIZE", 1000, type=int)
+
+        # how many parsed Accept headers AcceptHeader.get_instance will
+        # remember, 0 turns the cache off
+        self.setdefault("ACCEPT_HEADER_CACHE_SIZE", 256, type=int)
+
+        # how many released request and response instances each interface
+        # will hold onto so they can be reused, 0 turns pooling off.
+        # Instances are reset and reused once their response is sent, so
+        # nothing should keep a reference to them after that
+        self.setdefault("CALL_POOL_SIZE", 0, type=int)
+
+        # if True then the ASGI interface won't read the request body before
+        # handling the request, Request.body will be a RequestBody instance
+        # that the controller reads as needed
+        self.setdefault("STREAM_REQUEST_BODY", False, type=Boolean)
+
+        # spooled request bodies bigger than this many bytes spill to a temp
+        # file on disk
+        self.setdefault("REQUEST_BODY_SPOOL_SIZE", 1024 * 1024, type=int)
+
+        # if True then json request bodies are decoded straight into the
+        # types the http method's params are annotated with (eg,
+        # dataclasses, TypedDicts, list[int])
+        self.setdefault("TYPED_REQUEST_BODY", False, type=Boolean)
+
+        # request bodies bigger than this many bytes will fail with a 413,
+        # 0 means there is no limit
+        self.setdefault("MAX_REQUEST_BODY_SIZE", 0, type=int)
+
+        # if True then the WSGI interface sends the response body as the
+        # controller produces it instead of collecting the whole body first
+        self.setdefault("WSGI_STREAM_RESPONSE_BODY", False, type=Boolean)
+
+        # how many bytes of a file response body are read and sent at a time
+        self.setdefault("FILE_CHUNK_SIZE", 256 * 1024, type=int)
+
+        # if True then response bodies will be compressed when the client
+        # accepts a supported encoding, the compress decorator can turn
+        # on compression for individual controller methods
+        self.setdefault("COMPRESS_RESPONSE", False, type=Boolean)
+
+        # response bodies smaller than this many bytes aren't compressed
+        self.setdefault("COMPRESS_MIN_SIZE", 1024, type=int)
+
+        # the encodings the server will compress with, in order of
+        # preference, encodings whose libraries aren't installed are skipped
+        self.setdefault("COMPRESS_ENCODINGS", "br,zstd,gzip")
+
+        # only response bodies with these media types will be compressed
+        self.setdefault(
+            "COMPRESS_MEDIA_TYPES",
+            ",".join([
+                "text/*",
+                "application/json",
+                "application/*+json",
+                "application/x-ndjson",
+                "application/javascript",
+                "application/xml",
+                "application/*+xml",
+                "image/svg+xml",
+            ]),
+        )
+
+        # the algorithm rate limit decorators use by default, available
+        # algorithms are fixed, sliding, token_bucket, and gcra
+        self.setdefault("RATELIMIT_ALGORITHM", "fixed")
+
+        # roughly how many bytes of memory the rate limit decorators' keys
+        # can use in each process
+        self.setdefault("RATELIMIT_MEMORY_SIZE", 16 * 1024 * 1024, type=int)
+
+        # how many responses the shared responsecache decorator store will
+        # hold, 0 means there is no limit on the count
+        self.setdefault("RESPONSE_CACHE_SIZE", 1000, type=int)
+
+        # how many bytes of response bodies the shared responsecache
+        # decorator store will hold, 0 means there is no limit on the size
+        self.setdefault("RESPONSE_CACHE_BYTES", 64 * 1024 * 1024, type=int)
+
     def set_host(self, host):
         self.set("HOST", host)
 
@@ -16,6 +16,8 @@ from .auth import (
 
 from .call import (
     httpcache,
+    responsecache,
     nohttpcache,
+    compress,
 )
 
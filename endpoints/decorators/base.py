@@ -74,7 +74,14 @@ class ControllerDecorator(Decorator):
         """
         self.definition(*args, **kwargs)
 
+        stage = f"decorator.{type(self).__name__}"
+
         async def decorated(controller, *method_args, **method_kwargs):
+            # decorators can be used outside of controllers
+            request = getattr(controller, "request", None)
+            if timer := getattr(request, "timer", None):
+                start = timer.start()
+
             decorator_params, method_params = await self.get_params(
                 controller,
                 method_args,
@@ -87,6 +94,9 @@ class ControllerDecorator(Decorator):
                 decorator_params[1],
             )
 
+            if timer:
+                timer.stop(stage, start)
+
             return await self.handle_method(
                 method,
                 controller,
@@ -1,7 +1,17 @@
 # -*- coding: utf-8 -*-
+import io
+import os
+import time
+import datetime
+import hashlib
+import inspect
+import email.utils
+from urllib.parse import parse_qsl
 
 from ..compat import *
+from ..config import environ
 from ..exception import CallError
+from ..utils import CachedResponse, ResponseCache
 from .base import ControllerDecorator
 
 
@@ -9,22 +19,499 @@ class httpcache(ControllerDecorator):
     """
     sets the cache headers so the response can be cached by the client
 
-    https://developers.google.com/web/fundamentals/performance/optimizing-content-efficiency/http-caching
+    With etag the response gets an ETag header and GET and HEAD requests
+    whose If-None-Match or If-Modified-Since headers show the client
+    already has the response are answered with a 304 and no body
+
+    If etag is True the ETag is a hash of the encoded body (or the size and
+    modification time of a file body), so the controller method is still
+    called but the body isn't sent. Streamed (iterator) bodies don't get an
+    ETag
+
+    If etag or last_modified are callables they are called with the same
+    arguments as the controller method and return a cheap version of the
+    response (eg, a row's updated timestamp), and if the client already has
+    that version the controller method isn't called at all
+
+    :example:
+        class Default(Controller):
+            @httpcache(60, etag=True)
+            async def GET(self):
+                return {"big": "json"}
 
+        def get_version(controller, user_id):
+            return get_user(user_id).updated
+
+        class Users(Controller):
+            @httpcache(60, etag=get_version)
+            async def GET(self, user_id: int):
+                return get_user(user_id).to_json()
+
+    https://developers.google.com/web/fundamentals/performance/optimizing-content-efficiency/http-caching
+    https://www.rfc-editor.org/rfc/rfc9110#section-13
     """
-    def definition(self, ttl: int, **kwargs):
+    methods = ("GET", "HEAD")
+    """The http methods that can be answered with a 304"""
+
+    def definition(
+        self,
+        ttl: int,
+        etag: bool|Callable = False,
+        last_modified: Callable|None = None,
+        **kwargs,
+    ):
         """
         :param ttl: how many seconds to have the client cache the request
+        :param etag: True to hash the body, or a callable that returns the
+            version of the response, the version can be any value and it
+            is hashed into the ETag
+        :param last_modified: a callable that returns when the response
+            last changed, this is sent as the Last-Modified header
         """
         self.ttl = int(ttl)
+        self.etag = etag
+        self.last_modified = last_modified
         super().definition(**kwargs)
 
-    async def handle(self, controller, **kwargs):
+    async def handle(self, controller, *args, **kwargs):
         controller.response.headers.update({
             "Cache-Control": "max-age={}".format(self.ttl),
         })
-        # TODO -- figure out how to set ETag
-        #if not self.response.has_header('ETag')
+
+    async def handle_method(
+        self,
+        method,
+        controller,
+        method_args,
+        method_kwargs,
+    ):
+        request = controller.request
+        response = controller.response
+        conditional = request.method in self.methods
+
+        if callable(self.etag) or self.last_modified:
+            if callable(self.etag):
+                version = self.etag(controller, *method_args, **method_kwargs)
+                while inspect.iscoroutine(version):
+                    version = await version
+
+                if version is not None:
+                    response.headers["ETag"] = self.create_etag(
+                        String(version).encode(),
+                    )
+
+            if self.last_modified:
+                modified = self.last_modified(
+                    controller,
+                    *method_args,
+                    **method_kwargs,
+                )
+                while inspect.iscoroutine(modified):
+                    modified = await modified
+
+                if modified is not None:
+                    response.headers["Last-Modified"] = (
+                        self.format_datetime(modified)
+                    )
+
+            if conditional and self.is_not_modified(request, response):
+                response.code = 304
+                return None
+
+        body = await super().handle_method(
+            method,
+            controller,
+            method_args,
+            method_kwargs,
+        )
+
+        if self.etag is True and "ETag" not in response.headers:
+            path = getattr(body, "name", None)
+            if (
+                isinstance(body, io.IOBase)
+                and isinstance(path, str)
+                and os.path.isfile(path)
+            ):
+                # files use their size and modification time so they don't
+                # have to be read
+                stat = os.stat(path)
+                response.headers["ETag"] = "\"{:x}-{:x}\"".format(
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                )
+                response.headers["Last-Modified"] = self.format_datetime(
+                    datetime.datetime.fromtimestamp(
+                        stat.st_mtime,
+                        datetime.timezone.utc,
+                    )
+                )
+
+                if conditional and self.is_not_modified(request, response):
+                    body.close()
+                    response.code = 304
+                    return None
+
+            elif conditional:
+                response.add_chunk_wrapper(
+                    lambda chunks: self.etag_chunks(controller, chunks)
+                )
+
+        return body
+
+    async def etag_chunks(self, controller, chunks):
+        """Response chunk wrapper that hashes the body into the ETag and
+        drops the body if the client already has it
+
+        The whole body is read before the first chunk is yielded because
+        the headers are sent with the first chunk, most bodies are only
+        one chunk anyway
+        """
+        response = controller.response
+        if response.code != 200 or response.is_iterator():
+            async for chunk in chunks:
+                yield chunk
+
+            return
+
+        body = [chunk async for chunk in chunks]
+        etag = self.create_etag(*body)
+        if response.compressor:
+            # the compressed bytes are different but they are
+            # semantically the same
+            etag = "W/" + etag
+
+        response.headers["ETag"] = etag
+
+        if self.is_not_modified(controller.request, response):
+            response.code = 304
+            response.headers.pop("Content-Length", None)
+
+        else:
+            for chunk in body:
+                yield chunk
+
+    def create_etag(self, *chunks: bytes) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        for chunk in chunks:
+            h.update(chunk)
+
+        return "\"{}\"".format(h.hexdigest())
+
+    def format_datetime(self, dt: datetime.datetime) -> str:
+        """Format dt as an http date, naive datetimes are treated as UTC"""
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=datetime.timezone.utc)
+
+        return email.utils.format_datetime(
+            dt.astimezone(datetime.timezone.utc),
+            usegmt=True,
+        )
+
+    def is_not_modified(self, request, response) -> bool:
+        """True if the request's conditional headers show the client
+        already has the response
+
+        If-Modified-Since is only checked when there isn't an
+        If-None-Match header
+
+        https://www.rfc-editor.org/rfc/rfc9110#section-13.2.2
+        """
+        if if_none_match := request.headers.get("If-None-Match", ""):
+            if etag := response.headers.get("ETag", ""):
+                if if_none_match.strip() == "*":
+                    return True
+
+                # If-None-Match uses the weak comparison
+                etag = etag.removeprefix("W/")
+                for tag in if_none_match.split(","):
+                    if tag.strip().removeprefix("W/") == etag:
+                        return True
+
+            return False
+
+        if if_modified_since := request.headers.get("If-Modified-Since", ""):
+            if last_modified := response.headers.get("Last-Modified", ""):
+                try:
+                    since = email.utils.parsedate_to_datetime(
+                        if_modified_since
+                    )
+                    modified = email.utils.parsedate_to_datetime(
+                        last_modified
+                    )
+
+                except (TypeError, ValueError):
+                    return False
+
+                if since.tzinfo is None:
+                    since = since.replace(tzinfo=datetime.timezone.utc)
+
+                return modified <= since
+
+        return False
+
+
+class responsecache(ControllerDecorator):
+    """
+    caches the encoded response on the server so identical requests are
+    answered without calling the controller method
+
+    Responses are cached by method, path, query, and the values of the
+    vary headers. Only GET and HEAD requests are cached, and only responses
+    with one of the codes that don't set cookies or have a no-store or
+    private Cache-Control header. Streamed (iterator) bodies aren't cached
+
+    The body is cached before it is compressed, so one cached response can
+    be compressed for each client's Accept-Encoding
+
+    Once a response is stale (older than ttl) the next request refreshes
+    it while every other request is sent the stale response, until the
+    response is older than ttl + stale
+
+    Decorators below this decorator only run when the response isn't
+    cached, so decorators that need to run on every request (eg, auth or
+    compress) should be above it. Only the headers that the method and the
+    decorators below this one set are cached, so headers set by the
+    decorators above it (eg, RateLimit headers) are always for the current
+    request
+
+    The vary headers are sent in a Vary header so downstream caches key
+    the responses the same way
+
+    :example:
+        class Default(Controller):
+            @auth_bearer(target=check_token)
+            @responsecache(60, stale=30, vary=["Authorization"])
+            async def GET(self):
+                ...
+    """
+    store: ResponseCache|None = None
+    """The cache all the responsecache decorators share, it is created the
+    first time it is needed using `environ.RESPONSE_CACHE_SIZE` and
+    `environ.RESPONSE_CACHE_BYTES`"""
+
+    methods = ("GET", "HEAD")
+    """The http methods that can be cached"""
+
+    def definition(
+        self,
+        ttl: int,
+        stale: int = 0,
+        vary: Sequence[str]|None = None,
+        codes: Sequence[int] = (200,),
+        store: ResponseCache|None = None,
+        **kwargs,
+    ):
+        """
+        :param ttl: how many seconds the response is fresh
+        :param stale: how many seconds after ttl a stale response is sent
+            while it is refreshed
+        :param vary: the names of the request headers whose values are part
+            of the cache key (eg, ["Accept", "Authorization"])
+        :param codes: the response codes that can be cached
+        :param store: the cache to use instead of the shared `.store`
+        """
+        self.ttl = int(ttl)
+        self.stale = int(stale)
+        self.vary_names = list(vary or [])
+        self.vary = [name.lower() for name in self.vary_names]
+        self.codes = set(codes)
+        if store is not None:
+            self.store = store
+
+        super().definition(**kwargs)
+
+    def get_store(self) -> ResponseCache:
+        store = self.store
+        if store is None:
+            store = ResponseCache(
+                environ.RESPONSE_CACHE_SIZE,
+                environ.RESPONSE_CACHE_BYTES,
+            )
+            responsecache.store = store
+
+        return store
+
+    def get_key(self, controller) -> tuple|None:
+        """Returns the cache key of the request, or None if the request
+        can't be cached"""
+        request = controller.request
+        if request.method not in self.methods:
+            return None
+
+        if request.scheme in ("ws", "wss"):
+            # websocket messages send the body without encoding it
+            return None
+
+        query = tuple(sorted(
+            parse_qsl(String(request.query or ""), keep_blank_values=True)
+        ))
+
+        return (
+            request.method,
+            request.path,
+            query,
+            tuple(request.headers.get(name, "") for name in self.vary),
+        )
+
+    def set_vary(self, response) -> None:
+        """Add the vary header names to the response's Vary header"""
+        if not self.vary_names:
+            return
+
+        headers = response.headers
+        if vary := headers.get("Vary", ""):
+            varied = set(name.strip().lower() for name in vary.split(","))
+            names = [n for n in self.vary_names if n.lower() not in varied]
+            if names:
+                headers["Vary"] = ", ".join([vary, *names])
+
+        else:
+            headers["Vary"] = ", ".join(self.vary_names)
+
+    def get_header_values(self, response) -> dict[str, list[str]]:
+        """Returns the values of each of the response's headers keyed by
+        the lowercase header name"""
+        values = {}
+        for name, value in response.headers.items():
+            values.setdefault(name.lower(), []).append(value)
+        return values
+
+    def is_cacheable(self, response) -> bool:
+        """True if the response can be cached"""
+        if response.code not in self.codes or response.is_iterator():
+            return False
+
+        if "Set-Cookie" in response.headers:
+            return False
+
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        return (
+            "no-store" not in cache_control
+            and "private" not in cache_control
+        )
+
+    async def handle_method(
+        self,
+        method,
+        controller,
+        method_args,
+        method_kwargs,
+    ):
+        key = self.get_key(controller)
+        if key is None:
+            return await super().handle_method(
+                method,
+                controller,
+                method_args,
+                method_kwargs,
+            )
+
+        self.set_vary(controller.response)
+
+        store = self.get_store()
+        now = time.monotonic()
+        cached = store.get(key)
+        if cached:
+            if cached.is_fresh(now):
+                return self.get_cached_body(controller, cached, now)
+
+            elif cached.is_stale(now):
+                if cached.revalidating:
+                    return self.get_cached_body(controller, cached, now)
+
+                # this request will refresh the response
+                cached.revalidating = True
+
+            else:
+                cached = None
+
+        # only the headers that are set after this are cached, the headers
+        # already set are for this request only
+        before = self.get_header_values(controller.response)
+        controller.response.add_chunk_wrapper(
+            lambda chunks: self.cache_chunks(
+                controller,
+                key,
+                cached,
+                before,
+                chunks,
+            )
+        )
+
+        try:
+            return await super().handle_method(
+                method,
+                controller,
+                method_args,
+                method_kwargs,
+            )
+
+        except Exception:
+            if cached:
+                cached.revalidating = False
+            raise
+
+    def get_cached_body(self, controller, cached, now) -> io.BytesIO:
+        """Set the cached response into the controller's response, the
+        returned body is sent without being encoded again"""
+        response = controller.response
+        response.code = cached.code
+        response.media_type = cached.media_type
+
+        headers = response.headers
+        for name in set(name for name, _ in cached.headers):
+            headers.pop(name, None)
+
+        for name, value in cached.headers:
+            headers.add_header(name, value)
+
+        headers["Content-Length"] = len(cached.body)
+        headers["Age"] = cached.get_age(now)
+        return io.BytesIO(cached.body)
+
+    async def cache_chunks(self, controller, key, cached, before, chunks):
+        """Response chunk wrapper that saves the encoded body once all of
+        it has been produced
+
+        :param cached: the stale response this request is refreshing
+        :param before: the header values before the method was called (see
+            `.get_header_values`), only headers that were added or changed
+            since then are cached
+        """
+        response = controller.response
+        # the headers are saved before compression changes them
+        values = self.get_header_values(response)
+        headers = [
+            (name, value)
+            for name, value in response.headers.items()
+            if name.lower() not in (
+                "content-length",
+                "content-encoding",
+                "age",
+            )
+            and values[name.lower()] != before.get(name.lower())
+        ]
+        body = []
+
+        async for chunk in chunks:
+            body.append(chunk)
+            yield chunk
+
+        if self.is_cacheable(response):
+            self.get_store().set(
+                key,
+                CachedResponse(
+                    response.code,
+                    headers,
+                    response.media_type,
+                    b"".join(body),
+                    ttl=self.ttl,
+                    stale=self.stale,
+                ),
+            )
+
+        elif cached:
+            cached.revalidating = False
 
 
 class nohttpcache(ControllerDecorator):
@@ -41,3 +528,41 @@ class nohttpcache(ControllerDecorator):
         })
 
 
+class compress(ControllerDecorator):
+    """
+    compress the response body if the client accepts one of the supported
+    encodings, this is for when you don't want to turn on compression for
+    every response with `ENDPOINTS_COMPRESS_RESPONSE`
+
+    any option that isn't passed in will use its `ENDPOINTS_COMPRESS_*`
+    environment setting
+
+    https://developer.mozilla.org/en-US/docs/Web/HTTP/Compression
+    """
+    def definition(
+        self,
+        min_size: int|None = None,
+        media_types: Sequence[str]|None = None,
+        encodings: Sequence[str]|None = None,
+        level: int|None = None,
+        **kwargs,
+    ):
+        """
+        :param min_size: bodies smaller than this many bytes won't be
+            compressed
+        :param media_types: patterns (eg, "text/*") of the media types that
+            will be compressed
+        :param encodings: the encodings to use, in order of preference (eg,
+            ["br", "gzip"])
+        :param level: the compression level
+        """
+        self.compression = {
+            "min_size": min_size,
+            "media_types": media_types,
+            "encodings": encodings,
+            "level": level,
+        }
+        super().definition(**kwargs)
+
+    async def handle(self, controller, *args, **kwargs):
+        controller.response.compression = self.compression
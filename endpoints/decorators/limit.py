@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
+import math
 import logging
 
-from datatypes import Pool, Datetime
-
 from ..compat import *
+from ..config import environ
 from ..exception import CallError
+from ..ratelimit import (
+    RateLimitStore,
+    MemoryStore,
+    RateLimitAlgorithm,
+)
 from ..utils import String
 from .base import ControllerDecorator
 
@@ -19,7 +24,22 @@ class RateLimitDecorator(ControllerDecorator):
     Child decorators should override `.get_key` and/or `.is_valid` to provide
     custom functionality
     """
-    def definition(self, limit=0, ttl=0, *args, **kwargs):
+    store: RateLimitStore|None = None
+    """Holds the rate limit state of each key, it is created with
+    `.create_store` the first time it is needed and shared by all the
+    decorators of the class. Set this to a `SharedMemoryStore` or
+    `SQLiteStore` to share the limits between processes"""
+
+    def definition(
+        self,
+        limit=0,
+        ttl=0,
+        *args,
+        store=None,
+        algorithm=None,
+        burst=None,
+        **kwargs,
+    ):
         """The definition of the decorator, this is called from the decorator's
         __init__ method and is responsible for validating the passed in
         arguments for the decorator
@@ -27,12 +47,45 @@ class RateLimitDecorator(ControllerDecorator):
         :param limit: int, max requests that can be received in ttl
         :param ttl: int, how many seconds the request should be throttled
             (eg, 3600 = 1 hour)
+        :param store: RateLimitStore, the store to use instead of `.store`
+        :param algorithm: str|type[RateLimitAlgorithm], the algorithm or
+            its name (eg, "gcra"), defaults to
+            `environ.RATELIMIT_ALGORITHM`
+        :param burst: int, how many requests can be made at once with the
+            token_bucket and gcra algorithms, defaults to limit
         """
         self.limit = int(limit)
         self.ttl = int(ttl)
+        if store is not None:
+            self.store = store
+
+        self.algorithm_class = algorithm
+        self.burst = burst
+        self.algorithm = self.create_algorithm(self.limit, self.ttl)
 
         super().definition(*args, **kwargs)
 
+    def create_algorithm(self, limit, ttl) -> RateLimitAlgorithm:
+        algorithm_class = self.algorithm_class
+        if algorithm_class is None:
+            algorithm_class = environ.RATELIMIT_ALGORITHM
+
+        if isinstance(algorithm_class, str):
+            algorithm_class = RateLimitAlgorithm.find_class(algorithm_class)
+
+        return algorithm_class(limit, ttl, burst=self.burst)
+
+    def create_store(self) -> RateLimitStore:
+        return MemoryStore()
+
+    def get_store(self) -> RateLimitStore:
+        store = self.store
+        if store is None:
+            store = self.create_store()
+            type(self).store = store
+
+        return store
+
     async def get_key(self, controller, method_args, method_kwargs) -> str:
         """Decide what key this request should have to decide about rate
         limiting
@@ -48,36 +101,48 @@ class RateLimitDecorator(ControllerDecorator):
 
     async def is_valid(self, controller, key, limit, ttl) -> bool:
         """This returns True if the request is valid, False if the request
-        isn't valid, any errors raised are also considered failures"""
-        now = Datetime()
-        count = 1
-
-        calls = getattr(type(self), "_calls", None)
-        if calls is None:
-            calls = Pool(5000)
-            type(self)._calls = calls
-
-        if key in calls:
-            count = calls[key]["count"] + 1
-            if count > limit:
-                td = now - calls[key]["date"]
-                if td.total_seconds() < ttl:
-                    raise ValueError(
-                        "Please wait {} seconds to make a request".format(
-                            ttl - td.seconds
-                        )
-                    )
-
-                else:
-                    count = 1 # we are starting over
-
-        calls[key] = {
-            "count": count,
-            "date": now,
-        }
+        isn't valid, any errors raised are also considered failures
+
+        The RateLimit headers are set on the response, and if the request
+        isn't valid a 429 with a Retry-After header is raised. A limit or
+        ttl that isn't positive means there is no limit, so every request
+        is valid
+        """
+        if limit <= 0 or ttl <= 0:
+            return True
+
+        algorithm = self.algorithm
+        if limit != algorithm.limit or ttl != algorithm.ttl:
+            algorithm = self.create_algorithm(limit, ttl)
+
+        # the decorators share the store and each algorithm's state means
+        # something different, so a key's state is kept for each algorithm
+        # and limit
+        result = self.get_store().update(
+            self.get_store_key(algorithm, key),
+            algorithm.check,
+        )
+        headers = result.get_headers()
+
+        if not result.allowed:
+            raise CallError(
+                429,
+                "Please wait {} seconds to make a request".format(
+                    math.ceil(result.retry_after)
+                ),
+                headers=headers,
+            )
+
+        # decorators can be used outside of controllers
+        if response := getattr(controller, "response", None):
+            response.headers.update(headers)
 
         return True
 
+    def get_store_key(self, algorithm: RateLimitAlgorithm, key: str) -> str:
+        """Returns the key the state of key is kept under in the store"""
+        return f"{algorithm.name}:{algorithm.limit}:{algorithm.ttl}:{key}"
+
     async def get_decorator_params(
         self,
         controller,
@@ -126,7 +191,7 @@ class RateLimitDecorator(ControllerDecorator):
     async def handle_decorator_error(self, controller, e):
         """all exceptions should generate 429 responses"""
         if isinstance(e, CallError):
-            await super().handle_error(controller, e)
+            await super().handle_decorator_error(controller, e)
 
         else:
             raise CallError(429, String(e)) from e
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+import time
+import logging
+from collections.abc import AsyncIterable, AsyncGenerator
+
+from .compat import *
+
+
+logger = logging.getLogger(__name__)
+
+
+class Timer(object):
+    """Records how long each stage of handling a request took
+
+    `Application.handle` sets an instance into `Request.timer` when the
+    application has a collector, otherwise `Request.timer` is None, so a
+    stage should only be timed if there is a timer. A stage that fails
+    before `.stop` is called isn't recorded
+
+    These are the stages endpoints times:
+
+        * routing - finding the controller method for the request
+        * decode - decoding the request body
+        * bind - converting the request into the method's arguments
+        * decorator.<NAME> - each controller decorator's checks
+        * handler - the controller method
+        * media_type - deciding the response media type
+        * encode - encoding the response body
+        * error - handling an error
+
+    :example:
+        if timer := request.timer:
+            start = timer.start()
+
+        # the stage's code
+
+        if timer:
+            timer.stop("stage", start)
+    """
+    def __init__(self):
+        self.begin = time.perf_counter()
+        self.end = None
+        self.intervals = []
+
+        # how many bytes of response body were encoded, see `.time_chunks`
+        self.size = 0
+
+    def start(self) -> float:
+        """Returns the start time of a stage that is passed to `.stop`"""
+        return time.perf_counter()
+
+    def stop(self, stage: str, start: float) -> None:
+        """Record stage
+
+        :param stage: the name of the stage
+        :param start: the value `.start` returned
+        """
+        stop = time.perf_counter()
+        self.intervals.append((stage, start, stop, stop - start))
+
+    async def time_chunks(
+        self,
+        stage: str,
+        chunks: AsyncIterable,
+    ) -> AsyncGenerator:
+        """Record how long chunks took to produce all its chunks, this
+        doesn't include the time spent by whatever is consuming the chunks
+        (eg, sending them to the client)"""
+        duration = 0.0
+        begin = start = time.perf_counter()
+        async for chunk in chunks:
+            duration += time.perf_counter() - start
+            self.size += len(chunk)
+            yield chunk
+            start = time.perf_counter()
+
+        stop = time.perf_counter()
+        duration += stop - start
+        self.intervals.append((stage, begin, stop, duration))
+
+    def has_stage(self, stage: str) -> bool:
+        """True if stage was recorded"""
+        return any(interval[0] == stage for interval in self.intervals)
+
+    def finish(self) -> None:
+        """Called when the response has been sent"""
+        self.end = time.perf_counter()
+
+    @property
+    def total(self) -> float:
+        """How many seconds the request took"""
+        return (self.end or time.perf_counter()) - self.begin
+
+    def get_timings(self) -> list[tuple[str, float]]:
+        """Get the stages in the order they started
+
+        Stages can run inside other stages (eg, the decorators run inside
+        the handler), a stage's time doesn't include the time of the stages
+        that ran inside it
+
+        :returns: (stage, seconds) tuples
+        """
+        intervals = sorted(self.intervals, key=lambda i: (i[1], -i[2]))
+        durations = [i[3] for i in intervals]
+        parents = []
+        for index, (stage, start, stop, duration) in enumerate(intervals):
+            while parents and intervals[parents[-1]][2] <= start:
+                parents.pop()
+
+            if parents:
+                durations[parents[-1]] -= duration
+
+            parents.append(index)
+
+        return [
+            (interval[0], duration)
+            for interval, duration in zip(intervals, durations)
+        ]
+
+
+class Collector(object):
+    """Receives the stage timings of every request
+
+    Pass an instance into `Application` (eg, `Application(collector=...)`)
+    or set `Application.collector_class` and `.collect` will be called
+    with every request's timings once its response has been sent. When
+    there isn't a collector nothing is timed
+
+    Child classes need to implement `.collect`
+    """
+    timer_class = Timer
+
+    def create_timer(self, request, response) -> Timer:
+        """Create the timer that will be set into `Request.timer`"""
+        return self.timer_class()
+
+    def collect(self, request, response, timer: Timer) -> None:
+        """Called when the response has been sent to the client
+
+        This is called after the response is sent so it doesn't slow the
+        response down, but it is still called for every request so it
+        shouldn't block
+
+        :param timer: the request's timer, `Timer.get_timings` has each
+            stage's time
+        """
+        raise NotImplementedError()
+
+
+class LogCollector(Collector):
+    """Logs the stage timings of each request
+
+    :example:
+        < GET /foo 200 in 1.9ms: routing=0.05ms decode=0.02ms ...
+    """
+    def __init__(self, level: int = logging.INFO):
+        self.level = level
+
+    def collect(self, request, response, timer):
+        if not logger.isEnabledFor(self.level):
+            return
+
+        if uuid := getattr(request, "uuid", ""):
+            uuid += " "
+
+        logger.log(
+            self.level,
+            "< %s%s %s %s in %.2fms: %s",
+            uuid,
+            request.method,
+            request.path,
+            response.code,
+            timer.total * 1000,
+            " ".join(
+                f"{stage}={duration * 1000:.2f}ms"
+                for stage, duration in timer.get_timings()
+            ),
+        )
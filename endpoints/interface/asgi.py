@@ -1,8 +1,13 @@
+from collections.abc import AsyncGenerator
+
 from datatypes import logging
 
 from ..compat import *
+from ..config import environ
+from ..call import RequestBody
+from ..exception import CallError
 from .base import Interface
-from ..utils import String
+from ..utils import String, ASGIHeaders
 
 
 logger = logging.getLogger(__name__)
@@ -78,21 +83,83 @@ class Interface(Interface):
             "headers": list(response.headers.asgi()),
         })
 
-    async def handle_http(self, **kwargs):
-        request = self.create_request(**kwargs)
+    async def recv_body(self, **kwargs) -> AsyncGenerator[bytes]:
+        """Yields the request body chunks as they are received
 
-        d = await self.recv_websocket(**kwargs)
-        body = d["body"]
-        while d["more_body"]:
+        https://asgi.readthedocs.io/en/latest/specs/www.html#request-receive-event
+        """
+        while True:
             d = await self.recv_websocket(**kwargs)
-            body += d["body"]
+            if d["type"] == "http.disconnect":
+                raise IOError("Client disconnected before sending full body")
+
+            if chunk := d.get("body", b""):
+                yield chunk
+
+            if not d.get("more_body", False):
+                break
+
+    async def create_request_body(self, **kwargs) -> bytes|RequestBody:
+        """Create the body that will be set into `Request.body`
+
+        :returns: the full body, or a `RequestBody` instance that will read
+            the body as needed if `environ.STREAM_REQUEST_BODY` is True
+        """
+        body = RequestBody(self.recv_body(**kwargs))
+        if environ.STREAM_REQUEST_BODY:
+            return body
+
+        else:
+            try:
+                return await body.read()
+
+            except CallError:
+                # the body was too big, the controller will raise the error
+                # again when it tries to read the body
+                return body
+
+    def get_pathsend_path(self, response, **kwargs) -> str:
+        """Returns the path of a file response body if the server supports
+        the pathsend extension, which lets the server send the file (eg, with
+        sendfile) instead of the body being read and sent in chunks
 
-        request.body = body
+        https://asgi.readthedocs.io/en/latest/extensions.html#path-send
+
+        The body is sent normally if it will be compressed or the response
+        has chunk wrappers (eg, from the responsecache decorator) since
+        those need to see the body
+
+        :returns: the absolute path or empty string if the file body should
+            be sent normally
+        """
+        extensions = kwargs["scope"].get("extensions", None) or {}
+        if (
+            "http.response.pathsend" in extensions
+            and not response.compressor
+            and not response.chunk_wrappers
+        ):
+            return response.get_file_path()
+
+        return ""
+
+    async def handle_http(self, **kwargs):
+        request = self.create_request(**kwargs)
+        request.body = await self.create_request_body(**kwargs)
 
         response = self.create_response()
 
         controller = await self.application.handle(request, response)
 
+        if path := self.get_pathsend_path(response, **kwargs):
+            await self.start_response(kwargs["send"], response)
+            await kwargs["send"]({
+                "type": "http.response.pathsend",
+                "path": path,
+            })
+            response.body.close()
+            self.release(request, response)
+            return
+
         sent_response = False
 
         try:
@@ -119,6 +186,8 @@ class Interface(Interface):
                 "more_body": False,
             })
 
+        self.release(request, response)
+
     async def handle_websocket_recv(self, data, **kwargs):
         # https://asgi.readthedocs.io/en/latest/specs/www.html#receive-receive-event
         request = self.create_request(**kwargs)
@@ -138,6 +207,7 @@ class Interface(Interface):
 
         await self.application.handle(request, response, **kwargs)
         await self.send_websocket(request, response, **kwargs)
+        self.release(request, response)
 
     async def recv_websocket(self, receive, **kwargs):
         return await receive()
@@ -224,9 +294,30 @@ class Interface(Interface):
         """
         return
 
+    def create_response(self, **kwargs):
+        response = super().create_response(**kwargs)
+        if not isinstance(response.headers, ASGIHeaders):
+            # pooled responses will already have them
+            response.headers = self.create_response_headers(**kwargs)
+
+        return response
+
+    def create_response_headers(self, **kwargs) -> ASGIHeaders:
+        """Create the headers that will be set into `Response.headers`, these
+        cache their encoded ASGI headers so `.start_response` doesn't have
+        to encode the same headers for every response"""
+        return kwargs.get("headers_class", ASGIHeaders)()
+
+    def create_request_headers(self, scope, **kwargs) -> ASGIHeaders:
+        """Create the headers that will be set into `Request.headers`, the
+        headers are only decoded from the scope when they are needed"""
+        return kwargs.get("headers_class", ASGIHeaders)(
+            scope.get("headers", None) or [],
+        )
+
     def create_request(self, scope, **kwargs):
-        request = self.application.request_class()
-        request.headers.update(scope.get("headers", []))
+        request = super().create_request(scope, **kwargs)
+        request.headers = self.create_request_headers(scope, **kwargs)
 
         request.path = scope["path"]
         request.query = scope["query_string"]
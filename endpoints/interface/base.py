@@ -28,15 +28,17 @@ from ..config import environ
 from ..call import (
     Controller,
     Request,
+    RequestBody,
     Response,
 )
 from ..reflection.inspect import Pathfinder
+from ..instrument import Collector
 from ..exception import (
     CloseConnection,
     CallError,
 )
 
-from ..utils import ByteString, JSONEncoder
+from ..utils import ByteString, JSONEncoder, LRUCache, ObjectPool
 
 
 logger = logging.getLogger(__name__)
@@ -73,6 +75,8 @@ class InterfaceABC(object):
 class Interface(InterfaceABC):
     def __init__(self, application):
         self.application = application
+        self.request_pool = self.create_pool(application.request_class)
+        self.response_pool = self.create_pool(application.response_class)
 
     def __init_subclass__(cls, *args, **kwargs):
         rc = ReflectCallable(cls.__call__)
@@ -94,14 +98,48 @@ class Interface(InterfaceABC):
         else:
             raise ValueError("Unknown Interface.__call__ method")
 
+    def create_pool(self, call_class: type, **kwargs) -> ObjectPool|None:
+        """Create the pool that will reuse call_class instances
+
+        :param call_class: the request or response class
+        :keyword pool_size: defaults to `environ.CALL_POOL_SIZE`
+        :returns: None if pooling is off
+        """
+        pool_size = kwargs.get("pool_size", environ.CALL_POOL_SIZE)
+        if pool_size > 0:
+            return ObjectPool(call_class, pool_size)
+
     def create_request(self, *args, **kwargs) -> Request:
+        if self.request_pool is not None:
+            return self.request_pool.acquire()
+
         return self.application.request_class()
 
     def create_response(self, **kwargs) -> Response:
         """create the endpoints understandable response instance that is used
         to return output to the client"""
+        if self.response_pool is not None:
+            return self.response_pool.acquire()
+
         return self.application.response_class()
 
+    def release(self, request: Request, response: Response) -> None:
+        """Called when the response has been sent to the client, if pooling
+        is on then request and response will be reset and reused"""
+        if (timer := request.timer) is not None:
+            timer.finish()
+            try:
+                self.application.collector.collect(request, response, timer)
+
+            except Exception as e:
+                logger.exception(e)
+
+        if self.request_pool is not None:
+            self.request_pool.release(request)
+
+        if self.response_pool is not None:
+            self.response_pool.release(response)
+
     async def handle_websocket_connect(self, **kwargs):
         """This handles calling <FOUND CONTROLLER>.CONNECT
         """
@@ -193,6 +231,18 @@ class Application(object):
     """Holds the interface created from the interfaces found in
     `.interface_classes`"""
 
+    collector_class: type[Collector]|None = None
+    """Set this to a `Collector` child class to time each stage of handling
+    every request"""
+
+    collector: Collector|None = None
+    """Receives the stage timings of every request, this is set in
+    `.create_collector`"""
+
+    route_cache: LRUCache|None = None
+    """Holds the resolved (method, path) routes, this is set in
+    `.create_pathfinder` and its `.info()` has the hit and miss counts"""
+
     _asgi_single_callable = True
     """asgiref thing. This is to make the `daphne` server a little more
     predictable. If this is not set then `daphne` considers `.__call__` a
@@ -310,6 +360,7 @@ class Application(object):
         )
 
         self.pathfinder = self.create_pathfinder(**kwargs)
+        self.collector = self.create_collector(**kwargs)
 
     def __call__(self, *args, **kwargs) -> Any:
         """Factory method
@@ -428,6 +479,9 @@ class Application(object):
                     else:
                         body = "Unseekable io.IOBase body"
 
+                elif isinstance(request.body, RequestBody):
+                    body = "Streamed body"
+
                 else:
                     body = request.body
 
@@ -468,10 +522,32 @@ class Application(object):
         for k, v in response.headers.items():
             logger.info("< %s%s: %s", uuid, k, v)
 
+    def create_collector(self, **kwargs) -> Collector|None:
+        """Create the collector that will receive the stage timings of
+        every request
+
+        :keyword collector: Collector, use this instance
+        :returns: None if there is no `.collector_class`, which means
+            nothing is timed
+        """
+        if "collector" in kwargs:
+            return kwargs["collector"]
+
+        elif self.collector_class is not None:
+            return self.collector_class()
+
     def create_pathfinder(self, **kwargs) -> Pathfinder:
         """Internal method. Create the tree that will be used to resolve a
         requested path to a found controller
 
+        This also compiles the tree into `.route_table` which is what is
+        actually used to resolve requests in `._update_request`, and creates
+        a fresh `.route_cache` since any cached resolutions would be stale
+
+        :keyword route_cache_size: int, how many (method, path) resolutions
+            to remember, defaults to `environ.ROUTE_CACHE_SIZE`, 0 turns the
+            route cache off
+
         :returns: basically a dictionary of dictionaries where each
             key represents a part of a path, the final key will contain the
             controller class that can answer a request
@@ -485,6 +561,18 @@ class Application(object):
             if not controller_class.is_private():
                 pathfinder.add_class(controller_class)
 
+        self.route_table = pathfinder.create_route_table(**kwargs)
+
+        route_cache_size = kwargs.get(
+            "route_cache_size",
+            environ.ROUTE_CACHE_SIZE,
+        )
+        if route_cache_size:
+            self.route_cache = LRUCache(route_cache_size)
+
+        else:
+            self.route_cache = None
+
         return pathfinder
 
     def _update_request(self, request, **kwargs) -> None:
@@ -494,50 +582,42 @@ class Application(object):
             request.path,
         )
 
-        leftover_path_args = list(filter(None, request.path.split("/")))
-        node = self.pathfinder
+        route_cache = self.route_cache
+        if route_cache is not None:
+            key = (request.method, request.path)
+            route = route_cache.get(key)
+            if route is None:
+                route = self.route_table.find(request.method, request.path)
+                # not found resolutions are cached also, they will raise
+                # the same error every time
+                route_cache.set(key, route)
 
-        while node is not None:
-            if leftover_path_args:
-                try:
-                    node = node.get_node(leftover_path_args[0] + "/")
-                    leftover_path_args = leftover_path_args[1:]
-
-                except KeyError:
-                    break
+        else:
+            route = self.route_table.find(request.method, request.path)
 
-            else:
-                break
+        method_node, leftover_path_args = route
 
-        request.path_positionals = leftover_path_args
+        # the cached positionals are shared between requests
+        request.path_positionals = list(leftover_path_args)
 
-        # we need to find the http node
-        method_node = None
-        try:
-            method_node = node.get_node(request.method)
-
-        except KeyError:
-            try:
-                 method_node = node.get_node("ANY")
-
-            except KeyError:
-                if leftover_path_args:
-                    # if we have leftover path args and we don't have a
-                    # method to even answer the request it should be NOT
-                    # FOUND since the path is invalid
-                    raise CallError(
-                        404,
-                        f"{request.method} {request.path} not found",
-                    )
+        if method_node is None:
+            if leftover_path_args:
+                # if we have leftover path args and we don't have a
+                # method to even answer the request it should be NOT
+                # FOUND since the path is invalid
+                raise CallError(
+                    404,
+                    f"{request.method} {request.path} not found",
+                )
 
-                else:
-                    # https://www.w3.org/Protocols/rfc2616/rfc2616-sec5.html#sec5.1
-                    # should be Not Implemented if the method is
-                    # unrecognized or not implemented by the origin server
-                    raise CallError(
-                        501,
-                        f"{request.method} {request.path} not implemented",
-                    )
+            else:
+                # https://www.w3.org/Protocols/rfc2616/rfc2616-sec5.html#sec5.1
+                # should be Not Implemented if the method is
+                # unrecognized or not implemented by the origin server
+                raise CallError(
+                    501,
+                    f"{request.method} {request.path} not implemented",
+                )
 
         request.pathfinder_node = method_node
 
@@ -595,7 +675,14 @@ class Application(object):
             controller_class = kwargs["controller_class"]
 
         else:
+            if timer := request.timer:
+                start = timer.start()
+
             self._update_request(request)
+
+            if timer:
+                timer.stop("routing", start)
+
             rm = request.pathfinder_value["reflect_method"]
             controller_class = rm.get_class()
 
@@ -632,6 +719,9 @@ class Application(object):
     async def handle(self, request, response, **kwargs) -> Controller:
         """Called from the interface to actually handle the request."""
         response.start = time.time()
+        if collector := self.collector:
+            request.timer = collector.create_timer(request, response)
+
         self.log_start(request, response)
         controller = None
 
@@ -640,11 +730,17 @@ class Application(object):
             await controller.handle()
 
         except Exception as e:
+            if timer := request.timer:
+                start = timer.start()
+
             if controller is None:
                 controller = self.create_error_controller(request, response)
 
             await controller.handle_error(e)
 
+            if timer:
+                timer.stop("error", start)
+
         self.log_stop(request, response)
 
         return controller
@@ -1,19 +1,90 @@
 # -*- coding: utf-8 -*-
 import asyncio
+import io
+import functools
 from typing import Callable
-from collections.abc import Iterable
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+)
 
 from datatypes import logging
 
 from ..compat import *
 from ..config import environ
-from ..call import Response
+from ..exception import CallError
+from ..call import Response, RequestBody
+from ..utils import WSGIHeaders
 from .base import Interface
 
 
 logger = logging.getLogger(__name__)
 
 
+class ResponseIterator(Iterator[bytes]):
+    """Sends a WSGI response body as it is produced by driving the
+    controller's async iterator one chunk at a time
+
+    WSGI servers iterate the response synchronously, so each chunk is
+    fetched by running the async iterator on the interface's runner, this
+    keeps the iterator on the same event loop it was started on
+    """
+    def __init__(
+        self,
+        runner: asyncio.Runner,
+        chunks: AsyncIterator[bytes],
+        chunk: bytes|None = None,
+        callback: Callable[[], None]|None = None,
+    ):
+        """
+        :param runner: the runner the controller was handled with
+        :param chunks: the controller's async iterator
+        :param chunk: the first chunk if it was already read from chunks
+        :param callback: called when the iterator is closed
+        """
+        self.runner = runner
+        self.chunks = chunks
+        self.chunk = chunk
+        self.callback = callback
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        if self.chunk is not None:
+            chunk = self.chunk
+            self.chunk = None
+
+        else:
+            chunk = self.runner.run(self.anext())
+            if chunk is None:
+                raise StopIteration()
+
+        return chunk
+
+    async def anext(self) -> bytes|None:
+        """Internal method. Returns None instead of raising
+        StopAsyncIteration since that can't cross the runner"""
+        try:
+            return await anext(self.chunks)
+
+        except StopAsyncIteration:
+            return None
+
+    def close(self):
+        """Called by the WSGI server when the response is done, even if
+        the client disconnected before the whole body was sent"""
+        self.chunk = None
+        if aclose := getattr(self.chunks, "aclose", None):
+            self.runner.run(aclose())
+
+        if callback := self.callback:
+            self.callback = None
+            callback()
+
+
 class Interface(Interface):
     """The Interface that a WSGI application needs"""
     def __init__(self, *args, **kwargs):
@@ -30,17 +101,34 @@ class Interface(Interface):
     def __del__(self):
         self._asyncioRunner.close()
 
+    def is_stream_response(self) -> bool:
+        """True if the response body should be sent to the client as the
+        controller produces it instead of collected first"""
+        return environ.WSGI_STREAM_RESPONSE_BODY
+
+    def get_file_chunk_size(self) -> int:
+        """How many bytes of a file response body the server should send at
+        a time"""
+        return environ.FILE_CHUNK_SIZE
+
     async def _handle_http(self, environ, start_response) -> Iterable[bytes]:
+        request = self.create_request(environ)
+        response = self.create_response()
+        controller = await self.application.handle(request, response)
+
+        if self.is_stream_response():
+            return await self.create_response_body(
+                environ,
+                start_response,
+                response,
+                controller,
+            )
+
         # we return a list because if we try to yield it will get messed
         # up in BaseApplication because it awaits this method, so it has
         # to return something that doesn't also need to be awaited, like
         # an AsyncGenerator
         chunks = []
-
-        request = self.create_request(environ)
-        response = self.create_response()
-        controller = await self.application.handle(request, response)
-
         sent_response = False
 
         try:
@@ -57,9 +145,66 @@ class Interface(Interface):
             if not sent_response:
                 await self._start_response(start_response, response)
 
+        self.release(request, response)
+
         # https://peps.python.org/pep-0530/
         return chunks
 
+    async def create_response_body(
+        self,
+        environ,
+        start_response,
+        response,
+        controller,
+    ) -> Iterable[bytes]:
+        """Create the iterable the WSGI server will send to the client
+
+        Binary file bodies are handed to `wsgi.file_wrapper` if the server
+        has one so it can use something like sendfile, everything else is
+        sent as the controller produces it
+
+        https://peps.python.org/pep-3333/#optional-platform-specific-file-handling
+
+        :returns: the file wrapper or a `ResponseIterator`
+        """
+        file_wrapper = environ.get("wsgi.file_wrapper", None)
+        if (
+            file_wrapper
+            and response.is_binary_file()
+            and not response.body.closed
+            and not response.compressor
+            # chunk wrappers (eg, from responsecache) need to see the body
+            and not response.chunk_wrappers
+        ):
+            await self._start_response(start_response, response)
+            body = response.body
+            self.release(controller.request, response)
+            return file_wrapper(body, self.get_file_chunk_size())
+
+        chunks = aiter(controller)
+
+        # we get the first chunk before returning so the response is
+        # started inside the WSGI application call and errors raised
+        # before any of the body is produced can still change the response
+        try:
+            chunk = await anext(chunks)
+
+        except StopAsyncIteration:
+            chunk = None
+
+        await self._start_response(start_response, response)
+
+        if chunk is None:
+            self.release(controller.request, response)
+            return []
+
+        return ResponseIterator(
+            self._asyncioRunner,
+            chunks,
+            chunk,
+            functools.partial(self.release, controller.request, response),
+        )
+
     async def _start_response(self, callback: Callable, response: Response):
         callback(
             '{} {}'.format(response.code, response.status),
@@ -67,14 +212,8 @@ class Interface(Interface):
         )
 
     def create_request(self, environ, **kwargs):
-        r = self.application.request_class()
-        for k, v in environ.items():
-            if k.startswith('HTTP_'):
-                r.headers[k[5:]] = v
-
-            elif k in ['CONTENT_TYPE', 'CONTENT_LENGTH']:
-                r.headers[k] = v
-
+        r = super().create_request(environ, **kwargs)
+        r.headers = self.create_request_headers(environ, **kwargs)
         r.method = environ['REQUEST_METHOD']
         r.path = environ['PATH_INFO']
         r.query = environ['QUERY_STRING']
@@ -82,7 +221,98 @@ class Interface(Interface):
         r.host = environ["HTTP_HOST"]
         r.protocol = environ.get("SERVER_PROTOCOL", None) # eg, HTTP/1.1
 
-        r.body = environ.get('wsgi.input', None)
+        r.body = self.create_request_body(r, environ)
         r.environ = environ
         return r
 
+    def create_request_headers(self, environ, **kwargs) -> WSGIHeaders:
+        """Create the headers that will be set into `Request.headers`, the
+        headers are only read from environ when they are needed"""
+        return kwargs.get("headers_class", WSGIHeaders)(environ)
+
+    def create_request_body(self, request, environ) -> io.IOBase|RequestBody:
+        """Create the body that will be set into `Request.body`
+
+        :returns: the wsgi.input file pointer, or a `RequestBody` instance
+            if the body is chunked since there is no Content-Length to tell
+            the controller how much of the file pointer to read
+        """
+        fp = environ.get("wsgi.input", None)
+        if fp is not None and request.headers.is_chunked():
+            if environ.get("wsgi.input_terminated", False):
+                # the server has already decoded the chunks
+                # https://gist.github.com/mitsuhiko/5721547
+                chunks = self.recv_body(fp)
+
+            else:
+                chunks = self.recv_chunked_body(fp)
+
+            return RequestBody(chunks)
+
+        return fp
+
+    async def recv_body(
+        self,
+        fp: io.IOBase,
+        chunk_size: int = 65536,
+    ) -> AsyncGenerator[bytes]:
+        """Yields fp's chunks until it is empty"""
+        while chunk := fp.read(chunk_size):
+            yield chunk
+
+    async def recv_chunked_body(
+        self,
+        fp: io.IOBase,
+        chunk_size: int = 65536,
+    ) -> AsyncGenerator[bytes]:
+        """Decode a chunked transfer-encoded body as it is read from fp
+
+        Each chunk is a hex size line (with optional extensions), the chunk
+        data, and a line ending. A zero size chunk ends the body and is
+        followed by optional trailers and a blank line
+
+        https://datatracker.ietf.org/doc/html/rfc9112#section-7.1
+
+        :raises: CallError 400 if the body's chunk framing is bad or the
+            body is truncated
+        """
+        while True:
+            line = fp.readline(1024)
+            if not line:
+                raise CallError(
+                    400,
+                    "Client disconnected before sending full body",
+                )
+
+            try:
+                size = int(line.split(b";", 1)[0].strip(), 16)
+
+            except ValueError as e:
+                raise CallError(400, f"Bad chunk size line: {line!r}") from e
+
+            if size < 0:
+                raise CallError(400, f"Bad chunk size line: {line!r}")
+
+            if size == 0:
+                # consume the trailers
+                while line := fp.readline(65536):
+                    if not line.strip():
+                        break
+
+                break
+
+            while size > 0:
+                chunk = fp.read(min(size, chunk_size))
+                if not chunk:
+                    raise CallError(
+                        400,
+                        "Client disconnected before sending full body",
+                    )
+
+                size -= len(chunk)
+                yield chunk
+
+            # the line ending after the chunk data
+            if fp.readline(1024).strip():
+                raise CallError(400, "Chunk data is longer than its size")
+
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+import bisect
+import threading
+from collections.abc import Sequence
+
+from .compat import *
+from .call import Controller
+from .exception import CallError
+from .instrument import Collector, Timer
+
+
+class Histogram(object):
+    """Counts observed values into buckets
+
+    https://prometheus.io/docs/concepts/metric_types/#histogram
+    """
+    def __init__(self, buckets: Sequence[float]):
+        """
+        :param buckets: the sorted upper bounds of the buckets, values bigger
+            than the last bound are counted in the +Inf bucket
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: "Histogram") -> None:
+        """Add the observations of other, which has the same buckets"""
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+
+        self.sum += other.sum
+        self.count += other.count
+
+
+class MetricsShard(object):
+    """Holds the metrics of the requests handled by one thread
+
+    Each thread only changes its own shard so no locks are needed, the
+    shards are added together when the metrics are exported
+    """
+    def __init__(self):
+        self.in_flight = 0
+        self.requests = {}
+        self.errors = {}
+        self.durations = {}
+        self.sizes = {}
+        self.stages = {}
+
+
+class MetricsCollector(Collector):
+    """Collects request metrics that can be exported in the Prometheus text
+    format
+
+    Requests are counted and their latencies and response sizes are
+    observed, labeled by the handler's callpath, the http method, and the
+    response status code. The time spent in each stage (see `Timer`) is
+    summed also
+
+    Each process has its own metrics, so if the server runs more than one
+    worker process each worker's metrics are exported separately
+
+    :example:
+        from endpoints import Application
+        from endpoints.metrics import MetricsCollector
+
+        application = Application(collector=MetricsCollector())
+
+    https://prometheus.io/docs/instrumenting/exposition_formats/
+    """
+    duration_buckets = (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+    )
+    """The request latency histogram's buckets in seconds"""
+
+    size_buckets = (
+        100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000,
+    )
+    """The response size histogram's buckets in bytes"""
+
+    def __init__(
+        self,
+        namespace: str = "endpoints",
+        duration_buckets: Sequence[float]|None = None,
+        size_buckets: Sequence[float]|None = None,
+    ):
+        """
+        :param namespace: the prefix of every metric name
+        :param duration_buckets: overrides `.duration_buckets`
+        :param size_buckets: overrides `.size_buckets`
+        """
+        self.namespace = namespace
+        if duration_buckets is not None:
+            self.duration_buckets = tuple(sorted(duration_buckets))
+
+        if size_buckets is not None:
+            self.size_buckets = tuple(sorted(size_buckets))
+
+        self.local = threading.local()
+        self.shards = []
+
+    def get_shard(self) -> MetricsShard:
+        """Get the current thread's shard"""
+        try:
+            return self.local.shard
+
+        except AttributeError:
+            shard = MetricsShard()
+            self.local.shard = shard
+            # list.append is atomic
+            self.shards.append(shard)
+            return shard
+
+    def get_labels(self, request, response) -> tuple[str, str, str]:
+        """Returns the (handler, method, status) labels of the request"""
+        rm = request.reflect_method
+        return (
+            rm.callpath if rm else "",
+            request.method or "",
+            str(response.code),
+        )
+
+    def get_response_size(self, response, timer: Timer) -> int:
+        """How many bytes of response body were sent, bodies that were
+        sent by the server (eg, with pathsend) use their Content-Length"""
+        if timer.size:
+            return timer.size
+
+        return int(response.headers.get("Content-Length", 0) or 0)
+
+    def create_timer(self, request, response):
+        self.get_shard().in_flight += 1
+        return super().create_timer(request, response)
+
+    def collect(self, request, response, timer):
+        shard = self.get_shard()
+        shard.in_flight -= 1
+
+        labels = self.get_labels(request, response)
+        shard.requests[labels] = shard.requests.get(labels, 0) + 1
+
+        if timer.has_stage("error"):
+            shard.errors[labels] = shard.errors.get(labels, 0) + 1
+
+        if (durations := shard.durations.get(labels)) is None:
+            durations = Histogram(self.duration_buckets)
+            shard.durations[labels] = durations
+
+        durations.observe(timer.total)
+
+        if (sizes := shard.sizes.get(labels)) is None:
+            sizes = Histogram(self.size_buckets)
+            shard.sizes[labels] = sizes
+
+        sizes.observe(self.get_response_size(response, timer))
+
+        for stage, duration in timer.get_timings():
+            if (stats := shard.stages.get(stage)) is None:
+                stats = [0.0, 0]
+                shard.stages[stage] = stats
+
+            stats[0] += duration
+            stats[1] += 1
+
+    def merge(self) -> MetricsShard:
+        """Add all the thread shards together"""
+        merged = MetricsShard()
+        for shard in list(self.shards):
+            merged.in_flight += shard.in_flight
+
+            for labels, count in list(shard.requests.items()):
+                merged.requests[labels] = (
+                    merged.requests.get(labels, 0) + count
+                )
+
+            for labels, count in list(shard.errors.items()):
+                merged.errors[labels] = merged.errors.get(labels, 0) + count
+
+            for name, buckets in (
+                ("durations", self.duration_buckets),
+                ("sizes", self.size_buckets),
+            ):
+                histograms = getattr(merged, name)
+                for labels, histogram in list(getattr(shard, name).items()):
+                    if labels not in histograms:
+                        histograms[labels] = Histogram(buckets)
+
+                    histograms[labels].merge(histogram)
+
+            for stage, stats in list(shard.stages.items()):
+                merged_stats = merged.stages.setdefault(stage, [0.0, 0])
+                merged_stats[0] += stats[0]
+                merged_stats[1] += stats[1]
+
+        return merged
+
+    def export(self) -> str:
+        """Export the metrics in the Prometheus text format"""
+        merged = self.merge()
+        lines = []
+
+        def add_help(name, metric_type, description):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        def format_labels(labels, **extra):
+            names = ("handler", "method", "status")
+            pairs = [*zip(names, labels), *extra.items()]
+            return ",".join(
+                f"{k}=\"{self.escape_label(v)}\"" for k, v in pairs
+            )
+
+        name = f"{self.namespace}_requests_in_flight"
+        add_help(name, "gauge", "Requests currently being handled")
+        lines.append(f"{name} {merged.in_flight}")
+
+        for suffix, description, counts in (
+            ("requests_total", "Requests handled", merged.requests),
+            ("request_errors_total", "Requests that raised an error",
+                merged.errors),
+        ):
+            name = f"{self.namespace}_{suffix}"
+            add_help(name, "counter", description)
+            for labels, count in sorted(counts.items()):
+                lines.append(f"{name}{{{format_labels(labels)}}} {count}")
+
+        for suffix, description, histograms in (
+            ("request_duration_seconds", "Request latency",
+                merged.durations),
+            ("response_size_bytes", "Response body size", merged.sizes),
+        ):
+            name = f"{self.namespace}_{suffix}"
+            add_help(name, "histogram", description)
+            for labels, histogram in sorted(histograms.items()):
+                cumulative = 0
+                bounds = [*histogram.buckets, "+Inf"]
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    le = format_labels(labels, le=bound)
+                    lines.append(f"{name}_bucket{{{le}}} {cumulative}")
+
+                label_str = format_labels(labels)
+                lines.append(f"{name}_sum{{{label_str}}} {histogram.sum}")
+                lines.append(f"{name}_count{{{label_str}}} {histogram.count}")
+
+        name = f"{self.namespace}_stage_duration_seconds"
+        add_help(name, "summary", "Time spent in each stage of a request")
+        for stage, (total, count) in sorted(merged.stages.items()):
+            label_str = f"stage=\"{self.escape_label(stage)}\""
+            lines.append(f"{name}_sum{{{label_str}}} {total}")
+            lines.append(f"{name}_count{{{label_str}}} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def escape_label(self, value) -> str:
+        return (
+            str(value)
+            .replace("\\", "\\\\")
+            .replace("\"", "\\\"")
+            .replace("\n", "\\n")
+        )
+
+
+class MetricsController(Controller):
+    """Answers GET requests with the application's metrics in the
+    Prometheus text format, the application's collector needs to be a
+    `MetricsCollector`
+
+    This class is private, subclass it in a controller module to make the
+    metrics requestable
+
+    :example:
+        # controllers.py
+        from endpoints.metrics import MetricsController
+
+        class Metrics(MetricsController):
+            # GET /metrics
+            pass
+    """
+    metrics_media_type = "text/plain; version=0.0.4"
+
+    async def GET(self) -> str:
+        collector = self.application.collector
+        if not isinstance(collector, MetricsCollector):
+            raise CallError(404, "Metrics are not being collected")
+
+        self.response.media_type = self.metrics_media_type
+        return collector.export()
@@ -0,0 +1,818 @@
+# -*- coding: utf-8 -*-
+import os
+import math
+import time
+import mmap
+import struct
+import sqlite3
+import hashlib
+import threading
+import logging
+from typing import Any
+
+try:
+    import fcntl
+
+except ImportError:
+    fcntl = None
+
+from .compat import *
+from .config import environ
+
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitStore(object):
+    """Holds the rate limit state of each key, see `RateLimitDecorator`
+
+    A key's state is a tuple of 3 floats whose meaning is up to whoever
+    updates it. Each state is kept until it expires, after that the key
+    doesn't have a state anymore
+
+    Child classes need to implement `.update`, `.delete`, and `.clear`
+    """
+    def clock(self) -> float:
+        """The current time in seconds, states are updated with this
+        time"""
+        return time.monotonic()
+
+    def update(
+        self,
+        key: str,
+        callback: Callable[
+            [tuple[float, float, float]|None, float],
+            tuple[tuple[float, float, float]|None, float, Any],
+        ],
+    ) -> Any:
+        """Atomically update the state of key
+
+        :param key: the rate limit key
+        :param callback: called with the key's current state (None if key
+            doesn't have a state) and the current time, it returns a tuple
+            of (new state, how many seconds the new state is kept, the
+            value this method returns), a None new state removes the key
+        :returns: whatever callback returned as its third value
+        """
+        raise NotImplementedError()
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError()
+
+    def clear(self) -> None:
+        """Remove every key's state"""
+        raise NotImplementedError()
+
+    def hash_key(self, key: str) -> int:
+        """Returns a non-zero 64 bit hash of key that is the same in every
+        process (python's `hash` changes between processes)"""
+        h = hashlib.blake2b(String(key).encode(), digest_size=8).digest()
+        return int.from_bytes(h, "little") or 1
+
+
+class RateLimitResult(object):
+    """The result of checking a request against its rate limit, see
+    `RateLimitAlgorithm.check`"""
+    __slots__ = ("allowed", "limit", "remaining", "reset", "retry_after")
+
+    def __init__(
+        self,
+        allowed: bool,
+        limit: int,
+        remaining: int,
+        reset: float,
+        retry_after: float = 0.0,
+    ):
+        """
+        :param allowed: True if the request can be handled
+        :param limit: how many requests are allowed in the window
+        :param remaining: how many more requests are allowed right now
+        :param reset: seconds until the full limit is available again
+        :param retry_after: seconds until a request would be allowed, 0
+            if the request is allowed
+        """
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        self.retry_after = retry_after
+
+    def get_headers(self) -> dict[str, str]:
+        """The RateLimit headers, and the Retry-After header if the request
+        isn't allowed
+
+        https://datatracker.ietf.org/doc/draft-ietf-httpapi-ratelimit-headers/
+        """
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset)),
+        }
+
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil(self.retry_after))
+
+        return headers
+
+
+class RateLimitAlgorithm(object):
+    """Decides if a request is allowed and updates its key's state
+
+    Child classes are registered by their name (eg, "gcra") so the
+    algorithm can be chosen by name with the `ENDPOINTS_RATELIMIT_ALGORITHM`
+    environment variable or the decorator's algorithm argument. Each check
+    only reads and writes the key's state, so it takes the same time no
+    matter how many requests the key has made
+
+    Child classes need to implement `.check`
+    """
+    name = ""
+    """The name used to choose this algorithm"""
+
+    algorithm_classes = {}
+    """Holds all the child classes keyed by their name"""
+
+    def __init_subclass__(cls):
+        if cls.name:
+            cls.algorithm_classes[cls.name] = cls
+
+    @classmethod
+    def find_class(cls, name: str) -> type:
+        try:
+            return cls.algorithm_classes[name.strip().lower()]
+
+        except KeyError as e:
+            raise ValueError(f"No rate limit algorithm named {name}") from e
+
+    def __init__(self, limit: int, ttl: float, burst: int|None = None):
+        """
+        :param limit: how many requests are allowed every ttl seconds
+        :param ttl: the window in seconds
+        :param burst: how many requests can be made at once, algorithms
+            that smooth requests out use this, defaults to limit
+        """
+        if burst is not None and burst < 1:
+            raise ValueError(f"Rate limit burst must be at least 1: {burst}")
+
+        self.limit = limit
+        self.ttl = ttl
+        self.burst = limit if burst is None else burst
+
+    def check(
+        self,
+        state: tuple[float, float, float]|None,
+        now: float,
+    ) -> tuple[tuple[float, float, float], float, RateLimitResult]:
+        """Check a request, this is passed to `RateLimitStore.update`
+
+        :param state: the key's state, None if the key doesn't have one
+        :param now: the store's current time
+        :returns: the new state, how many seconds to keep it, and the
+            result
+        """
+        raise NotImplementedError()
+
+
+class FixedWindow(RateLimitAlgorithm):
+    """Allows limit requests in each ttl seconds window, the window starts
+    with the key's first request
+
+    A client can make limit requests at the end of one window and limit
+    more at the start of the next
+    """
+    name = "fixed"
+
+    def check(self, state, now):
+        # state is (count, window start, unused)
+        limit = self.limit
+        if state is None or now - state[1] >= self.ttl:
+            count = 0.0
+            start = now
+
+        else:
+            count, start, _ = state
+
+        reset = start + self.ttl - now
+        if count >= limit:
+            return state, reset, RateLimitResult(False, limit, 0, reset, reset)
+
+        count += 1
+        return (
+            (count, start, 0.0),
+            reset,
+            RateLimitResult(True, limit, int(limit - count), reset),
+        )
+
+
+class SlidingWindow(RateLimitAlgorithm):
+    """Allows limit requests in any ttl seconds
+
+    The count of the previous window is weighted by how much of it is
+    still inside the last ttl seconds, so this only keeps two counts
+    instead of the time of every request
+
+    https://blog.cloudflare.com/counting-things-a-lot-of-different-things/
+    """
+    name = "sliding"
+
+    def check(self, state, now):
+        # state is (previous window's count, window's count, window start)
+        limit = self.limit
+        ttl = self.ttl
+        if state is None:
+            previous, count, start = 0.0, 0.0, now
+
+        else:
+            previous, count, start = state
+            elapsed = now - start
+            if elapsed >= ttl * 2:
+                previous, count, start = 0.0, 0.0, now
+
+            elif elapsed >= ttl:
+                previous, count, start = count, 0.0, start + ttl
+
+        weight = 1.0 - ((now - start) / ttl)
+        used = (previous * weight) + count
+        reset = start + ttl - now
+        keep = reset + ttl
+
+        if used + 1 > limit:
+            if previous and count + 1 <= limit:
+                # when enough of the previous window has slid out
+                retry_after = (
+                    start
+                    + (ttl * (1.0 - ((limit - 1 - count) / previous)))
+                    - now
+                )
+
+            else:
+                retry_after = reset
+
+            return (
+                (previous, count, start),
+                keep,
+                RateLimitResult(False, limit, 0, reset, retry_after),
+            )
+
+        count += 1
+        return (
+            (previous, count, start),
+            keep,
+            RateLimitResult(
+                True,
+                limit,
+                max(0, int(limit - (used + 1))),
+                reset,
+            ),
+        )
+
+
+class TokenBucket(RateLimitAlgorithm):
+    """Each key has a bucket of burst tokens that refills at limit tokens
+    every ttl seconds, each request takes a token
+
+    https://en.wikipedia.org/wiki/Token_bucket
+    """
+    name = "token_bucket"
+
+    def check(self, state, now):
+        # state is (tokens, time tokens was computed, unused)
+        burst = self.burst
+        rate = self.limit / self.ttl
+        if state is None:
+            tokens = float(burst)
+
+        else:
+            tokens = min(burst, state[0] + ((now - state[1]) * rate))
+
+        if tokens < 1:
+            reset = (burst - tokens) / rate
+            return (
+                (tokens, now, 0.0),
+                reset,
+                RateLimitResult(
+                    False,
+                    self.limit,
+                    0,
+                    reset,
+                    (1 - tokens) / rate,
+                ),
+            )
+
+        tokens -= 1
+        # once the bucket is full again the state isn't needed
+        reset = (burst - tokens) / rate
+        return (
+            (tokens, now, 0.0),
+            reset,
+            RateLimitResult(True, self.limit, int(tokens), reset),
+        )
+
+
+class GCRA(RateLimitAlgorithm):
+    """The generic cell rate algorithm, requests are spaced ttl / limit
+    seconds apart but up to burst requests can be made at once
+
+    This behaves like `TokenBucket` but only keeps one time per key
+
+    https://en.wikipedia.org/wiki/Generic_cell_rate_algorithm
+    """
+    name = "gcra"
+
+    def check(self, state, now):
+        # state is (theoretical arrival time, unused, unused)
+        interval = self.ttl / self.limit
+        tolerance = interval * (self.burst - 1)
+        tat = max(state[0], now) if state else now
+
+        if now < tat - tolerance:
+            reset = tat - now
+            return (
+                state,
+                reset,
+                RateLimitResult(
+                    False,
+                    self.limit,
+                    0,
+                    reset,
+                    tat - tolerance - now,
+                ),
+            )
+
+        tat += interval
+        reset = tat - now
+        return (
+            (tat, 0.0, 0.0),
+            reset,
+            RateLimitResult(
+                True,
+                self.limit,
+                max(0, math.floor((now + tolerance - tat) / interval) + 1),
+                reset,
+            ),
+        )
+
+
+class MemoryStoreShard(object):
+    """Holds some of the keys of a `MemoryStore`
+
+    Keys are filed into a timing wheel of buckets by the tick their state
+    expires in, as time passes the buckets of the ticks that have passed
+    are emptied, so expired keys are dropped without scanning the keys
+    """
+    def __init__(self, maxkeys: int, tick: float, now: float):
+        self.maxkeys = maxkeys
+        self.tick = tick
+        self.data = {}
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+        # the last tick whose bucket was emptied
+        self.last_tick = int(now // tick) - 1
+
+        self.evictions = 0
+        self.expirations = 0
+
+    def file(self, key: str, expires: float) -> None:
+        """Add key to the bucket of the tick it expires in"""
+        t = int(expires // self.tick)
+        if (bucket := self.buckets.get(t)) is None:
+            bucket = set()
+            self.buckets[t] = bucket
+
+        bucket.add(key)
+
+    def expire(self, now: float) -> None:
+        """Empty the buckets of the ticks that have passed, dropping the
+        keys that have expired and refiling the keys whose state was
+        updated since they were filed"""
+        now_tick = int(now // self.tick)
+        if now_tick - 1 <= self.last_tick:
+            return
+
+        ticks = range(self.last_tick + 1, now_tick)
+        if len(ticks) > len(self.buckets):
+            ticks = sorted(t for t in self.buckets if t < now_tick)
+
+        data = self.data
+        for t in ticks:
+            if bucket := self.buckets.pop(t, None):
+                for key in bucket:
+                    if entry := data.get(key):
+                        if entry[0] <= now:
+                            del data[key]
+                            self.expirations += 1
+
+                        else:
+                            self.file(key, entry[0])
+
+        self.last_tick = now_tick - 1
+
+    def evict(self) -> None:
+        """Drop the key that expires first to make room for a new key"""
+        while self.buckets:
+            t = min(self.buckets)
+            bucket = self.buckets[t]
+            key = bucket.pop()
+            if not bucket:
+                del self.buckets[t]
+
+            if self.data.pop(key, None) is not None:
+                self.evictions += 1
+                return
+
+    def set(self, key: str, expires: float, state) -> None:
+        if key not in self.data:
+            if len(self.data) >= self.maxkeys:
+                self.evict()
+
+            self.file(key, expires)
+
+        # a key whose state changed is refiled when its old bucket's tick
+        # passes
+        self.data[key] = (expires, state)
+
+
+class MemoryStore(RateLimitStore):
+    """Keeps the states in this process, so each worker process has its
+    own states
+
+    The keys are divided between shards that each have their own lock, so
+    threads updating different keys rarely wait on each other. Keys are
+    dropped once their state expires (see `MemoryStoreShard`), and only if
+    there are more keys than maxbytes allows is the key that expires first
+    dropped to make room, which `.info` counts as an eviction
+
+    :example:
+        store = MemoryStore(maxbytes=64 * 1024 * 1024)
+        store.info() # {"keys": 0, "maxkeys": 335544, ...}
+    """
+    key_size = 200
+    """Roughly how many bytes each key uses, this is used to decide how
+    many keys fit in maxbytes"""
+
+    def __init__(
+        self,
+        maxbytes: int|None = None,
+        shards: int = 16,
+        tick: float = 1.0,
+    ):
+        """
+        :param maxbytes: roughly how much memory the keys can use,
+            defaults to `environ.RATELIMIT_MEMORY_SIZE`
+        :param shards: how many shards the keys are divided between
+        :param tick: how many seconds each timing wheel bucket covers, keys
+            are dropped at most this long after they expire
+        """
+        if maxbytes is None:
+            maxbytes = environ.RATELIMIT_MEMORY_SIZE
+
+        self.maxbytes = maxbytes
+        self.tick = tick
+        self.maxkeys = max(shards, maxbytes // self.key_size)
+        self.shards = [
+            MemoryStoreShard(self.maxkeys // shards, tick, self.clock())
+            for _ in range(shards)
+        ]
+
+    def get_shard(self, key: str) -> MemoryStoreShard:
+        return self.shards[hash(key) % len(self.shards)]
+
+    def update(self, key, callback):
+        shard = self.get_shard(key)
+        with shard.lock:
+            now = self.clock()
+            shard.expire(now)
+
+            state = None
+            if entry := shard.data.get(key):
+                if entry[0] > now:
+                    state = entry[1]
+
+            state, ttl, ret = callback(state, now)
+            if state is None:
+                shard.data.pop(key, None)
+
+            else:
+                shard.set(key, now + ttl, state)
+
+        return ret
+
+    def delete(self, key):
+        shard = self.get_shard(key)
+        with shard.lock:
+            shard.data.pop(key, None)
+
+    def clear(self):
+        for shard in self.shards:
+            with shard.lock:
+                shard.data.clear()
+                shard.buckets.clear()
+
+    def info(self) -> dict[str, int]:
+        """Returns how many keys have states and how many keys were dropped
+        because they expired or were evicted"""
+        return {
+            "keys": sum(len(shard.data) for shard in self.shards),
+            "maxkeys": self.maxkeys,
+            "expirations": sum(shard.expirations for shard in self.shards),
+            "evictions": sum(shard.evictions for shard in self.shards),
+        }
+
+
+class SharedMemoryStore(RateLimitStore):
+    """Keeps the states in a fixed size hash table in a memory mapped file
+    that every process on the host that opens the same path shares, so the
+    limits hold across all the server's worker processes
+
+    The table has `slots` slots that are grouped into groups of `probes`
+    slots, a key can only be in its group and once its group is full the
+    state that expires first is dropped. Each slot is 40 bytes, so the
+    default 65536 slots use 2.5MB
+
+    Updates only lock the stripe of groups the key is in (with a thread
+    lock and an fcntl record lock), so updates of unrelated keys don't
+    wait on each other
+
+    The path should be on a memory backed filesystem (eg, /dev/shm) since
+    the states use the monotonic clock, which restarts when the host does
+
+    :example:
+        from endpoints.ratelimit import SharedMemoryStore
+        from endpoints.decorators import RateLimitDecorator
+
+        RateLimitDecorator.store = SharedMemoryStore("/dev/shm/ratelimit")
+    """
+    header = struct.Struct("<4sHHQ")
+    """magic, version, probes, slots"""
+
+    slot = struct.Struct("<Qdddd")
+    """key hash (0 is an empty slot), expires, and the 3 state floats"""
+
+    magic = b"EPRL"
+
+    version = 1
+
+    def __init__(
+        self,
+        path: str,
+        slots: int = 65536,
+        probes: int = 8,
+        stripes: int = 64,
+    ):
+        """
+        :param path: the file all the processes share, it is created if it
+            doesn't exist, if it does exist its slots and probes are used
+        :param slots: how many keys can have states
+        :param probes: how many slots each group has
+        :param stripes: how many locks the groups are divided between
+        """
+        if fcntl is None:
+            raise RuntimeError("SharedMemoryStore needs fcntl")
+
+        self.path = path
+        self.stripes = stripes
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        # the whole file is locked while it is set up so two processes
+        # don't both set it up
+        fcntl.lockf(self.fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(self.fd, self.header.size, 0)
+            if len(header) == self.header.size:
+                magic, version, probes, slots = self.header.unpack(header)
+                if magic != self.magic or version != self.version:
+                    raise ValueError(
+                        f"{path} isn't a rate limit shared memory file"
+                    )
+
+            else:
+                slots = max(probes, slots - (slots % probes))
+                os.ftruncate(self.fd, self.get_size(slots))
+                os.pwrite(
+                    self.fd,
+                    self.header.pack(self.magic, self.version, probes, slots),
+                    0,
+                )
+
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN)
+
+        self.slots = slots
+        self.probes = probes
+        self.groups = slots // probes
+        self.size = self.get_size(slots)
+        self.mmap = mmap.mmap(self.fd, self.size)
+        self.locks = [threading.Lock() for _ in range(stripes)]
+
+    def get_size(self, slots: int) -> int:
+        return self.header.size + (slots * self.slot.size)
+
+    def lock(self, stripe: int) -> None:
+        # fcntl record locks belong to the process, so the thread lock
+        # keeps the process's threads from sharing it
+        self.locks[stripe].acquire()
+        # the locked bytes are past the end of the table, they are only
+        # lock markers
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, 1, self.size + stripe)
+
+    def unlock(self, stripe: int) -> None:
+        fcntl.lockf(self.fd, fcntl.LOCK_UN, 1, self.size + stripe)
+        self.locks[stripe].release()
+
+    def find_slot(self, h: int, now: float) -> tuple[int, bool]:
+        """Find the slot of key hash h, the key's group has to be locked
+
+        :returns: the offset of the slot and True if the slot has the key's
+            unexpired state, otherwise the offset is the slot the key's
+            state should be written to
+        """
+        group = h % self.groups
+        start = self.header.size + (group * self.probes * self.slot.size)
+        m = self.mmap
+        unpack_from = self.slot.unpack_from
+
+        free = None
+        oldest = None
+        oldest_expires = None
+        for i in range(self.probes):
+            offset = start + (i * self.slot.size)
+            slot_h, expires, _, _, _ = unpack_from(m, offset)
+            if slot_h == h:
+                if expires > now:
+                    return offset, True
+
+                return offset, False
+
+            if free is None:
+                if slot_h == 0 or expires <= now:
+                    free = offset
+
+                elif oldest is None or expires < oldest_expires:
+                    oldest = offset
+                    oldest_expires = expires
+
+        if free is None:
+            # the group is full so the state that expires first is dropped
+            free = oldest
+
+        return free, False
+
+    def update(self, key, callback):
+        h = self.hash_key(key)
+        stripe = (h % self.groups) % self.stripes
+        self.lock(stripe)
+        try:
+            now = self.clock()
+            offset, found = self.find_slot(h, now)
+            state = None
+            if found:
+                state = self.slot.unpack_from(self.mmap, offset)[2:]
+
+            state, ttl, ret = callback(state, now)
+            if state is None:
+                if found:
+                    self.slot.pack_into(self.mmap, offset, 0, 0, 0, 0, 0)
+
+            else:
+                self.slot.pack_into(self.mmap, offset, h, now + ttl, *state)
+
+            return ret
+
+        finally:
+            self.unlock(stripe)
+
+    def delete(self, key):
+        self.update(key, lambda state, now: (None, 0, None))
+
+    def clear(self):
+        fcntl.lockf(self.fd, fcntl.LOCK_EX)
+        try:
+            self.mmap[self.header.size:] = bytes(self.size - self.header.size)
+
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        self.mmap.close()
+        os.close(self.fd)
+
+
+class SQLiteStore(RateLimitStore):
+    """Keeps the states in a SQLite database, so they are shared by every
+    process that uses the database and kept when the server restarts
+
+    Each update is a write transaction, so this is slower than
+    `SharedMemoryStore`
+
+    :example:
+        from endpoints.ratelimit import SQLiteStore
+        from endpoints.decorators import RateLimitDecorator
+
+        RateLimitDecorator.store = SQLiteStore("/var/lib/app/ratelimit.db")
+    """
+    def __init__(
+        self,
+        path: str,
+        table: str = "endpoints_ratelimit",
+        timeout: float = 5.0,
+        prune_interval: int = 1000,
+    ):
+        """
+        :param path: the database path
+        :param table: the table that holds the states, it is created if it
+            doesn't exist
+        :param timeout: how many seconds to wait for another process's
+            write to finish
+        :param prune_interval: expired states are deleted every this many
+            updates
+        """
+        self.path = path
+        self.table = table
+        self.timeout = timeout
+        self.prune_interval = prune_interval
+        self.updates = 0
+        self.local = threading.local()
+
+    def clock(self):
+        # the states outlive the host's monotonic clock
+        return time.time()
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Get the current thread's connection"""
+        try:
+            return self.local.connection
+
+        except AttributeError:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                " key TEXT PRIMARY KEY,"
+                " expires REAL NOT NULL,"
+                " a REAL NOT NULL,"
+                " b REAL NOT NULL,"
+                " c REAL NOT NULL"
+                ")"
+            )
+            self.local.connection = connection
+            return connection
+
+    def update(self, key, callback):
+        connection = self.get_connection()
+        table = self.table
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            now = self.clock()
+            row = connection.execute(
+                f"SELECT expires, a, b, c FROM {table} WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            state = None
+            if row and row[0] > now:
+                state = row[1:]
+
+            state, ttl, ret = callback(state, now)
+            if state is None:
+                if row:
+                    connection.execute(
+                        f"DELETE FROM {table} WHERE key = ?",
+                        (key,),
+                    )
+
+            else:
+                connection.execute(
+                    f"INSERT OR REPLACE INTO {table}"
+                    " (key, expires, a, b, c) VALUES (?, ?, ?, ?, ?)",
+                    (key, now + ttl, *state),
+                )
+
+            self.updates += 1
+            if self.prune_interval and self.updates % self.prune_interval == 0:
+                connection.execute(
+                    f"DELETE FROM {table} WHERE expires <= ?",
+                    (now,),
+                )
+
+            connection.execute("COMMIT")
+            return ret
+
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def delete(self, key):
+        self.get_connection().execute(
+            f"DELETE FROM {self.table} WHERE key = ?",
+            (key,),
+        )
+
+    def clear(self):
+        self.get_connection().execute(f"DELETE FROM {self.table}")
@@ -2,17 +2,34 @@
 import re
 import io
 from collections import defaultdict, Counter
-from collections.abc import Callable
+from collections.abc import (
+    Callable,
+    Iterator,
+    AsyncIterator,
+    Sequence,
+    MutableSequence,
+    Set,
+    MutableSet,
+    Mapping,
+    MutableMapping,
+)
 import inspect
+import types
+import typing
 from typing import (
     Any, # https://docs.python.org/3/library/typing.html#the-any-type
+    Annotated,
+    Literal,
+    Union,
 )
+import dataclasses
 import functools
 import logging
 
 from datatypes import (
     ReflectClass,
     ReflectCallable,
+    ReflectType,
     Boolean,
     MethodpathFinder,
     NamingConvention,
@@ -397,6 +414,36 @@ class ReflectMethod(ReflectCallable):
 
         return params
 
+    def create_argument_binder(self, **kwargs) -> "ArgumentBinder":
+        return kwargs.get("argument_binder_class", ArgumentBinder)(self)
+
+    @functools.cache
+    def get_argument_binder(self) -> "ArgumentBinder":
+        """Get the compiled binder that binds request arguments to this
+        method's params"""
+        return self.create_argument_binder()
+
+    def create_body_decoder(self, **kwargs) -> "BodyDecoder":
+        return kwargs.get("body_decoder_class", BodyDecoder)(self)
+
+    @functools.cache
+    def get_body_decoder(self) -> "BodyDecoder":
+        """Get the decoder that converts a json body straight into this
+        method's param types"""
+        return self.create_body_decoder()
+
+    def create_media_type_table(self, **kwargs) -> "MediaTypeTable":
+        return kwargs.get("media_type_table_class", MediaTypeTable)(
+            self.get_method_info()["response_media_types"],
+            self.get_class().get_response_media_types(),
+        )
+
+    @functools.cache
+    def get_media_type_table(self) -> "MediaTypeTable":
+        """Get the table that maps this method's response bodies to their
+        media types"""
+        return self.create_media_type_table()
+
     def get_success_media_types(self) -> list[tuple[type, str|Callable]]:
         """Get the success response media types for this method
 
@@ -652,6 +699,47 @@ class ReflectParam(ReflectObject):
     def allow_empty(self):
         return self.flags.get("allow_empty", True)
 
+    @functools.cache
+    def get_normalize_info(self) -> Mapping:
+        """Internal method. Everything `.normalize_value` needs that doesn't
+        depend on the value, so it is only figured out once per param
+
+        :returns: the reflected type, the type checks, and the flags that
+            normalize the value
+        """
+        flags = self.flags
+        rt = self.reflect_type()
+
+        regex = flags.get("regex", None)
+        if isinstance(regex, basestring):
+            regex = re.compile(regex)
+
+        info = {
+            "reflect_type": rt,
+            "is_listish": rt.is_listish(),
+            "is_bool": rt.is_bool(),
+            "is_numberish": rt.is_numberish(),
+            "regex": regex,
+            "choices": set(flags.get("choices", [])),
+            "allow_empty": flags.get("allow_empty", True),
+            "has_default": "default" in flags,
+            "min_size": flags.get("min_size", None),
+            "max_size": flags.get("max_size", None),
+        }
+
+        # a value passed to an untyped param without any checks will be
+        # returned from `.normalize_value` unchanged
+        info["is_passthrough"] = (
+            rt.is_any()
+            and not info["regex"]
+            and not info["choices"]
+            and info["allow_empty"]
+            and info["min_size"] is None
+            and info["max_size"] is None
+        )
+
+        return info
+
     def normalize_value(self, val):
         """This will take the value and make sure it meets expectations
 
@@ -659,10 +747,10 @@ class ReflectParam(ReflectObject):
         :returns: val that has met all param checks
         :raises: ValueError if val fails any checks
         """
-        flags = self.flags
-        rt = self.reflect_type()
+        info = self.get_normalize_info()
+        rt = info["reflect_type"]
 
-        if rt.is_listish():
+        if info["is_listish"]:
             if not isinstance(val, list):
                 val = [val]
 
@@ -676,27 +764,18 @@ class ReflectParam(ReflectObject):
 
             val = vs
 
-        if regex := flags.get("regex", None):
-            failed = False
-            if isinstance(regex, basestring):
-                if not re.search(regex, val):
-                    failed = True
-
-            else:
-                if not regex.search(val):
-                    failed = True
-
-            if failed:
+        if regex := info["regex"]:
+            if not regex.search(val):
                 raise ValueError("param failed regex check")
 
-        if rt.is_bool():
+        if info["is_bool"]:
             val = Boolean(val)
 
         else:
             val = rt.cast(val)
 
-        if pchoices := set(flags.get("choices", [])):
-            if rt.is_listish():
+        if pchoices := info["choices"]:
+            if info["is_listish"]:
                 for v in val:
                     if v not in pchoices:
                         raise ValueError(
@@ -715,14 +794,13 @@ class ReflectParam(ReflectObject):
                         )
                     )
 
-        allow_empty = flags.get("allow_empty", True)
-        if not allow_empty and val is not False and not val:
-            if "default" not in flags:
+        if not info["allow_empty"] and val is not False and not val:
+            if not info["has_default"]:
                 raise ValueError("param was empty")
 
-        if (min_size := flags.get("min_size", None)) is not None:
+        if (min_size := info["min_size"]) is not None:
             failed = False
-            if rt.is_numberish():
+            if info["is_numberish"]:
                 if val < min_size:
                     failed = True
 
@@ -733,9 +811,9 @@ class ReflectParam(ReflectObject):
             if failed:
                 raise ValueError("param was smaller than {}".format(min_size))
 
-        if (max_size := flags.get("max_size", None)) is not None:
+        if (max_size := info["max_size"]) is not None:
             failed = False
-            if rt.is_numberish():
+            if info["is_numberish"]:
                 if val > max_size:
                     failed = True
 
@@ -749,6 +827,530 @@ class ReflectParam(ReflectObject):
         return val
 
 
+class ArgumentBinder(object):
+    """Binds request arguments to a controller http method's params
+
+    This does the same thing as `ReflectMethod.reflect_arguments` and
+    `Controller.get_method_params` but everything that only depends on the
+    method's signature (aliases, param kinds, defaults, and normalizing) is
+    worked out once when the binder is created, so binding a request is
+    just list and dict operations
+
+    .. note:: Binding is loose like `ReflectCallable.reflect_arguments`, so
+        values that don't match the signature are still passed through and
+        the method call will fail with a TypeError that the controller
+        turns into the right error response
+    """
+    POSITIONAL_ONLY = inspect.Parameter.POSITIONAL_ONLY
+    POSITIONAL_OR_KEYWORD = inspect.Parameter.POSITIONAL_OR_KEYWORD
+    VAR_POSITIONAL = inspect.Parameter.VAR_POSITIONAL
+    KEYWORD_ONLY = inspect.Parameter.KEYWORD_ONLY
+    VAR_KEYWORD = inspect.Parameter.VAR_KEYWORD
+    EMPTY = inspect.Parameter.empty
+
+    def __init__(self, reflect_method):
+        """
+        :param reflect_method: ReflectMethod, the http method
+        """
+        params = reflect_method.get_param_info()
+
+        self.params = []
+        """Holds a (name, kind, default, normalize) tuple for each param in
+        the method's signature, normalize is None if the value doesn't need
+        to be normalized"""
+
+        self.aliases = []
+        """Holds a (name, aliases) tuple for each param that has aliases"""
+
+        for param in reflect_method.get_params():
+            normalize = None
+            if rp := params.get(param.name, None):
+                if not rp.get_normalize_info()["is_passthrough"]:
+                    normalize = rp.normalize_value
+
+                if aliases := rp.flags["aliases"]:
+                    self.aliases.append((param.name, tuple(aliases)))
+
+            self.params.append(
+                (param.name, param.kind, param.default, normalize)
+            )
+
+    def bind(
+        self,
+        args: Sequence,
+        kwargs: Mapping,
+        normalized: Set[str]|None = None,
+    ) -> tuple[Sequence, Mapping]:
+        """Bind the request's positionals and keywords to the method's params
+
+        :param args: the request positionals
+        :param kwargs: the request keywords
+        :param normalized: the names of the keywords whose values are
+            already normalized (eg, they were decoded by `BodyDecoder`)
+        :returns: the positionals and keywords the method should be called
+            with
+        """
+        normalized = normalized or ()
+        keywords = dict(kwargs)
+
+        # resolve any aliases
+        for name, aliases in self.aliases:
+            if name not in keywords:
+                for n in aliases:
+                    if n in keywords:
+                        keywords[name] = keywords.pop(n)
+                        break
+
+        method_args = []
+        method_kwargs = {}
+
+        params = self.params
+        pcount = len(params)
+        pindex = 0
+        aindex = 0
+        acount = len(args)
+
+        # bind the positionals
+        while aindex < acount:
+            if pindex >= pcount:
+                # there aren't any params left so the rest of the positionals
+                # are passed through
+                method_args.extend(args[aindex:])
+                break
+
+            name, kind, default, normalize = params[pindex]
+
+            if kind is self.VAR_POSITIONAL:
+                value = list(args[aindex:]) + keywords.pop(name, [])
+                method_args.extend(normalize(value) if normalize else value)
+                pindex += 1
+                break
+
+            elif kind is self.VAR_KEYWORD or kind is self.KEYWORD_ONLY:
+                # we've hit the keywords so the rest of the positionals are
+                # passed through and this param will be bound with the
+                # keywords
+                method_args.extend(args[aindex:])
+                break
+
+            else:
+                if name in keywords:
+                    # method call is going to fail anyway so short-circuit
+                    # processing
+                    return args, kwargs
+
+                value = args[aindex]
+                method_args.append(normalize(value) if normalize else value)
+                pindex += 1
+                aindex += 1
+
+        # bind the keywords to the remaining params
+        keywords_param = None
+        for name, kind, default, normalize in params[pindex:]:
+            if kind is self.VAR_KEYWORD:
+                keywords_param = (name, kind, default, normalize)
+
+            elif kind is self.VAR_POSITIONAL:
+                if value := keywords.pop(name, []):
+                    # the positional catch-all (eg, `*args`) was passed in as
+                    # a keyword (eg, `args=[...]`)
+                    method_args.extend(normalize(value) if normalize else value)
+
+            elif name in keywords:
+                value = keywords.pop(name)
+                if normalize and name not in normalized:
+                    value = normalize(value)
+
+                if kind is self.KEYWORD_ONLY:
+                    method_kwargs[name] = value
+
+                else:
+                    method_args.append(value)
+
+            elif default is not self.EMPTY:
+                if kind is self.POSITIONAL_ONLY:
+                    method_args.append(default)
+
+                else:
+                    method_kwargs[name] = default
+
+        if keywords:
+            # leftover keywords are bound to the keyword catch-all (eg,
+            # `**kwargs`) or passed through
+            if keywords_param and (normalize := keywords_param[3]):
+                keywords = normalize(keywords)
+
+            method_kwargs.update(keywords)
+
+        return method_args, method_kwargs
+
+
+class BodyDecoder(object):
+    """Decodes a json request body straight into the types the http
+    method's body params are annotated with (eg, dataclasses, TypedDicts,
+    `list[int]`)
+
+    A converter is built from each param's annotation when the decoder is
+    created, so decoding a body doesn't do any reflection, and the values
+    it converts don't have to be normalized again by
+    `ReflectParam.normalize_value`
+
+    Only params whose annotation is their only check are decoded, anything
+    with flags like `regex` or `choices` is left for `.normalize_value`, as
+    is any value that can't be converted
+
+    .. note:: Like msgspec, dataclass fields that aren't in the dataclass
+        are ignored
+    """
+    def __init__(self, reflect_method):
+        """
+        :param reflect_method: ReflectMethod, the http method
+        """
+        self.type_converters = {}
+        """Holds the converter of each dataclass and TypedDict, they are
+        saved before their fields are built so recursive types work"""
+
+        self.converters = {}
+        """Holds the converter for each param keyed by the param name"""
+
+        for rp in reflect_method.reflect_body_params():
+            if rp.is_catchall():
+                continue
+
+            info = rp.get_normalize_info()
+            if (
+                info["is_passthrough"]
+                or info["regex"]
+                or info["choices"]
+                or not info["allow_empty"]
+                or info["min_size"] is not None
+                or info["max_size"] is not None
+            ):
+                continue
+
+            self.converters[rp.name] = self.create_converter(rp.flags["type"])
+
+    def decode(self, body: MutableMapping) -> set[str]:
+        """Convert the values of body in place
+
+        :param body: the decoded json body
+        :returns: the names of the params whose values were converted
+        """
+        names = set()
+        for name, converter in self.converters.items():
+            if name in body:
+                try:
+                    body[name] = converter(body[name])
+                    names.add(name)
+
+                except (ValueError, TypeError, KeyError):
+                    # the value will be normalized the normal way
+                    pass
+
+        return names
+
+    def create_converter(self, annotation) -> Callable[[Any], Any]:
+        """Build the function that will convert a json value to annotation
+
+        :param annotation: the type annotation
+        :returns: a callable that takes the json value and returns the
+            converted value, it raises ValueError or TypeError if the value
+            can't be converted
+        """
+        if annotation in (list, tuple, set, frozenset, dict):
+            origin = annotation
+            args = ()
+
+        else:
+            origin = typing.get_origin(annotation)
+            args = typing.get_args(annotation)
+
+        if annotation is Any or annotation is inspect.Parameter.empty:
+            return self.convert_any
+
+        elif annotation is None or annotation is types.NoneType:
+            return self.convert_none
+
+        elif origin is Annotated:
+            return self.create_converter(args[0])
+
+        elif origin is Union or origin is types.UnionType:
+            return functools.partial(
+                self.convert_union,
+                [self.create_converter(a) for a in args],
+            )
+
+        elif origin is Literal:
+            return functools.partial(self.convert_literal, args)
+
+        elif origin in (list, Sequence, MutableSequence):
+            return functools.partial(
+                self.convert_list,
+                self.create_converter(args[0] if args else Any),
+            )
+
+        elif origin in (set, frozenset, Set, MutableSet):
+            return functools.partial(
+                self.convert_set,
+                frozenset if origin is frozenset else set,
+                self.create_converter(args[0] if args else Any),
+            )
+
+        elif origin is tuple:
+            if not args or (len(args) == 2 and args[1] is Ellipsis):
+                return functools.partial(
+                    self.convert_tuple,
+                    self.create_converter(args[0] if args else Any),
+                )
+
+            else:
+                return functools.partial(
+                    self.convert_fixed_tuple,
+                    [self.create_converter(a) for a in args],
+                )
+
+        elif origin in (dict, Mapping, MutableMapping):
+            return functools.partial(
+                self.convert_dict,
+                self.create_converter(args[0] if args else Any),
+                self.create_converter(args[1] if len(args) > 1 else Any),
+            )
+
+        elif typing.is_typeddict(annotation):
+            return self.create_typeddict_converter(annotation)
+
+        elif (
+            isinstance(annotation, type)
+            and dataclasses.is_dataclass(annotation)
+        ):
+            return self.create_dataclass_converter(annotation)
+
+        elif annotation is bool:
+            return Boolean
+
+        elif isinstance(annotation, type):
+            return functools.partial(self.convert_type, annotation)
+
+        elif callable(annotation):
+            # eg, a parse function used as the annotation
+            return annotation
+
+        return self.convert_any
+
+    def get_type_hints(self, annotation) -> dict[str, Any]:
+        try:
+            return typing.get_type_hints(annotation, include_extras=True)
+
+        except (NameError, TypeError):
+            # forward references that can't be resolved are treated like
+            # they aren't annotated
+            return {}
+
+    def create_dataclass_converter(self, annotation):
+        if converter := self.type_converters.get(annotation):
+            return converter
+
+        fields = []
+
+        def converter(value):
+            if isinstance(value, annotation):
+                return value
+
+            if not isinstance(value, Mapping):
+                raise ValueError(f"Could not convert value to {annotation}")
+
+            kwargs = {}
+            for name, field_converter in fields:
+                if name in value:
+                    kwargs[name] = field_converter(value[name])
+
+            return annotation(**kwargs)
+
+        self.type_converters[annotation] = converter
+
+        hints = self.get_type_hints(annotation)
+        for field in dataclasses.fields(annotation):
+            if field.init:
+                fields.append((
+                    field.name,
+                    self.create_converter(hints.get(field.name, Any)),
+                ))
+
+        return converter
+
+    def create_typeddict_converter(self, annotation):
+        if converter := self.type_converters.get(annotation):
+            return converter
+
+        fields = {}
+        required_keys = annotation.__required_keys__
+
+        def converter(value):
+            if not isinstance(value, Mapping):
+                raise ValueError(f"Could not convert value to {annotation}")
+
+            for k in required_keys:
+                if k not in value:
+                    raise ValueError(f"Value is missing {annotation} key {k}")
+
+            return {
+                k: (fields[k](v) if k in fields else v)
+                for k, v in value.items()
+            }
+
+        self.type_converters[annotation] = converter
+
+        for name, hint in self.get_type_hints(annotation).items():
+            fields[name] = self.create_converter(hint)
+
+        return converter
+
+    def convert_any(self, value):
+        return value
+
+    def convert_none(self, value):
+        if value is None:
+            return value
+
+        raise ValueError("Value is not None")
+
+    def convert_type(self, annotation, value):
+        if isinstance(value, annotation):
+            return value
+
+        return annotation(value)
+
+    def convert_union(self, converters, value):
+        # like ReflectType.cast the first type that succeeds wins
+        for converter in converters:
+            try:
+                return converter(value)
+
+            except (ValueError, TypeError, KeyError):
+                pass
+
+        raise ValueError("Could not convert value to any union type")
+
+    def convert_literal(self, choices, value):
+        if value in choices:
+            return value
+
+        raise ValueError(f"Value is not one of {choices}")
+
+    def convert_list(self, converter, value):
+        if not isinstance(value, list):
+            raise ValueError("Value is not a list")
+
+        return [converter(v) for v in value]
+
+    def convert_set(self, set_class, converter, value):
+        if not isinstance(value, list):
+            raise ValueError("Value is not a list")
+
+        return set_class(converter(v) for v in value)
+
+    def convert_tuple(self, converter, value):
+        if not isinstance(value, list):
+            raise ValueError("Value is not a list")
+
+        return tuple(converter(v) for v in value)
+
+    def convert_fixed_tuple(self, converters, value):
+        if not isinstance(value, list) or len(value) != len(converters):
+            raise ValueError(f"Value is not a list of {len(converters)}")
+
+        return tuple(c(v) for c, v in zip(converters, value))
+
+    def convert_dict(self, key_converter, value_converter, value):
+        if not isinstance(value, Mapping):
+            raise ValueError("Value is not a dict")
+
+        return {
+            key_converter(k): value_converter(v)
+            for k, v in value.items()
+        }
+
+
+class MediaTypeTable(object):
+    """Maps a response body to the media type it should be sent with
+
+    The method's declared return types are checked first, then the
+    controller's `get_response_media_types`. Which entry matches only
+    depends on the body's type, so the first time a type is seen its match
+    is remembered and every body of that type after that is a dict lookup
+
+    Each match is the media type or a callable that takes the response and
+    sets the media type, the same as `Controller.get_response_media_types`
+    """
+    def __init__(self, method_media_types, class_media_types):
+        """
+        :param method_media_types: list[tuple[type, str|Callable]], the
+            method's `response_media_types` from `.get_method_info`
+        :param class_media_types: list[tuple[type, str|Callable]], the
+            controller's `get_response_media_types`
+        """
+        self.method_media_types = [
+            (ReflectType(body_type), body_type, media_type)
+            for body_type, media_type in method_media_types
+        ]
+        self.class_media_types = list(class_media_types)
+
+        self.media_type_names = []
+        """The media types the method declared, in order, this is what
+        `Request.negotiate_media_type` chooses from"""
+        for _, _, media_type in self.method_media_types:
+            if isinstance(media_type, str):
+                if media_type not in self.media_type_names:
+                    self.media_type_names.append(media_type)
+
+        self.media_types = {}
+        """Holds the matches for each body type that has been seen"""
+
+    def get(self, body) -> tuple[str|Callable, ...]:
+        """Get the media types for body
+
+        :param body: Any, the response body
+        :returns: the method's matching media type and then the
+            controller's matching media type, the controller's media type
+            should be used if the method's media type doesn't set one
+        """
+        body_type = type(body)
+        try:
+            return self.media_types[body_type]
+
+        except KeyError:
+            media_types = self.find(body)
+            self.media_types[body_type] = media_types
+            return media_types
+
+    def find(self, body) -> tuple[str|Callable, ...]:
+        """Internal method. Does the actual matching for `.get`"""
+        media_types = []
+
+        for rt, body_type, media_type in self.method_media_types:
+            if rt.is_type(body) or self._is_iterator_type(body, body_type):
+                media_types.append(media_type)
+                break
+
+        for body_type, media_type in self.class_media_types:
+            if isinstance(body, body_type):
+                media_types.append(media_type)
+                break
+
+        return tuple(media_types)
+
+    def _is_iterator_type(self, body, body_type) -> bool:
+        """Internal method. `ReflectType.is_type` compares the type against
+        the body's concrete type, so an annotated return type like
+        `AsyncIterator[dict]` would never match the async generator that
+        was actually returned"""
+        return (
+            isinstance(body_type, type)
+            and issubclass(body_type, (Iterator, AsyncIterator))
+            and isinstance(body, body_type)
+        )
+
+
 class Pathfinder(MethodpathFinder):
     """Internal class used by Application. This holds the tree of all the
     controllers so Application can resolve the path
@@ -830,6 +1432,11 @@ class Pathfinder(MethodpathFinder):
 
             value["reflect_method"] = rm
 
+            # compile the binder and media type table now so requests
+            # don't have to
+            rm.get_argument_binder()
+            rm.get_media_type_table()
+
             logger.info(
                 "Registering endpoint: %s %s -> %s",
                 rm.http_verb,
@@ -864,3 +1471,117 @@ class Pathfinder(MethodpathFinder):
         """override parent to normalize key using .find_keys"""
         return self.find_keys.get(key, key)
 
+
+    def create_route_table(self, **kwargs) -> "RouteTable":
+        """Compile this tree into a lookup table that can resolve a requested
+        path without walking the tree node by node
+
+        .. note:: The table is a snapshot of the tree, so if nodes are added
+            after this is called then this will need to be called again
+
+        :keyword route_table_class: Optional[RouteTable]
+        :returns: RouteTable
+        """
+        return kwargs.get("route_table_class", RouteTable)(self)
+
+
+class Route(object):
+    """Internal class used by RouteTable. Holds a compiled path node of the
+    Pathfinder tree"""
+    __slots__ = ("node", "children", "methods")
+
+    def __init__(self, node):
+        """
+        :param node: Pathfinder, the path node in the tree
+        """
+        self.node = node
+
+        self.children = {}
+        """Holds the path part variations (eg, `foo-bar`, `foo_bar`) of each
+        child path node mapped to that child's Route instance"""
+
+        self.methods = {}
+        """Holds the http verb (eg `GET`) mapped to the http method node"""
+
+
+class RouteTable(object):
+    """Internal class used by Application. This compiles a Pathfinder tree
+    into a table that can turn a (method, path) into the http method node and
+    the leftover path positionals
+
+    Paths that completely match a controller path are resolved with one
+    dict lookup, any other path (eg, a path that has positionals) walks
+    a compact trie of plain dicts, this means resolving a path never has to
+    raise and catch `KeyError` or normalize keys at request time
+    """
+    def __init__(self, pathfinder: Pathfinder):
+        self.static_routes = {}
+        """Holds the full canonical path (eg `/foo-bar/che`) mapped to the
+        Route instance"""
+
+        self.root = self.add_route(pathfinder, [])
+
+    def add_route(self, node: Pathfinder, keys: list[str]) -> Route:
+        """Internal method. Compile node and all its child path nodes
+
+        :param node: the path node to compile
+        :param keys: the canonical path keys to get to node from the root
+        :returns: the compiled route for node
+        """
+        route = Route(node)
+        routes = {}
+
+        for key, child in node.items():
+            if child.value and "reflect_method" in child.value:
+                route.methods[key] = child
+
+            else:
+                routes[key] = self.add_route(child, [*keys, key])
+
+        # Pathfinder.add_node populates .find_keys with all the variations
+        # that are valid for each path key (they end with a slash)
+        for find_key, key in node.find_keys.items():
+            if find_key.endswith("/") and key in routes:
+                route.children[find_key[:-1]] = routes[key]
+
+        path = "/" + "/".join(keys)
+        self.static_routes[path] = route
+        self.static_routes[path.rstrip("/") + "/"] = route
+        if not keys:
+            self.static_routes[""] = route
+
+        return route
+
+    def find(self, method: str, path: str) -> tuple[Pathfinder|None, list]:
+        """Find the http method node that should answer method and path
+
+        :param method: the http verb (eg, `GET`)
+        :param path: the requested path (eg, `/foo/bar`)
+        :returns: index 0 is the http method node, or None if the found path
+            node doesn't have a handler for method, index 1 is the path
+            parts that are leftover after finding the path node
+        """
+        path_positionals = []
+
+        route = self.static_routes.get(path, None)
+        if route is None:
+            route = self.root
+            path_positionals = list(filter(None, path.split("/")))
+
+            for i, part in enumerate(path_positionals):
+                if child := route.children.get(part, None):
+                    route = child
+
+                else:
+                    path_positionals = path_positionals[i:]
+                    break
+
+            else:
+                path_positionals = []
+
+        methods = route.methods
+        method_node = methods.get(method, None)
+        if method_node is None:
+            method_node = methods.get("ANY", None)
+
+        return method_node, path_positionals
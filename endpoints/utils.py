@@ -2,8 +2,43 @@
 import mimetypes
 import json
 import types
-from functools import cmp_to_key
+import tempfile
+import logging
+import zlib
+import fnmatch
+import datetime
+import uuid
+import functools
+import dataclasses
+import time
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
 
+try:
+    import brotli
+
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+
+except ImportError:
+    zstandard = None
+
+try:
+    import orjson
+
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+
+except ImportError:
+    msgspec = None
 
 from datatypes import (
     ByteString,
@@ -12,12 +47,16 @@ from datatypes import (
     Path,
     Deepcopy,
     Url as BaseUrl,
+    HTTPHeaders,
 )
 
 from .compat import *
 from .config import environ
 
 
+logger = logging.getLogger(__name__)
+
+
 class Url(BaseUrl):
     """a url object on steroids, this is here to make it easy to manipulate
     urls we try to map the supported fields to their urlparse equivalents,
@@ -158,14 +197,228 @@ class MimeType(object):
         return mt
 
 
+class HTTPHeadersView(HTTPHeaders):
+    """Headers that are read from the raw headers a server handed to the
+    interface as they are needed
+
+    Looking up a header (eg, `.get`, `.get_all`, `in`) goes straight to the
+    raw headers, everything else (eg, iterating or changing the headers)
+    copies the raw headers into the instance first, and from then on the
+    instance works just like `HTTPHeaders`
+
+    Child classes need to implement `._get_raw_all` and `._iter_raw`
+    """
+    names = {}
+    """Holds the normalized header names, shared by all instances"""
+
+    names_maxsize = 1024
+
+    def __init__(self, raw=None, headers=None, **kwargs):
+        """
+        :param raw: the server's headers
+        :param headers: see `HTTPHeaders`
+        """
+        super().__init__(headers, **kwargs)
+        self.raw = raw
+
+    @property
+    def _headers(self) -> list[tuple[str, str]]:
+        """The list wsgiref.Headers keeps the headers in, the raw headers
+        are copied into the list the first time it is used"""
+        headers = self.__dict__["_headers"]
+        if self.raw is not None:
+            raw = self.raw
+            self.raw = None
+            self._load_raw(raw, headers)
+
+        return headers
+
+    @_headers.setter
+    def _headers(self, headers: list[tuple[str, str]]):
+        self.__dict__["_headers"] = headers
+        self.__dict__["raw"] = None
+
+    def _load_raw(self, raw, headers: list[tuple[str, str]]) -> None:
+        """Copy the raw headers into headers"""
+        for k, v in self._iter_raw(raw):
+            headers.append((
+                self._convert_string_name(k),
+                self._convert_string_type(v),
+            ))
+
+    def _convert_string_name(self, k):
+        """Normalizing a name is relatively slow and clients send the same
+        few header names over and over, so the normalized names are
+        remembered, up to `.names_maxsize` of them"""
+        names = self.names
+        name = names.get(k, None)
+        if name is None:
+            name = super()._convert_string_name(k)
+            if len(names) < self.names_maxsize:
+                names[k] = name
+
+        return name
+
+    def _get_raw_all(self, name: str) -> list[str]:
+        """Return all the raw values of header name"""
+        raise NotImplementedError()
+
+    def _iter_raw(self, raw) -> Iterable[tuple[str|bytes, str|bytes]]:
+        """Yield every (name, value) header in raw"""
+        raise NotImplementedError()
+
+    def get_all(self, name):
+        if self.raw is None:
+            return super().get_all(name)
+
+        return [self._convert_string_type(v) for v in self._get_raw_all(name)]
+
+    def get(self, name, default=None):
+        if self.raw is None:
+            return super().get(name, default)
+
+        if vs := self._get_raw_all(name):
+            return self._convert_string_type(vs[0])
+
+        return default
+
+
+class WSGIHeaders(HTTPHeadersView):
+    """Headers view over a WSGI environ, the headers are the environ's
+    `HTTP_*` keys plus `CONTENT_TYPE` and `CONTENT_LENGTH`
+
+    https://peps.python.org/pep-3333/#environ-variables
+    """
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def get_environ_key(name: str) -> str:
+        """Convert header name to its environ key (eg, Content-Type to
+        CONTENT_TYPE and X-Foo to HTTP_X_FOO)"""
+        key = String(name).upper().replace("-", "_")
+        if key != "CONTENT_TYPE" and key != "CONTENT_LENGTH":
+            key = "HTTP_" + key
+
+        return key
+
+    def _get_raw_all(self, name):
+        v = self.raw.get(self.get_environ_key(name), None)
+        return [] if v is None else [v]
+
+    def _iter_raw(self, raw):
+        for k, v in raw.items():
+            if k.startswith("HTTP_"):
+                yield k[5:], v
+
+            elif k == "CONTENT_TYPE" or k == "CONTENT_LENGTH":
+                yield k, v
+
+
+class ASGIHeaders(HTTPHeadersView):
+    """Headers view over an ASGI scope's headers, a list of (name, value)
+    byte string pairs with lowercase names
+
+    The raw byte string pairs are remembered when they are decoded, so
+    `.asgi` can return unchanged headers without encoding them again. This
+    is also used for ASGI response headers since their encoded pairs are
+    cached
+
+    https://asgi.readthedocs.io/en/latest/specs/www.html#http-connection-scope
+    """
+    def __init__(self, raw=None, headers=None, **kwargs):
+        self.encoded = {}
+        super().__init__(raw, headers, **kwargs)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def encode_header(name: str, value: str) -> tuple[bytes, bytes]:
+        """Convert a header to the ASGI (name, value) byte strings"""
+        return ByteString(name.lower()).raw(), ByteString(value).raw()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def get_raw_name(name: str) -> bytes:
+        """Convert header name to its ASGI name (eg, Content-Type to
+        b"content-type")"""
+        return ByteString(
+            String(name).lower().replace("_", "-"),
+            HTTPHeaders.encoding,
+        ).raw()
+
+    def _get_raw_all(self, name):
+        name = self.get_raw_name(name)
+        return [v for k, v in self.raw if k == name]
+
+    def _iter_raw(self, raw):
+        return raw
+
+    def _load_raw(self, raw, headers):
+        encoded = {}
+        for k, v in raw:
+            header = (
+                self._convert_string_name(k),
+                self._convert_string_type(v),
+            )
+            headers.append(header)
+            encoded[header] = (k, v)
+
+        self.encoded = encoded
+
+    def asgi(self) -> Iterable[tuple[bytes, bytes]]:
+        """Returns each header as a tuple of byte strings with the name all
+        lowercase, headers that came from the raw headers and haven't
+        changed are returned as they were received"""
+        if self.raw is not None:
+            yield from self.raw
+
+        else:
+            encoded = self.encoded
+            for header in self._headers:
+                if raw_header := encoded.get(header, None):
+                    yield raw_header
+
+                else:
+                    yield self.encode_header(*header)
+
+
 class AcceptHeader(object):
     """
     wraps the Accept header to allow easier versioning
 
     provides methods to return the accept media types in the correct order
 
+    Parsed headers are immutable so `.get_instance` should be used to get
+    an instance, it remembers the parsed header for each raw header value
+    since clients tend to send the same few Accept headers over and over
+
     https://www.rfc-editor.org/rfc/rfc9110#name-accept
     """
+    cache = None
+    """Holds the LRUCache that `.get_instance` uses, it is created the first
+    time it is needed"""
+
+    @classmethod
+    def get_instance(cls, header: str) -> "AcceptHeader":
+        """Get the parsed header for raw header value `header`
+
+        :param header: the raw Accept header value
+        :returns: a cached instance if header has been parsed before
+        """
+        cache = cls.cache
+        if cache is None:
+            maxsize = environ.ACCEPT_HEADER_CACHE_SIZE
+            if maxsize <= 0:
+                return cls(header)
+
+            cache = LRUCache(maxsize)
+            cls.cache = cache
+
+        instance = cache.get(header)
+        if instance is None:
+            instance = cls(header)
+            cache.set(header, instance)
+
+        return instance
+
     def __init__(self, header):
         self.header = header
         self.media_types = []
@@ -193,53 +446,46 @@ class AcceptHeader(object):
                 #pout.v(media_type, q, params)
                 self.media_types.append((media_type, q, params, accept))
 
+        self.sorted_media_types = sorted(
+            self.media_types,
+            key=self._sort_key,
+            reverse=True
+        )
+        """The media types sorted from most preferred to least preferred"""
+
+        # the quality of each media range, used by .negotiate, if a range
+        # is in the header more than once the most preferred one wins
+        self.qualities = {}
+        for x in reversed(self.sorted_media_types):
+            if len(x[0]) == 2:
+                self.qualities["/".join(x[0])] = x[1]
+
     def _split_media_type(self, media_type):
         """return type, subtype from media type: type/subtype"""
         media_type_bits = media_type.split('/')
         return media_type_bits
 
-    def _sort(self, a, b):
-        '''
-        sort the headers according to rfc 2616 so when __iter__ is called, the
-        accept media types are in order from most preferred to least preferred
-        '''
-        ret = 0
+    def _sort_key(self, x):
+        """sort the headers according to rfc 2616 so when __iter__ is
+        called, the accept media types are in order from most preferred to
+        least preferred
 
-        # first we check q, higher values win:
-        if a[1] != b[1]:
-            ret = cmp(a[1], b[1])
-        else:
-            found = False
-            for i in range(2):
-                ai = a[0][i]
-                bi = b[0][i]
-                if ai == '*':
-                    if bi != '*':
-                        ret = -1
-                        found = True
-                        break
-                    else:
-                        # both *, more verbose params win
-                        ret = cmp(len(a[2]), len(b[2]))
-                        found = True
-                        break
-                elif bi == '*':
-                    ret = 1
-                    found = True
-                    break
+        higher q values win, then more specific media types (text/html
+        beats text/* beats */*), then media types with more params
+        """
+        if x[0][0] == "*":
+            specificity = 0
 
-            if not found:
-                ret = cmp(len(a[2]), len(b[2]))
+        elif len(x[0]) < 2 or x[0][1] == "*":
+            specificity = 1
+
+        else:
+            specificity = 2
 
-        return ret
+        return (x[1], specificity, len(x[2]))
 
     def __iter__(self):
-        sorted_media_types = sorted(
-            self.media_types,
-            key=cmp_to_key(self._sort),
-            reverse=True
-        )
-        for x in sorted_media_types:
+        for x in self.sorted_media_types:
             yield x
 
     def filter(self, media_type, **params):
@@ -252,7 +498,7 @@ class AcceptHeader(object):
         return -- generator -- yields all matching media type info things
         """
         mtype, msubtype = self._split_media_type(media_type)
-        for x in self.__iter__():
+        for x in self.sorted_media_types:
             # all the params have to match to make the media type valid
             matched = True
             for k, v in params.items():
@@ -285,6 +531,51 @@ class AcceptHeader(object):
                     elif x[0][1] == msubtype:
                         yield x
 
+    def get_quality(self, media_type: str) -> float:
+        """Get the quality the client gave media_type
+
+        The most specific matching media range decides the quality, so
+        `text/html;q=0.1, text/*` gives text/html 0.1 and text/plain 1.0
+
+        https://www.rfc-editor.org/rfc/rfc9110#section-12.5.1
+
+        :param media_type: a media type like "application/json", any
+            params are ignored
+        :returns: 0.0 if the client doesn't accept media_type
+        """
+        if not self.media_types:
+            # no Accept header means the client accepts everything
+            return 1.0
+
+        qualities = self.qualities
+        media_type = media_type.split(";", 1)[0].strip()
+        q = qualities.get(media_type, None)
+        if q is None:
+            mtype = media_type.split("/", 1)[0]
+            q = qualities.get(f"{mtype}/*", None)
+            if q is None:
+                q = qualities.get("*/*", 0.0)
+
+        return q
+
+    def negotiate(self, media_types: Iterable[str]) -> str:
+        """Choose the media type the client prefers out of media_types
+
+        :param media_types: the media types the server can send, in the
+            server's order of preference, which breaks ties
+        :returns: the best media type, empty if the client doesn't accept
+            any of them
+        """
+        best_media_type = ""
+        best_q = 0.0
+        for media_type in media_types:
+            q = self.get_quality(media_type)
+            if q > best_q:
+                best_media_type = media_type
+                best_q = q
+
+        return best_media_type
+
 
 class JSONEncoder(json.JSONEncoder):
     """Smooths out some rough edges with the default encoder"""
@@ -310,6 +601,735 @@ class JSONEncoder(json.JSONEncoder):
             return super().default(obj)
 
 
+class JSONCodec(object):
+    """Dumps and loads json
+
+    Child classes are registered by their name (eg, "orjson") so the json
+    backend can be chosen with the `ENDPOINTS_JSON_CODECS` environment
+    variable. One codec instance is shared by all the requests, so
+    anything that can be reused (eg, encoder instances) is created once
+
+    Types the backend can't encode are converted by the serializers
+    registered with `.register`, they are looked up by the object's type
+
+    :example:
+        codec = JSONCodec.find_class("orjson,json")()
+        codec.register(Decimal, str)
+        body = codec.dumps({"foo": Decimal("1.5")})
+        d = codec.loads(body)
+    """
+    name = ""
+    """The name used to choose this codec"""
+
+    codec_classes = {}
+    """Holds all the child classes keyed by their name"""
+
+    def __init_subclass__(cls):
+        if cls.name:
+            cls.codec_classes[cls.name] = cls
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Return True if this codec's dependencies are installed"""
+        return True
+
+    @classmethod
+    def find_class(cls, names: str|Sequence[str]) -> type:
+        """Find the first available codec class
+
+        :param names: the codec names in order of preference, either a
+            sequence or a comma separated string like "orjson,json"
+        :returns: the codec class
+        """
+        if isinstance(names, str):
+            names = names.split(",")
+
+        for name in names:
+            codec_class = cls.codec_classes.get(name.strip().lower())
+            if codec_class and codec_class.is_available():
+                return codec_class
+
+        raise ValueError(f"No available json codec in {names}")
+
+    def __init__(self, **kwargs):
+        self.serializers = {}
+        """Holds the registered serializers keyed by type"""
+
+        self.type_serializers = {}
+        """Holds the serializer found for each type `.default` has seen,
+        this is cleared when a serializer is registered"""
+
+        self.register(types.GeneratorType, list)
+        self.register(Exception, self.serialize_string)
+        # this seems like a py3 bug, for some reason bytes can get in here
+        # https://bugs.python.org/issue30343
+        self.register(bytes, self.serialize_string)
+        self.register(datetime.date, self.serialize_isoformat)
+        self.register(datetime.time, self.serialize_isoformat)
+        self.register(uuid.UUID, str)
+
+    def register(self, type_: type, serializer: Callable[[Any], Any]):
+        """Register a serializer for type_
+
+        :param type_: the serializer will be used for instances of this type
+            or any of its children
+        :param serializer: takes the object and returns something the codec
+            can encode
+        """
+        self.serializers[type_] = serializer
+        self.type_serializers.clear()
+
+    def serialize_isoformat(self, obj) -> str:
+        return obj.isoformat()
+
+    def serialize_string(self, obj) -> str:
+        # a plain str since some codecs (eg, msgspec) reject str subclasses
+        # like String
+        return str(String(obj))
+
+    def get_serializer(self, type_: type) -> Callable[[Any], Any]|None:
+        """Get the serializer for type_ by checking its MRO, the closest
+        registered type wins"""
+        try:
+            return self.type_serializers[type_]
+
+        except KeyError:
+            serializer = None
+            for klass in type_.__mro__:
+                if klass in self.serializers:
+                    serializer = self.serializers[klass]
+                    break
+
+            if serializer is None and dataclasses.is_dataclass(type_):
+                serializer = dataclasses.asdict
+
+            self.type_serializers[type_] = serializer
+            return serializer
+
+    def default(self, obj):
+        """Convert obj to something the backend can encode, this is only
+        called for objects the backend can't encode itself
+
+        :raises: TypeError if there isn't a serializer for obj
+        """
+        if serializer := self.get_serializer(type(obj)):
+            return serializer(obj)
+
+        raise TypeError(
+            f"Object of type {type(obj).__name__} is not JSON serializable"
+        )
+
+    def dumps(self, body) -> bytes:
+        raise NotImplementedError()
+
+    def loads(self, body: str|bytes) -> Any:
+        raise NotImplementedError()
+
+
+class StdlibJSONCodec(JSONCodec):
+    """Uses python's builtin json module
+
+    https://docs.python.org/3/library/json.html
+    """
+    name = "json"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.encoder = kwargs.get("json_encoder", JSONEncoder)(
+            default=self.default,
+        )
+        self.decoder = json.JSONDecoder()
+        self.encoding = kwargs.get("encoding", environ.ENCODING)
+
+    def dumps(self, body) -> bytes:
+        return bytes(self.encoder.encode(body), self.encoding)
+
+    def loads(self, body: str|bytes) -> Any:
+        if isinstance(body, (bytes, bytearray)):
+            # this detects the encoding the same way json.loads does
+            return json.loads(body)
+
+        return self.decoder.decode(body)
+
+
+class OrjsonJSONCodec(JSONCodec):
+    """
+    https://github.com/ijl/orjson
+    """
+    name = "orjson"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return orjson is not None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Evidently keys can't be child classes of str either unless this
+        # option is set. From the docs:
+        #    "raises JSONEncodeError if a dict has a key of a type
+        #    other than str, unless OPT_NON_STR_KEYS is specified"
+        self.option = kwargs.get("option", orjson.OPT_NON_STR_KEYS)
+
+    def dumps(self, body) -> bytes:
+        return orjson.dumps(body, option=self.option, default=self.default)
+
+    def loads(self, body: str|bytes) -> Any:
+        return orjson.loads(body)
+
+
+class MsgspecJSONCodec(JSONCodec):
+    """
+    https://jcristharif.com/msgspec/
+
+    .. note:: msgspec encodes bytes as base64 instead of decoding them
+    """
+    name = "msgspec"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return msgspec is not None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.encoder = msgspec.json.Encoder(enc_hook=self.default)
+        self.decoder = msgspec.json.Decoder()
+
+    def dumps(self, body) -> bytes:
+        return self.encoder.encode(body)
+
+    def loads(self, body: str|bytes) -> Any:
+        return self.decoder.decode(body)
+
+
+class SpooledFile(tempfile.SpooledTemporaryFile):
+    """A temp file that is held in memory until it is bigger than max_size
+    and then it is written to disk
+
+    Unlike the parent, `.name` can be set, this is so it can hold the
+    uploaded filename like the `io.BytesIO` attachments do
+    """
+    _name = None
+
+    @property
+    def name(self):
+        if self._name is None:
+            return super().name
+
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+
+
+class MultipartParser(object):
+    """Incremental multipart body parser
+
+    Unlike `datatypes.http.Multipart.decode`, which needs the whole body in
+    memory, this parses the body as it is fed in chunks. Fields are held in
+    memory but file parts (parts with a filename) are written to a
+    `SpooledFile` as they arrive so an upload of any size uses a constant
+    amount of memory
+
+    https://www.rfc-editor.org/rfc/rfc7578
+
+    :example:
+        parser = MultipartParser.from_headers(headers)
+        for chunk in chunks:
+            parser.feed(chunk)
+
+        for part_headers, part_body in parser.close():
+            pass
+    """
+    @classmethod
+    def from_headers(cls, headers: HTTPHeaders, **kwargs):
+        """Create a parser using the boundary in the Content-Type header
+
+        :param headers: the request headers
+        :returns: MultipartParser
+        """
+        value, params = headers.parse("Content-Type")
+        boundary = params.get("boundary", "")
+        if not boundary:
+            raise ValueError("Multipart body is missing boundary")
+
+        return cls(boundary, **kwargs)
+
+    def __init__(
+        self,
+        boundary: str|bytes,
+        spool_size: int|None = None,
+        max_header_size: int = 16384,
+    ):
+        """
+        :param boundary: the multipart boundary from the Content-Type header
+        :param spool_size: file parts bigger than this many bytes are written
+            to disk, defaults to `environ.REQUEST_BODY_SPOOL_SIZE`
+        :param max_header_size: the headers of a part can't be bigger than
+            this many bytes
+        """
+        if isinstance(boundary, str):
+            boundary = boundary.encode("latin-1")
+
+        self.delimiter = b"--" + boundary
+        self.body_delimiter = b"\n" + self.delimiter
+        self.spool_size = (
+            environ.REQUEST_BODY_SPOOL_SIZE
+            if spool_size is None
+            else spool_size
+        )
+        self.max_header_size = max_header_size
+
+        self.parts = []
+        self.buffer = bytearray()
+        self.state = "preamble"
+
+        self.part_headers = None
+        self.part_body = None
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse as much of the body as possible with the new chunk
+
+        Lines are supposed to end with CRLF but, like the email parser,
+        bare LF line endings are also accepted
+
+        :param chunk: the next part of the body
+        """
+        buffer = self.buffer
+        buffer.extend(chunk)
+
+        while buffer:
+            if self.state == "preamble":
+                i = buffer.find(self.delimiter)
+                if i < 0:
+                    # keep enough to find a delimiter split between chunks
+                    del buffer[:-len(self.delimiter)]
+                    break
+
+                del buffer[:i + len(self.delimiter)]
+                self.state = "delimiter"
+
+            elif self.state == "delimiter":
+                if len(buffer) < 2:
+                    break
+
+                if buffer.startswith(b"--"):
+                    self.state = "epilogue"
+
+                else:
+                    i = buffer.find(b"\n")
+                    if i < 0:
+                        break
+
+                    # anything between the delimiter and the newline is
+                    # transport padding and is ignored
+                    del buffer[:i + 1]
+                    self.state = "headers"
+
+            elif self.state == "headers":
+                if buffer.startswith(b"\r\n") or buffer.startswith(b"\n"):
+                    # the part has no headers
+                    i = 0
+                    end = 2 if buffer.startswith(b"\r") else 1
+
+                else:
+                    i = buffer.find(b"\n\r\n")
+                    end = 3
+                    j = buffer.find(b"\n\n")
+                    if j >= 0 and (i < 0 or j < i):
+                        i = j
+                        end = 2
+
+                if i < 0:
+                    if len(buffer) > self.max_header_size:
+                        raise ValueError("Multipart part headers too big")
+                    break
+
+                self.start_part(bytes(buffer[:i]))
+                del buffer[:i + end]
+                self.state = "body"
+
+            elif self.state == "body":
+                i = buffer.find(self.body_delimiter)
+                if i < 0:
+                    # the end of the buffer might be the start of the
+                    # delimiter (and the CR before it) so it has to stay in
+                    # the buffer
+                    keep = len(self.body_delimiter)
+                    if len(buffer) > keep:
+                        self.write_part(buffer[:-keep])
+                        del buffer[:-keep]
+                    break
+
+                end = i
+                if end > 0 and buffer[end - 1] == 13: # \r
+                    end -= 1
+
+                self.write_part(buffer[:end])
+                del buffer[:i + len(self.body_delimiter)]
+                self.stop_part()
+                self.state = "delimiter"
+
+            else:
+                # anything after the closing delimiter is ignored
+                buffer.clear()
+
+    def start_part(self, header_bytes: bytes) -> None:
+        """Internal method. Called when the headers of a part have been
+        received"""
+        lines = []
+        for line in header_bytes.split(b"\n"):
+            line = line.rstrip(b"\r")
+            if line[:1] in (b" ", b"\t") and lines:
+                # folded header value
+                lines[-1] += b" " + line.strip()
+
+            elif line:
+                lines.append(line)
+
+        headers = HTTPHeaders()
+        for line in lines:
+            name, _, value = line.partition(b":")
+            headers.add_header(
+                String(name.strip(), encoding="latin-1"),
+                String(value.strip(), encoding="utf-8"),
+            )
+
+        value, params = headers.parse("Content-Disposition")
+        if "filename" in params:
+            self.part_body = SpooledFile(max_size=self.spool_size)
+
+        else:
+            self.part_body = bytearray()
+
+        self.part_headers = headers
+
+    def write_part(self, data: bytes) -> None:
+        """Internal method. Called with each piece of a part's body"""
+        if isinstance(self.part_body, bytearray):
+            self.part_body.extend(data)
+
+        else:
+            self.part_body.write(data)
+
+    def stop_part(self) -> None:
+        """Internal method. Called when the delimiter at the end of a part's
+        body is found"""
+        body = self.part_body
+        if isinstance(body, bytearray):
+            body = bytes(body)
+
+        else:
+            body.seek(0)
+
+        self.parts.append((self.part_headers, body))
+        self.part_headers = None
+        self.part_body = None
+
+    def close(self) -> list[tuple[HTTPHeaders, bytes|SpooledFile]]:
+        """Call after the last chunk was fed
+
+        :returns: the headers and body of each part, file parts will have
+            a `SpooledFile` body
+        :raises: ValueError if the body was truncated (it is missing the
+            closing delimiter)
+        """
+        if self.state in ("delimiter", "headers", "body"):
+            if self.part_body is not None and not isinstance(
+                self.part_body,
+                bytearray,
+            ):
+                self.part_body.close()
+
+            for _, body in self.parts:
+                if not isinstance(body, bytes):
+                    body.close()
+
+            raise ValueError("Multipart body is missing the closing delimiter")
+
+        return self.parts
+
+
+class LRUCache(object):
+    """A bounded cache that drops the least recently used key once maxsize
+    is reached
+
+    Unlike `datatypes.Pool` refreshing a key is O(1), which matters when the
+    cache sits in front of every request. This keeps hit and miss counts so
+    the cache can be sized
+
+    :example:
+        c = LRUCache(2)
+        c.set("foo", 1)
+        c.get("foo") # 1
+        c.get("bar") # None
+        c.info() # {"hits": 1, "misses": 1, "size": 1, "maxsize": 2}
+    """
+    def __init__(self, maxsize: int = 0):
+        """
+        :param maxsize: how many keys the cache can hold, if 0 then the cache
+            is unbounded
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.data = OrderedDict()
+
+    def get(self, key, default=None):
+        """Get the value at key, this counts as a hit or a miss and marks key
+        as the most recently used
+
+        :param key: Hashable
+        :param default: Any, returned if key is not in the cache
+        :returns: Any
+        """
+        data = self.data
+        value = data.get(key, self)
+        if value is self:
+            self.misses += 1
+            value = default
+
+        else:
+            self.hits += 1
+            try:
+                data.move_to_end(key)
+
+            except KeyError:
+                # the key was evicted by another thread between the get and
+                # the move, we still have the value though
+                pass
+
+        return value
+
+    def set(self, key, value) -> None:
+        """Set value at key, evicting the least recently used key if the cache
+        is full
+
+        :param key: Hashable
+        :param value: Any
+        """
+        data = self.data
+        data[key] = value
+        data.move_to_end(key)
+
+        if self.maxsize > 0:
+            while len(data) > self.maxsize:
+                data.popitem(last=False)
+
+    def pop(self, key, *default):
+        return self.data.pop(key, *default)
+
+    def clear(self) -> None:
+        """Remove all the keys and reset the counters"""
+        self.data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> dict[str, int]:
+        """Returns the hit, miss, and size information of the cache, similar
+        to `functools.lru_cache.cache_info`"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.data),
+            "maxsize": self.maxsize,
+        }
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+
+class CachedResponse(object):
+    """An encoded response that `ResponseCache` holds so it can be sent
+    again without calling the controller method
+
+    A response is fresh for ttl seconds, after that it is stale for stale
+    more seconds, a stale response can still be sent while one request
+    refreshes it (stale-while-revalidate)
+    """
+    def __init__(
+        self,
+        code: int,
+        headers: list[tuple[str, str]],
+        media_type: str|None,
+        body: bytes,
+        ttl: float,
+        stale: float = 0,
+    ):
+        """
+        :param code: the response's status code
+        :param headers: the response's (name, value) headers
+        :param media_type: the response's media type
+        :param body: the encoded, uncompressed, response body
+        :param ttl: how many seconds the response is fresh
+        :param stale: how many seconds after ttl the response can still be
+            sent while it is refreshed
+        """
+        self.code = code
+        self.headers = headers
+        self.media_type = media_type
+        self.body = body
+        self.created = time.monotonic()
+        self.expires = self.created + ttl
+        self.stale_expires = self.expires + stale
+
+        # True while a request is refreshing this stale response
+        self.revalidating = False
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires
+
+    def is_stale(self, now: float) -> bool:
+        """True if the response is no longer fresh but can still be sent
+        while it is refreshed"""
+        return self.expires <= now < self.stale_expires
+
+    def get_age(self, now: float) -> int:
+        """How many seconds ago the response was cached, for the Age
+        header"""
+        return int(now - self.created)
+
+    def __len__(self):
+        return len(self.body)
+
+
+class ResponseCache(LRUCache):
+    """A bounded cache of `CachedResponse` instances, once either maxsize
+    responses or maxbytes bytes of bodies are held the least recently used
+    responses are dropped
+
+    :example:
+        c = ResponseCache(maxsize=100, maxbytes=1024 * 1024)
+        c.set(key, CachedResponse(200, [], "text/plain", b"foo", ttl=60))
+        c.info() # {"hits": 0, ..., "bytes": 3, "maxbytes": 1048576}
+    """
+    def __init__(self, maxsize: int = 0, maxbytes: int = 0):
+        """
+        :param maxsize: how many responses the cache can hold, 0 means
+            there is no limit on the count
+        :param maxbytes: how many bytes of bodies the cache can hold, 0
+            means there is no limit on the size
+        """
+        super().__init__(maxsize)
+        self.maxbytes = maxbytes
+        self.bytes = 0
+        # eviction changes .bytes along with .data so they are changed
+        # together
+        self.lock = threading.Lock()
+
+    def set(self, key, value: CachedResponse) -> None:
+        """Set value at key, evicting the least recently used responses
+        until the cache is back under its limits, a response bigger than
+        maxbytes isn't cached"""
+        size = len(value)
+        if self.maxbytes > 0 and size > self.maxbytes:
+            self.pop(key, None)
+            return
+
+        with self.lock:
+            data = self.data
+            if (old := data.pop(key, None)) is not None:
+                self.bytes -= len(old)
+
+            data[key] = value
+            self.bytes += size
+
+            while (
+                (self.maxsize > 0 and len(data) > self.maxsize)
+                or (self.maxbytes > 0 and self.bytes > self.maxbytes)
+            ):
+                _, old = data.popitem(last=False)
+                self.bytes -= len(old)
+
+    def pop(self, key, *default):
+        with self.lock:
+            value = self.data.pop(key, self)
+            if value is self:
+                if default:
+                    return default[0]
+
+                raise KeyError(key)
+
+            self.bytes -= len(value)
+            return value
+
+    def clear(self) -> None:
+        with self.lock:
+            super().clear()
+            self.bytes = 0
+
+    def info(self) -> dict[str, int]:
+        info = super().info()
+        info["bytes"] = self.bytes
+        info["maxbytes"] = self.maxbytes
+        return info
+
+
+class ObjectPool(object):
+    """Reuses instances instead of creating new ones, this is used by the
+    interfaces to reuse the request and response instances
+
+    Released instances have their `.reset` method called before they can
+    be acquired again
+
+    :example:
+        pool = ObjectPool(Request, 100)
+        request = pool.acquire()
+        # handle the request
+        pool.release(request)
+        pool.info() # {"created": 1, "reused": 0, "size": 1, "maxsize": 100}
+    """
+    def __init__(self, factory: Callable[[], Any], maxsize: int):
+        """
+        :param factory: called to create a new instance when the pool is
+            empty
+        :param maxsize: how many released instances the pool will hold
+        """
+        self.factory = factory
+        self.maxsize = maxsize
+        self.created = 0
+        self.reused = 0
+        self.instances = []
+
+    def acquire(self) -> Any:
+        """Get a reset instance from the pool, or a new instance if the
+        pool is empty"""
+        try:
+            # list.pop is atomic so this is thread safe
+            instance = self.instances.pop()
+            self.reused += 1
+
+        except IndexError:
+            instance = self.factory()
+            self.created += 1
+
+        return instance
+
+    def release(self, instance: Any) -> None:
+        """Reset instance and put it back into the pool, if the pool is full
+        then instance is left for the garbage collector
+
+        .. note:: instance shouldn't be used after it is released
+        """
+        if len(self.instances) < self.maxsize:
+            instance.reset()
+            self.instances.append(instance)
+
+    def info(self) -> dict[str, int]:
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "size": len(self.instances),
+            "maxsize": self.maxsize,
+        }
+
+    def __len__(self):
+        return len(self.instances)
+
+
 class Status(String):
     def __new__(cls, code, **kwargs):
         if code < 1000:
@@ -409,3 +1429,202 @@ class Status(String):
 
         return status
 
+
+class Compressor(object):
+    """Incrementally compress a response body
+
+    Child classes are registered by their content coding name (eg, "gzip")
+    so they can be negotiated against a request's Accept-Encoding header
+
+    https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Accept-Encoding
+
+    :example:
+        compressor_class = Compressor.find_class("gzip, br;q=0.9")
+        compressor = compressor_class()
+        body = compressor.compress(b"...") + compressor.flush()
+    """
+    encoding = ""
+    """The content coding name that will be sent in Content-Encoding"""
+
+    compressor_classes = {}
+    """Holds all the child classes keyed by their encoding"""
+
+    def __init_subclass__(cls):
+        if cls.encoding:
+            cls.compressor_classes[cls.encoding] = cls
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Return True if this compressor's dependencies are installed"""
+        return True
+
+    @classmethod
+    def find_class(
+        cls,
+        accept_encoding: str,
+        encodings: Sequence[str]|None = None,
+    ) -> type|None:
+        """Negotiate the compressor class to use
+
+        :param accept_encoding: the request's Accept-Encoding header
+        :param encodings: the encodings the server is willing to use, in
+            order of preference, defaults to all the registered encodings
+        :returns: the compressor class the client prefers, None if there
+            isn't an acceptable one
+        """
+        accepted = {}
+        for part in accept_encoding.split(","):
+            name, _, params = part.partition(";")
+            if name := name.strip().lower():
+                q = 1.0
+                for param in params.split(";"):
+                    k, _, v = param.partition("=")
+                    if k.strip().lower() == "q":
+                        try:
+                            q = float(v)
+
+                        except ValueError:
+                            q = 0.0
+
+                accepted[name] = q
+
+        if encodings is None:
+            encodings = list(cls.compressor_classes.keys())
+
+        best_class = None
+        best_q = 0.0
+        for encoding in encodings:
+            compressor_class = cls.compressor_classes.get(encoding)
+            if compressor_class and compressor_class.is_available():
+                q = accepted.get(encoding, accepted.get("*", 0.0))
+                if q > best_q:
+                    best_class = compressor_class
+                    best_q = q
+
+        return best_class
+
+    @classmethod
+    def is_compressible(
+        cls,
+        media_type: str,
+        media_types: Sequence[str],
+    ) -> bool:
+        """Return True if media_type matches one of media_types
+
+        :param media_type: the response media type (eg, "application/json")
+        :param media_types: patterns like "text/*" or "application/*+json"
+        """
+        if media_type:
+            media_type = media_type.split(";", 1)[0].strip().lower()
+            for pattern in media_types:
+                if fnmatch.fnmatchcase(media_type, pattern.strip().lower()):
+                    return True
+
+        return False
+
+    def __init__(self, level: int|None = None, min_size: int = 0):
+        """
+        :param level: the compression level, each compressor has its own
+            default
+        :param min_size: bodies smaller than this many bytes won't be
+            compressed
+        """
+        self.level = level
+        self.min_size = min_size
+
+    def compress(self, chunk: bytes, flush: bool = False) -> bytes:
+        """Compress chunk
+
+        :param flush: if True then everything compressed so far will be
+            returned, this is useful when the body is streamed so the
+            client doesn't have to wait for the compressor's buffer to fill
+        :returns: the compressed bytes, this can be empty since compressors
+            buffer their input
+        """
+        raise NotImplementedError()
+
+    def flush(self) -> bytes:
+        """Finish the compressed stream
+
+        :returns: the rest of the compressed bytes
+        """
+        raise NotImplementedError()
+
+
+class GzipCompressor(Compressor):
+    encoding = "gzip"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compressor = zlib.compressobj(
+            6 if self.level is None else self.level,
+            zlib.DEFLATED,
+            # adding 16 writes a gzip header and trailer
+            16 + zlib.MAX_WBITS,
+        )
+
+    def compress(self, chunk: bytes, flush: bool = False) -> bytes:
+        compressed = self.compressor.compress(chunk)
+        if flush:
+            compressed += self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        return compressed
+
+    def flush(self) -> bytes:
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor(Compressor):
+    """
+    https://github.com/google/brotli
+    """
+    encoding = "br"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return brotli is not None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compressor = brotli.Compressor(
+            quality=4 if self.level is None else self.level,
+        )
+
+    def compress(self, chunk: bytes, flush: bool = False) -> bytes:
+        compressed = self.compressor.process(chunk)
+        if flush:
+            compressed += self.compressor.flush()
+
+        return compressed
+
+    def flush(self) -> bytes:
+        return self.compressor.finish()
+
+
+class ZstdCompressor(Compressor):
+    """
+    https://github.com/indygreg/python-zstandard
+    """
+    encoding = "zstd"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return zstandard is not None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compressor = zstandard.ZstdCompressor(
+            level=3 if self.level is None else self.level,
+        ).compressobj()
+
+    def compress(self, chunk: bytes, flush: bool = False) -> bytes:
+        compressed = self.compressor.compress(chunk)
+        if flush:
+            compressed += self.compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+
+        return compressed
+
+    def flush(self) -> bytes:
+        return self.compressor.flush()
@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
+import io
+
+import testdata
 
 from endpoints.compat import *
+from endpoints.exception import CallError
 from endpoints.call import (
+    ETL,
     Controller,
     CORSMixin,
     Request,
+    RequestBody,
     Response,
 )
 
@@ -62,6 +68,53 @@ class ControllerTest(TestCase):
         res = c.handle("/")
         self.assertEqual(501, res.code)
 
+    def test_typed_request_body(self):
+        c = self.create_server("""
+            import dataclasses
+
+            @dataclasses.dataclass
+            class Point(object):
+                x: int
+                y: int
+
+            class Default(Controller):
+                def POST(
+                    self,
+                    points: list[Point],
+                    ids: list[int],
+                    name: str,
+                ):
+                    return {
+                        "points": [type(p).__name__ for p in points],
+                        "x": sum(p.x for p in points),
+                        "ids": ids,
+                        "name": name,
+                    }
+        """)
+
+        body = b"""{
+            "points": [{"x": 1, "y": 2}, {"x": 3, "y": 4}],
+            "ids": [1, 2],
+            "name": "foo"
+        }"""
+
+        def handle():
+            request = c.create_request("/", "POST", body=body)
+            request.headers["Content-Type"] = "application/json"
+            request.headers["Content-Length"] = len(body)
+            return c.handle("/", "POST", request=request)
+
+        res = handle()
+        self.assertEqual(500, res.code)
+
+        with self.environ(ENDPOINTS_TYPED_REQUEST_BODY="1"):
+            res = handle()
+            self.assertEqual(200, res.code)
+            self.assertEqual(["Point", "Point"], res.body["points"])
+            self.assertEqual(4, res.body["x"])
+            self.assertEqual([1, 2], res.body["ids"])
+            self.assertEqual("foo", res.body["name"])
+
     def test_bad_typeerror(self):
         """There is a bug that is making the controller method throw a 404 when
         it should throw a 500"""
@@ -172,6 +225,16 @@ class ControllerTest(TestCase):
         res = c.handle("/")
         self.assertTrue("plain/text" in res.headers.get("Content-Type"))
 
+    def test_get_json_codec(self):
+        class Foo(ETL):
+            json_codec = None
+
+        codec = Foo.get_json_codec()
+        self.assertIsNotNone(codec)
+        self.assertIs(codec, Foo.get_json_codec())
+        self.assertIsNot(codec, ETL.get_json_codec())
+        self.assertIs(ETL.get_json_codec(), Controller.get_json_codec())
+
 
 class CORSMixinTest(TestCase):
     async def test_cors(self):
@@ -347,6 +410,96 @@ class RequestTest(TestCase):
         r.headers["accept"] = "*/*;version=v8"
         self.assertEqual("v8", r.version("application/json"))
 
+    def test_reset(self):
+        r = Request()
+        headers = r.headers
+        r.headers["Accept"] = "application/json"
+        r.method = "POST"
+        r.environ = {}
+        self.assertEqual("application/json", r.accept_media_type)
+
+        r.reset()
+        self.assertIs(headers, r.headers)
+        self.assertEqual(0, len(r.headers))
+        self.assertIsNone(r.method)
+        self.assertFalse(hasattr(r, "environ"))
+        self.assertEqual("", r.accept_media_type)
+
+        res = Response()
+        res.code = 200
+        res.body = "foo"
+        res.reset()
+        self.assertIsNone(res.code)
+        self.assertIsNone(res.body)
+
+    def test_reset_class_defaults(self):
+        class R(Response):
+            encoding = "latin-1"
+            code = 201
+
+        class Q(Request):
+            method = "GET"
+
+        res = R()
+        self.assertEqual("latin-1", res.encoding)
+        self.assertEqual(201, res.code)
+        self.assertIsNone(res.media_type)
+
+        res.code = 500
+        res.reset()
+        self.assertEqual(201, res.code)
+
+        self.assertEqual("GET", Q().method)
+        self.assertIsNone(Request().method)
+
+    def test_negotiate_media_type(self):
+        r = Request()
+        r.headers["accept"] = "text/html, application/json;q=0.9"
+        self.assertEqual("text/html", r.accept_media_type)
+        self.assertEqual(
+            "application/json",
+            r.negotiate_media_type(["image/png", "application/json"]),
+        )
+        self.assertEqual("", r.negotiate_media_type())
+
+
+class RequestBodyTest(TestCase):
+    async def create_chunks(self, *chunks):
+        for chunk in chunks:
+            yield chunk
+
+    async def test_read(self):
+        body = RequestBody(self.create_chunks(b"foo", b"", b"bar", b"che"))
+        self.assertEqual(b"foob", await body.read(4))
+        self.assertEqual(b"ar", await body.readchunk())
+        self.assertEqual(b"che", await body.read())
+        self.assertEqual(b"", await body.read())
+        self.assertEqual(b"", await body.read(10))
+
+    async def test_spool(self):
+        body = RequestBody(self.create_chunks(b"foo", b"bar"), spool_size=4)
+        fp = await body.spool()
+        self.assertTrue(fp._rolled)
+        self.assertEqual(b"foobar", fp.read())
+
+        body = RequestBody(self.create_chunks(b"foo", b"bar"))
+        fp = await body.spool()
+        self.assertFalse(fp._rolled)
+        self.assertEqual(b"foobar", fp.read())
+
+    async def test_max_size(self):
+        body = RequestBody(self.create_chunks(b"foo", b"bar"), max_size=6)
+        self.assertEqual(b"foobar", await body.read())
+
+        body = RequestBody(self.create_chunks(b"foo", b"bar"), max_size=5)
+        self.assertEqual(b"foo", await body.readchunk())
+        with self.assertRaises(CallError):
+            await body.read()
+
+        # the error should be raised on every read once the body is too big
+        with self.assertRaises(CallError):
+            await body.read(1)
+
 
 class ResponseTest(TestCase):
     def test_headers(self):
@@ -371,3 +524,20 @@ class ResponseTest(TestCase):
         r.code = 10000000
         self.assertEqual("UNKNOWN", r.status)
 
+    def test_get_file_path(self):
+        path = testdata.create_file("foobarche")
+
+        r = Response()
+        r.body = open(path, "rb")
+        self.assertEqual(path, r.get_file_path())
+
+        r.body.read(1)
+        self.assertEqual("", r.get_file_path())
+        r.body.close()
+
+        r.body = io.BytesIO(b"foobarche")
+        self.assertEqual("", r.get_file_path())
+
+        r.body = open(path, "r")
+        self.assertEqual("", r.get_file_path())
+        r.body.close()
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 import time
 import re
+import gzip
+import json
 
 import endpoints
 from endpoints.call import (
@@ -26,7 +28,9 @@ from endpoints.decorators.auth import (
 )
 from endpoints.decorators.call import (
     httpcache,
+    responsecache,
     nohttpcache,
+    compress,
 )
 
 from . import (
@@ -72,6 +76,18 @@ class TestCase(TestCase):
 
         return c
 
+    async def handle_request(self, server, path, method="GET", headers=None):
+        """Have server handle the request and return the response and the
+        encoded body"""
+        path, _, query = path.partition("?")
+        request = server.create_request(path, method)
+        request.query = query
+        request.headers.update(headers or {})
+        response = server.application.response_class()
+        controller = await server.application.handle(request, response)
+        body = b"".join([chunk async for chunk in controller])
+        return response, body
+
 
 class ControllerDecoratorTest(TestCase):
     async def test_async_handle(self):
@@ -155,8 +171,9 @@ class RateLimitTest(TestCase):
         :param ttl: int, the amount to rollback, so if you passed in 1 then
             it would rollback 1 second
         """
-        for call in method.__orig_decorator__._calls.values():
-            call["date"] -= ttl
+        store = method.__orig_decorator__.get_store()
+        clock = store.clock
+        store.clock = lambda: clock() + ttl
 
     async def test_lifecycle(self):
         class limit(RateLimitDecorator):
@@ -189,6 +206,80 @@ class RateLimitTest(TestCase):
             with self.assertRaises(CallError):
                 await c.foo()
 
+    async def test_no_limit(self):
+        class limit(RateLimitDecorator):
+            async def get_key(self, controller, method_args, method_kwargs):
+                return "bar"
+
+        for algorithm in ["fixed", "sliding", "token_bucket", "gcra"]:
+            class MockObject(object):
+                @limit(algorithm=algorithm)
+                async def foo(self):
+                    return 1
+
+                @limit(0, 60, algorithm=algorithm)
+                async def bar(self):
+                    return 2
+
+            c = MockObject()
+            for x in range(5):
+                self.assertEqual(1, await c.foo())
+                self.assertEqual(2, await c.bar())
+
+    async def test_mixed_algorithms(self):
+        class limit(RateLimitDecorator):
+            async def get_key(self, controller, method_args, method_kwargs):
+                return "u"
+
+        class MockObject(object):
+            @limit(10, 60, algorithm="gcra")
+            async def foo(self):
+                return 1
+
+            @limit(100, 3600, algorithm="fixed")
+            async def bar(self):
+                return 2
+
+            @limit(1, 3600, algorithm="fixed")
+            async def che(self):
+                return 3
+
+        c = MockObject()
+        self.assertEqual(1, await c.foo())
+        # each decorator keeps its own state for the same key
+        self.assertEqual(2, await c.bar())
+        self.assertEqual(3, await c.che())
+        self.assertEqual(2, await c.bar())
+        with self.assertRaises(CallError):
+            await c.che()
+
+
+    async def test_headers(self):
+        server = self.create_server("""
+            from endpoints.decorators import RateLimitDecorator
+
+            class limit(RateLimitDecorator):
+                async def get_key(self, controller, *args, **kwargs):
+                    return "foo"
+
+            class Default(Controller):
+                @limit(2, 60, algorithm="gcra")
+                def GET(self):
+                    return 1
+        """)
+
+        res, body = await self.handle_request(server, "/")
+        self.assertEqual("2", res.headers["RateLimit-Limit"])
+        self.assertEqual("1", res.headers["RateLimit-Remaining"])
+
+        res, body = await self.handle_request(server, "/")
+        self.assertEqual("0", res.headers["RateLimit-Remaining"])
+
+        res, body = await self.handle_request(server, "/")
+        self.assertEqual(429, res.code)
+        self.assertEqual("30", res.headers["Retry-After"])
+        self.assertEqual("0", res.headers["RateLimit-Remaining"])
+
 
 class AuthDecoratorTest(TestCase):
     async def test_bad_setup(self):
@@ -409,3 +500,354 @@ class CacheTest(TestCase):
         h = c.response.headers.get("Pragma", "")
         self.assertTrue("no-cache" in h)
 
+    async def test_etag(self):
+        server = self.create_server("""
+            calls = []
+
+            class Default(Controller):
+                @httpcache(60, etag=True)
+                def GET(self):
+                    calls.append(None)
+                    return {"foo": 1}
+
+                @httpcache(60, etag=True)
+                def POST(self):
+                    return {"foo": 1}
+
+            class Foo(Controller):
+                @httpcache(60, etag=True)
+                def GET(self):
+                    yield 1
+        """)
+
+        res, body = await self.handle_request(server, "/")
+        etag = res.headers["ETag"]
+        self.assertTrue(etag.startswith("\""))
+        self.assertEqual(b'{"foo":1}', body.replace(b" ", b""))
+
+        headers = {"If-None-Match": f"\"nope\", {etag}"}
+        res, body = await self.handle_request(server, "/", headers=headers)
+        self.assertEqual(304, res.code)
+        self.assertEqual(b"", body)
+        self.assertEqual(etag, res.headers["ETag"])
+        self.assertEqual("max-age=60", res.headers["Cache-Control"])
+
+        headers = {"If-None-Match": "\"nope\""}
+        res, body = await self.handle_request(server, "/", headers=headers)
+        self.assertEqual(200, res.code)
+        self.assertNotEqual(b"", body)
+
+        # only GET and HEAD are answered with a 304
+        headers = {"If-None-Match": etag}
+        res, body = await self.handle_request(
+            server,
+            "/",
+            method="POST",
+            headers=headers,
+        )
+        self.assertEqual(200, res.code)
+
+        # streamed bodies don't get an ETag
+        res, body = await self.handle_request(server, "/foo")
+        self.assertFalse("ETag" in res.headers)
+
+    async def test_etag_version(self):
+        server = self.create_server("""
+            calls = []
+
+            def get_version(controller, version):
+                return version
+
+            class Default(Controller):
+                @httpcache(60, etag=get_version)
+                def GET(self, version):
+                    calls.append(None)
+                    return len(calls)
+        """)
+
+        res, body = await self.handle_request(server, "/?version=1")
+        self.assertEqual(b"1", body)
+        etag = res.headers["ETag"]
+
+        # the method isn't called when the client has the version
+        headers = {"If-None-Match": etag}
+        res, body = await self.handle_request(
+            server,
+            "/?version=1",
+            headers=headers,
+        )
+        self.assertEqual(304, res.code)
+        self.assertEqual(b"", body)
+
+        res, body = await self.handle_request(
+            server,
+            "/?version=2",
+            headers=headers,
+        )
+        self.assertEqual(b"2", body)
+        self.assertNotEqual(etag, res.headers["ETag"])
+
+    async def test_last_modified(self):
+        server = self.create_server("""
+            import datetime
+
+            def get_modified(controller):
+                return datetime.datetime(2024, 1, 2, 3, 4, 5)
+
+            class Default(Controller):
+                @httpcache(60, last_modified=get_modified)
+                async def GET(self):
+                    return 1
+        """)
+
+        res, body = await self.handle_request(server, "/")
+        modified = res.headers["Last-Modified"]
+        self.assertEqual("Tue, 02 Jan 2024 03:04:05 GMT", modified)
+
+        headers = {"If-Modified-Since": modified}
+        res, body = await self.handle_request(server, "/", headers=headers)
+        self.assertEqual(304, res.code)
+
+        headers = {"If-Modified-Since": "Mon, 01 Jan 2024 03:04:05 GMT"}
+        res, body = await self.handle_request(server, "/", headers=headers)
+        self.assertEqual(200, res.code)
+
+    async def test_etag_file(self):
+        path = testdata.create_file("foo bar", ext="txt")
+        server = self.create_server(f"""
+            class Default(Controller):
+                @httpcache(60, etag=True)
+                def GET(self):
+                    return open("{path}", "rb")
+        """)
+
+        res, body = await self.handle_request(server, "/")
+        self.assertEqual(b"foo bar", body)
+        self.assertTrue("Last-Modified" in res.headers)
+
+        headers = {"If-None-Match": res.headers["ETag"]}
+        res, body = await self.handle_request(server, "/", headers=headers)
+        self.assertEqual(304, res.code)
+        self.assertEqual(b"", body)
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        # every test gets a new shared store
+        responsecache.store = None
+
+    async def test_cache(self):
+        server = self.create_server("""
+            calls = []
+
+            class Default(Controller):
+                @responsecache(60, vary=["Accept-Language"])
+                def GET(self, **kwargs):
+                    calls.append(kwargs)
+                    self.response.headers["X-Calls"] = str(len(calls))
+                    return {"calls": len(calls), **kwargs}
+
+                @responsecache(60)
+                def POST(self):
+                    calls.append(None)
+                    return len(calls)
+        """)
+        res, body = await self.handle_request(server, "/?foo=1&bar=2")
+        self.assertEqual(1, json.loads(body)["calls"])
+        self.assertFalse("Age" in res.headers)
+
+        # the query order doesn't matter
+        res, body2 = await self.handle_request(server, "/?bar=2&foo=1")
+        self.assertEqual(body, body2)
+        self.assertEqual(200, res.code)
+        self.assertEqual("1", res.headers["X-Calls"])
+        self.assertEqual("0", res.headers["Age"])
+        self.assertEqual(str(len(body)), res.headers["Content-Length"])
+        self.assertTrue(res.headers["Content-Type"].startswith(
+            "application/json"
+        ))
+
+        res, body = await self.handle_request(server, "/?foo=2")
+        self.assertEqual(2, json.loads(body)["calls"])
+
+        # vary headers are part of the key
+        headers = {"Accept-Language": "fr"}
+        res, body = await self.handle_request(server, "/?foo=2", headers=headers)
+        self.assertEqual(3, json.loads(body)["calls"])
+        res, body = await self.handle_request(server, "/?foo=2", headers=headers)
+        self.assertEqual(3, json.loads(body)["calls"])
+
+        # only GET and HEAD are cached
+        res, body = await self.handle_request(server, "/", method="POST")
+        res, body = await self.handle_request(server, "/", method="POST")
+        self.assertEqual(b"5", body)
+
+        self.assertEqual(3, len(responsecache.store))
+
+    async def test_stale(self):
+        server = self.create_server("""
+            calls = []
+
+            class Default(Controller):
+                @responsecache(60, stale=60)
+                def GET(self):
+                    calls.append(None)
+                    return len(calls)
+        """)
+        res, body = await self.handle_request(server, "/")
+        self.assertEqual(b"1", body)
+
+        cached = responsecache.store.get(("GET", "/", (), ()))
+        cached.expires = time.monotonic() - 1
+        self.assertFalse(cached.is_fresh(time.monotonic()))
+        self.assertTrue(cached.is_stale(time.monotonic()))
+
+        # while the stale response is refreshed it is still sent
+        cached.revalidating = True
+        res, body = await self.handle_request(server, "/")
+        self.assertEqual(b"1", body)
+
+        # this request refreshes the response
+        cached.revalidating = False
+        res, body = await self.handle_request(server, "/")
+        self.assertEqual(b"2", body)
+
+        res, body = await self.handle_request(server, "/")
+        self.assertEqual(b"2", body)
+
+    async def test_not_cacheable(self):
+        server = self.create_server("""
+            calls = []
+
+            class Default(Controller):
+                @responsecache(60)
+                def GET(self):
+                    calls.append(None)
+                    if len(calls) == 1:
+                        raise ValueError()
+                    self.response.headers["Set-Cookie"] = "foo=1"
+                    return len(calls)
+
+            class Foo(Controller):
+                @responsecache(60)
+                def GET(self):
+                    calls.append(None)
+                    yield len(calls)
+        """)
+        res, body = await self.handle_request(server, "/")
+        self.assertEqual(500, res.code)
+
+        res, body = await self.handle_request(server, "/")
+        self.assertEqual(b"2", body)
+
+        res, body = await self.handle_request(server, "/foo")
+        res, body = await self.handle_request(server, "/foo")
+        self.assertEqual(b"[4]", body)
+
+        self.assertEqual(0, len(responsecache.store))
+
+    async def test_headers(self):
+        server = self.create_server("""
+            from endpoints.decorators import RateLimitDecorator
+
+            class limit(RateLimitDecorator):
+                async def get_key(self, controller, *args, **kwargs):
+                    return "foo"
+
+            class Default(Controller):
+                @limit(10, 60)
+                @responsecache(60, vary=["Accept-Language"])
+                def GET(self):
+                    self.response.headers["X-Foo"] = "1"
+                    return 1
+        """)
+        for remaining in ["9", "8", "7"]:
+            res, body = await self.handle_request(server, "/")
+            self.assertEqual(remaining, res.headers["RateLimit-Remaining"])
+            self.assertEqual("1", res.headers["X-Foo"])
+            self.assertEqual("Accept-Language", res.headers["Vary"])
+
+        cached = responsecache.store.get(("GET", "/", (), ("",)))
+        names = set(name.lower() for name, _ in cached.headers)
+        self.assertTrue("x-foo" in names)
+        self.assertFalse("ratelimit-remaining" in names)
+
+    async def test_compress(self):
+        server = self.create_server("""
+            class Default(Controller):
+                @compress(min_size=100)
+                @responsecache(60)
+                def GET(self) -> str:
+                    return "x" * 1000
+        """)
+        res, body = await self.handle_request(server, "/")
+        self.assertFalse("Content-Encoding" in res.headers)
+
+        headers = {"Accept-Encoding": "gzip"}
+        res, body = await self.handle_request(server, "/", headers=headers)
+        self.assertEqual("gzip", res.headers["Content-Encoding"])
+        self.assertFalse("Content-Length" in res.headers)
+        self.assertEqual(b"x" * 1000, gzip.decompress(body))
+
+
+class CompressTest(TestCase):
+    async def handle(self, server, path, headers=None):
+        request = server.create_request(path, "GET")
+        request.headers.update(headers or {})
+        response = server.application.response_class()
+        controller = await server.application.handle(request, response)
+        body = b"".join([chunk async for chunk in controller])
+        return response, body
+
+    async def test_compress(self):
+        server = self.create_server("""
+            class Default(Controller):
+                @compress(min_size=100)
+                def GET(self, size: int) -> str:
+                    return "x" * size
+
+            class Foo(Controller):
+                @compress(min_size=100)
+                def GET(self) -> bytes:
+                    return b"x" * 1000
+        """)
+        headers = {"Accept-Encoding": "gzip, deflate"}
+
+        res, body = await self.handle(server, "/1000", headers=headers)
+        self.assertEqual("gzip", res.headers["Content-Encoding"])
+        self.assertEqual("Accept-Encoding", res.headers["Vary"])
+        self.assertEqual(b"x" * 1000, gzip.decompress(body))
+
+        # too small to compress
+        res, body = await self.handle(server, "/10", headers=headers)
+        self.assertFalse("Content-Encoding" in res.headers)
+        self.assertEqual(b"x" * 10, body)
+
+        # client doesn't accept gzip
+        res, body = await self.handle(server, "/1000")
+        self.assertFalse("Content-Encoding" in res.headers)
+        self.assertEqual("Accept-Encoding", res.headers["Vary"])
+        self.assertEqual(b"x" * 1000, body)
+
+        # octet-stream isn't in the allowed media types
+        res, body = await self.handle(server, "/foo", headers=headers)
+        self.assertFalse("Content-Encoding" in res.headers)
+        self.assertFalse("Vary" in res.headers)
+
+    async def test_compress_environ(self):
+        server = self.create_server("""
+            class Default(Controller):
+                def GET(self):
+                    for x in range(500):
+                        yield {"x": x}
+        """)
+        headers = {"Accept-Encoding": "gzip"}
+
+        res, body = await self.handle(server, "/", headers=headers)
+        self.assertFalse("Content-Encoding" in res.headers)
+
+        with self.environ(ENDPOINTS_COMPRESS_RESPONSE="1"):
+            res, body = await self.handle(server, "/", headers=headers)
+            self.assertEqual("gzip", res.headers["Content-Encoding"])
+            self.assertEqual(500, len(json.loads(gzip.decompress(body))))
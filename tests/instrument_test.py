@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+from endpoints.compat import *
+from endpoints.instrument import Timer
+
+from . import TestCase
+
+
+class TimerTest(TestCase):
+    def test_get_timings(self):
+        timer = Timer()
+        timer.intervals = [
+            ("foo", 0.0, 1.0, 1.0),
+            ("bar", 1.0, 6.0, 5.0),
+            ("che", 2.0, 4.0, 2.0),
+            ("baz", 2.5, 3.0, 0.5),
+            ("boo", 4.0, 5.0, 1.0),
+        ]
+
+        self.assertEqual(
+            [
+                ("foo", 1.0),
+                ("bar", 2.0),
+                ("che", 1.5),
+                ("baz", 0.5),
+                ("boo", 1.0),
+            ],
+            timer.get_timings(),
+        )
+
+    async def test_time_chunks(self):
+        async def chunks():
+            yield b"foo"
+            yield b"bar"
+
+        timer = Timer()
+        self.assertEqual(
+            [b"foo", b"bar"],
+            [c async for c in timer.time_chunks("foo", chunks())],
+        )
+        self.assertEqual("foo", timer.get_timings()[0][0])
+        self.assertEqual(6, timer.size)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import json
 import zipfile
+from http.client import HTTPConnection
 
 import testdata
 
@@ -220,6 +221,73 @@ class _HTTPTestCase(TestCase):
         self.assertEqual(200, r.code)
         self.assertEqual("hello world", r.body)
 
+    def test_post_body_chunked(self):
+        server = self.create_server("""
+            class Default(Controller):
+                def POST(self, *args, **kwargs):
+                    return {
+                        "args": args,
+                        "kwargs": {
+                            k: getattr(v, "filename", v)
+                            for k, v in kwargs.items()
+                        },
+                    }
+        """)
+
+        def post(chunks, content_type):
+            u = Url(self.server.host)
+            conn = HTTPConnection(u.hostname, u.port)
+            try:
+                conn.request(
+                    "POST",
+                    "/",
+                    body=iter(chunks),
+                    headers={
+                        "Content-Type": content_type,
+                        "Transfer-Encoding": "chunked",
+                    },
+                    encode_chunked=True,
+                )
+                res = conn.getresponse()
+                return res.status, json.loads(res.read())
+
+            finally:
+                conn.close()
+
+        code, body = post(
+            [b'{"foo": 1, ', b'"bar": ', b'"two"}'],
+            "application/json",
+        )
+        self.assertEqual(200, code)
+        self.assertEqual({"foo": 1, "bar": "two"}, body["kwargs"])
+
+        code, body = post(
+            [
+                b"--xyz\r\nContent-Disposition: form-data; name=\"foo\"\r\n",
+                b"\r\nvalue-foo\r\n--xyz\r\nContent-Disposition: form-data;",
+                b" name=\"file\"; filename=\"che.txt\"\r\n\r\nfile body\r\n",
+                b"--xyz--\r\n",
+            ],
+            "multipart/form-data; boundary=xyz",
+        )
+        self.assertEqual(200, code)
+        self.assertEqual(
+            {"foo": "value-foo", "file": "che.txt"},
+            body["kwargs"],
+        )
+
+        # a truncated upload is rejected instead of passing a partial part
+        # to the controller
+        code, body = post(
+            [
+                b"--xyz\r\nContent-Disposition: form-data; name=\"foo\"\r\n",
+                b"\r\nvalue-foo\r\n--xyz\r\nContent-Disposition: form-data;",
+                b" name=\"file\"; filename=\"che.txt\"\r\n\r\nfile bo",
+            ],
+            "multipart/form-data; boundary=xyz",
+        )
+        self.assertEqual(400, code)
+
     def test_post_body_plain_with_content_type(self):
         server = self.create_server(contents=[
             "class Default(Controller):",
@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 from threading import Thread
 import asyncio
+import json
 import time
 
+import testdata
 import uvicorn
 
-from . import _HTTPTestCase, _WebSocketTestCase, Server
+from . import _HTTPTestCase, _WebSocketTestCase, Server, TestCase
 
 
 class Server(Server):
@@ -46,3 +48,307 @@ class HTTPTest(_HTTPTestCase):
 class WebSocketTest(_WebSocketTestCase):
     server_class = Server
 
+
+
+class InterfaceTest(TestCase):
+    """Drives the ASGI interface directly instead of through a server"""
+    async def handle_http(self, server, path, method="GET", **kwargs):
+        chunks = list(kwargs.get("body_chunks", [b""]))
+        sent = []
+
+        async def receive():
+            chunk = chunks.pop(0)
+            return {
+                "type": "http.request",
+                "body": chunk,
+                "more_body": bool(chunks),
+            }
+
+        async def send(d):
+            sent.append(d)
+
+        headers = [
+            (bytes(k, "utf-8"), bytes(v, "utf-8"))
+            for k, v in kwargs.get("headers", {}).items()
+        ]
+
+        interface = kwargs.get("interface", None)
+        if interface is None:
+            interface = server.application.create_asgi_interface()
+
+        await interface(
+            {
+                "type": "http",
+                "http_version": "1.1",
+                "method": method,
+                "path": path,
+                "query_string": b"",
+                "server": ("localhost", 4000),
+                "headers": headers,
+                "extensions": kwargs.get("extensions", {}),
+            },
+            receive,
+            send,
+        )
+
+        return sent
+
+    async def test_stream_request_body(self):
+        server = self.create_server("""
+            class Default(Controller):
+                def POST(self, *args, **kwargs):
+                    return {
+                        "positionals": len(args),
+                        "file": args[0].read().decode() if args else "",
+                        "keywords": kwargs,
+                    }
+        """)
+
+        with self.environ(ENDPOINTS_STREAM_REQUEST_BODY="1"):
+            sent = await self.handle_http(
+                server,
+                "/",
+                "POST",
+                body_chunks=[b'{"foo":', b' 1, "bar"', b': 2}'],
+                headers={"content-type": "application/json"},
+            )
+            self.assertEqual(200, sent[0]["status"])
+            body = json.loads(sent[1]["body"])
+            self.assertEqual(0, body["positionals"])
+            self.assertEqual({"foo": 1, "bar": 2}, body["keywords"])
+
+            sent = await self.handle_http(
+                server,
+                "/",
+                "POST",
+                body_chunks=[b"foo", b"bar", b"che"],
+                headers={"content-type": "application/octet-stream"},
+            )
+            self.assertEqual(200, sent[0]["status"])
+            self.assertEqual(
+                "foobarche",
+                json.loads(sent[1]["body"])["file"],
+            )
+
+    async def test_buffered_request_body(self):
+        server = self.create_server("""
+            class Default(Controller):
+                def POST(self, **kwargs):
+                    return kwargs
+        """)
+
+        sent = await self.handle_http(
+            server,
+            "/",
+            "POST",
+            body_chunks=[b'{"foo":', b' 1}'],
+            headers={"content-type": "application/json"},
+        )
+        self.assertEqual({"foo": 1}, json.loads(sent[1]["body"]))
+
+    async def test_max_request_body_size(self):
+        server = self.create_server("""
+            class Default(Controller):
+                def POST(self, **kwargs):
+                    return kwargs
+        """)
+
+        with self.environ(ENDPOINTS_MAX_REQUEST_BODY_SIZE="10"):
+            for stream in ["0", "1"]:
+                with self.environ(ENDPOINTS_STREAM_REQUEST_BODY=stream):
+                    sent = await self.handle_http(
+                        server,
+                        "/",
+                        "POST",
+                        body_chunks=[b'{"foo":', b' "barche"}'],
+                        headers={
+                            "content-type": "application/json",
+                            "transfer-encoding": "chunked",
+                        },
+                    )
+                    self.assertEqual(413, sent[0]["status"])
+
+            sent = await self.handle_http(
+                server,
+                "/",
+                "POST",
+                body_chunks=[b'{"foo": 1}'],
+                headers={
+                    "content-type": "application/json",
+                    "content-length": "10",
+                },
+            )
+            self.assertEqual(200, sent[0]["status"])
+
+    async def test_stream_response_iterators(self):
+        server = self.create_server("""
+            class Foo(Controller):
+                def GET(self):
+                    for x in range(3):
+                        yield {"x": x}
+
+            class Bar(Controller):
+                async def GET(self) -> Annotated[
+                    AsyncIterator[dict],
+                    "application/x-ndjson",
+                ]:
+                    for x in range(3):
+                        yield {"x": x}
+
+            class Che(Controller):
+                async def GET(self) -> Annotated[AsyncIterator, "text/plain"]:
+                    yield "foo"
+                    yield b"bar"
+                    yield 1
+
+            class Empty(Controller):
+                async def GET(self):
+                    for x in []:
+                        yield x
+        """)
+
+        sent = await self.handle_http(server, "/foo")
+        bodies = [d["body"] for d in sent[1:] if d["body"]]
+        # each item is sent as it is produced, then the closing bracket
+        self.assertEqual(4, len(bodies))
+        self.assertEqual(
+            [{"x": 0}, {"x": 1}, {"x": 2}],
+            json.loads(b"".join(bodies)),
+        )
+
+        sent = await self.handle_http(server, "/bar")
+        headers = dict(sent[0]["headers"])
+        self.assertTrue(b"application/x-ndjson" in headers[b"content-type"])
+        bodies = [d["body"] for d in sent[1:] if d["body"]]
+        self.assertEqual(
+            [b'{"x":0}\n', b'{"x":1}\n', b'{"x":2}\n'],
+            bodies,
+        )
+
+        sent = await self.handle_http(server, "/che")
+        bodies = [d["body"] for d in sent[1:] if d["body"]]
+        self.assertEqual([b"foo", b"bar", b"1"], bodies)
+
+        sent = await self.handle_http(server, "/empty")
+        self.assertEqual([], json.loads(sent[1]["body"]))
+
+    async def test_pathsend(self):
+        path = testdata.create_file("foobarche")
+        server = self.create_server(f"""
+            from endpoints.utils import ResponseCache
+
+            class Default(Controller):
+                def GET(self):
+                    return open("{path}", "rb")
+
+            class Cached(Controller):
+                @responsecache(60, store=ResponseCache())
+                def GET(self):
+                    return open("{path}", "rb")
+        """)
+
+        sent = await self.handle_http(
+            server,
+            "/",
+            extensions={"http.response.pathsend": {}},
+        )
+        self.assertEqual(200, sent[0]["status"])
+        self.assertEqual(
+            {"type": "http.response.pathsend", "path": path},
+            sent[1],
+        )
+
+        sent = await self.handle_http(server, "/")
+        self.assertEqual(
+            b"foobarche",
+            b"".join(d["body"] for d in sent[1:]),
+        )
+
+        # the body has to go through the chunk wrappers so it can be cached
+        for _ in range(2):
+            sent = await self.handle_http(
+                server,
+                "/cached",
+                extensions={"http.response.pathsend": {}},
+            )
+            self.assertEqual(
+                b"foobarche",
+                b"".join(d.get("body", b"") for d in sent[1:]),
+            )
+
+        # the second request was answered from the cache
+        self.assertTrue(b"age" in dict(sent[0]["headers"]))
+
+    async def test_collector(self):
+        from endpoints.decorators import httpcache
+        from endpoints.instrument import Collector
+
+        server = self.create_server("""
+            from endpoints.decorators import httpcache
+
+            class Default(Controller):
+                @httpcache(60)
+                def GET(self, *args):
+                    return list(range(10))
+        """)
+
+        collected = []
+        class C(Collector):
+            def collect(self, request, response, timer):
+                collected.append((response.code, timer.get_timings()))
+
+        server.application.collector = C()
+        sent = await self.handle_http(server, "/")
+        self.assertEqual(200, sent[0]["status"])
+
+        code, timings = collected[0]
+        self.assertEqual(200, code)
+        self.assertEqual(
+            [
+                "routing",
+                "decode",
+                "bind",
+                "handler",
+                "decorator.httpcache",
+                "media_type",
+                "encode",
+            ],
+            [stage for stage, duration in timings],
+        )
+        self.assertTrue(all(duration >= 0 for stage, duration in timings))
+
+        server.application.collector = None
+        sent = await self.handle_http(server, "/")
+        self.assertEqual(1, len(collected))
+
+    async def test_call_pool(self):
+        server = self.create_server("""
+            class Default(Controller):
+                def GET(self, *args):
+                    if args:
+                        self.response.headers["X-Foo"] = "1"
+                        self.response.code = 201
+                    return args
+        """)
+
+        with self.environ(ENDPOINTS_CALL_POOL_SIZE="2"):
+            interface = server.application.create_asgi_interface()
+
+        sent = await self.handle_http(
+            server,
+            "/foo",
+            interface=interface,
+        )
+        self.assertEqual(201, sent[0]["status"])
+
+        sent = await self.handle_http(server, "/", interface=interface)
+        self.assertEqual(200, sent[0]["status"])
+        self.assertFalse(
+            any(k == b"x-foo" for k, v in sent[0]["headers"])
+        )
+        self.assertEqual([], json.loads(sent[1]["body"]))
+
+        info = interface.request_pool.info()
+        self.assertEqual(1, info["created"])
+        self.assertEqual(1, info["reused"])
+        self.assertEqual(1, interface.response_pool.info()["reused"])
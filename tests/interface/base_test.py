@@ -770,3 +770,81 @@ class RouterTest(TestCase):
         rm = request.pathfinder_value["reflect_method"]
         self.assertEqual("/foo/bar", rm.get_url_path())
 
+
+    def test_route_table(self):
+        s = self.create_server("""
+            class Default(Controller):
+                def GET(self, *args): pass
+
+            class FooBar(Controller):
+                def GET(self): pass
+                def POST_che(self, baz): pass
+                def ANY(self): pass
+        """)
+
+        rt = s.application.route_table
+
+        node, positionals = rt.find("GET", "/foo-bar")
+        self.assertEqual("GET", node.value["method_name"])
+        self.assertEqual([], positionals)
+
+        node, positionals = rt.find("GET", "/foo_bar/")
+        self.assertEqual("GET", node.value["method_name"])
+        self.assertEqual([], positionals)
+
+        node, positionals = rt.find("PUT", "/foo-bar")
+        self.assertEqual("ANY", node.value["method_name"])
+
+        node, positionals = rt.find("POST", "/foo-bar/che/1")
+        self.assertEqual("POST_che", node.value["method_name"])
+        self.assertEqual(["1"], positionals)
+
+        node, positionals = rt.find("GET", "/foo-bar/che/1")
+        self.assertIsNone(node)
+        self.assertEqual(["1"], positionals)
+
+        node, positionals = rt.find("GET", "/bar/che")
+        self.assertEqual("GET", node.value["method_name"])
+        self.assertEqual(["bar", "che"], positionals)
+
+        node, positionals = rt.find("GET", "/")
+        self.assertEqual("GET", node.value["method_name"])
+        self.assertEqual([], positionals)
+
+    def test_route_cache(self):
+        s = self.create_server("""
+            class Foo(Controller):
+                def GET(self, *args): pass
+        """)
+
+        route_cache = s.application.route_cache
+        route_cache.clear()
+
+        request = s.get_request("/foo/bar")
+        self.assertEqual(["bar"], request.path_positionals)
+        self.assertEqual(1, route_cache.misses)
+
+        request = s.get_request("/foo/bar")
+        self.assertEqual(["bar"], request.path_positionals)
+        self.assertEqual(1, route_cache.hits)
+
+        request.path_positionals.append("che")
+        request = s.get_request("/foo/bar")
+        self.assertEqual(["bar"], request.path_positionals)
+
+        for _ in range(2):
+            with self.assertRaises(CallError):
+                s.get_request("/foo/bar", "POST")
+        self.assertEqual(2, route_cache.info()["misses"])
+        self.assertEqual(3, route_cache.info()["hits"])
+
+    def test_route_cache_disabled(self):
+        s = self.create_server("""
+            class Foo(Controller):
+                def GET(self, *args): pass
+        """)
+        a = self.create_application(
+            [s.controller_prefix],
+            route_cache_size=0,
+        )
+        self.assertIsNone(a.route_cache)
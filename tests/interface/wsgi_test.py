@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
+import io
 from threading import Thread
 import time
 from wsgiref.simple_server import make_server
+from wsgiref.util import FileWrapper
 
-from . import _HTTPTestCase, Server
+import testdata
+
+from endpoints.exception import CallError
+from endpoints.interface.wsgi import ResponseIterator
+
+from . import _HTTPTestCase, Server, TestCase
 
 
 class Server(Server):
@@ -35,3 +42,118 @@ class Server(Server):
 class HTTPTest(_HTTPTestCase):
     server_class = Server
 
+
+class InterfaceTest(TestCase):
+    async def test_recv_chunked_body(self):
+        server = self.create_server("""
+            class Default(Controller):
+                pass
+        """)
+        interface = server.application.create_wsgi_interface()
+
+        fp = io.BytesIO(
+            b"3\r\nfoo\r\n"
+            b"6;ext=1\r\nbarche\r\n"
+            b"0\r\n"
+            b"Trailer: value\r\n"
+            b"\r\n"
+        )
+        chunks = [chunk async for chunk in interface.recv_chunked_body(fp)]
+        self.assertEqual([b"foo", b"barche"], chunks)
+        self.assertEqual(b"", fp.read())
+
+        bodies = [
+            # truncated chunk
+            b"6\r\nfoo",
+            # bad size line
+            b"zz\r\nfoo\r\n0\r\n\r\n",
+            # chunk data longer than its size
+            b"2\r\nfoo\r\n0\r\n\r\n",
+        ]
+        for body in bodies:
+            fp = io.BytesIO(body)
+            with self.assertRaises(CallError) as cm:
+                [chunk async for chunk in interface.recv_chunked_body(fp)]
+            self.assertEqual(400, cm.exception.code)
+
+    def create_environ(self, path="/", method="GET", **kwargs):
+        environ = {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "QUERY_STRING": "",
+            "HTTP_HOST": "localhost:4000",
+            "wsgi.input": io.BytesIO(b""),
+        }
+        environ.update(kwargs)
+        return environ
+
+    def test_stream_response_body(self):
+        server = self.create_server("""
+            class Default(Controller):
+                def GET(self):
+                    self.response.headers["content-type"] = "text/plain"
+                    return io.StringIO("foobarche")
+        """)
+        interface = server.application.create_wsgi_interface()
+
+        started = []
+        def start_response(status, headers):
+            started.append(status)
+
+        # the whole body is collected by default
+        chunks = interface(self.create_environ(), start_response)
+        self.assertEqual([b"foobarche"], chunks)
+
+        started.clear()
+        with self.environ(ENDPOINTS_WSGI_STREAM_RESPONSE_BODY="1"):
+            chunks = interface(self.create_environ(), start_response)
+            # the response is started before the body is iterated
+            self.assertEqual(["200 OK"], started)
+            self.assertIsInstance(chunks, ResponseIterator)
+            self.assertEqual(b"foobarche", b"".join(chunks))
+            chunks.close()
+
+    def test_stream_response_file_wrapper(self):
+        path = testdata.create_file("foobarche")
+        server = self.create_server(f"""
+            from endpoints.utils import ResponseCache
+
+            class Default(Controller):
+                def GET(self):
+                    return open("{path}", "rb")
+
+            class Cached(Controller):
+                @responsecache(60, store=ResponseCache())
+                def GET(self):
+                    return open("{path}", "rb")
+        """)
+        interface = server.application.create_wsgi_interface()
+
+        sent = []
+        def start_response(status, headers):
+            sent.append(dict((k.lower(), v) for k, v in headers))
+
+        environ = self.create_environ(**{"wsgi.file_wrapper": FileWrapper})
+        with self.environ(ENDPOINTS_WSGI_STREAM_RESPONSE_BODY="1"):
+            chunks = interface(environ, start_response)
+            self.assertIsInstance(chunks, FileWrapper)
+            self.assertEqual(b"foobarche", b"".join(chunks))
+            chunks.close()
+
+            # the body has to go through the chunk wrappers so it can be
+            # cached
+            environ = self.create_environ(
+                "/cached",
+                **{"wsgi.file_wrapper": FileWrapper},
+            )
+            chunks = interface(environ, start_response)
+            self.assertNotIsInstance(chunks, FileWrapper)
+            self.assertEqual(b"foobarche", b"".join(chunks))
+            chunks.close()
+
+            chunks = interface(environ, start_response)
+            self.assertEqual(b"foobarche", b"".join(chunks))
+            chunks.close()
+
+            # the second request was answered from the cache
+            self.assertTrue("age" in sent[-1])
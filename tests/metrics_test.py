@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import io
+
+from endpoints.compat import *
+from endpoints.metrics import Histogram, MetricsCollector
+
+from . import TestCase
+
+
+class HistogramTest(TestCase):
+    def test_observe(self):
+        h = Histogram([1, 5])
+        for v in [0.5, 1, 3, 10]:
+            h.observe(v)
+
+        self.assertEqual([2, 1, 1], h.counts)
+        self.assertEqual(14.5, h.sum)
+        self.assertEqual(4, h.count)
+
+
+class MetricsCollectorTest(TestCase):
+    def handle(self, interface, path):
+        started = []
+        def start_response(status, headers):
+            started.append(status)
+
+        chunks = interface(
+            {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": "",
+                "HTTP_HOST": "localhost:4000",
+                "wsgi.input": io.BytesIO(b""),
+            },
+            start_response,
+        )
+        body = b"".join(chunks)
+        if close := getattr(chunks, "close", None):
+            close()
+
+        return started[0], body
+
+    def test_export(self):
+        server = self.create_server("""
+            from endpoints.metrics import MetricsController
+
+            class Default(Controller):
+                def GET(self):
+                    return "foo"
+
+            class Metrics(MetricsController):
+                pass
+        """)
+        interface = server.application.create_wsgi_interface()
+
+        status, body = self.handle(interface, "/metrics")
+        self.assertTrue(status.startswith("404"))
+
+        server.application.collector = MetricsCollector()
+        self.handle(interface, "/")
+        self.handle(interface, "/")
+        self.handle(interface, "/foo/bar")
+
+        status, body = self.handle(interface, "/metrics")
+        self.assertTrue(status.startswith("200"))
+        body = body.decode()
+
+        self.assertTrue("endpoints_requests_in_flight 1\n" in body)
+        self.assertRegex(
+            body,
+            r"endpoints_requests_total\{handler=\"[^\"]+Default.GET\","
+            r"method=\"GET\",status=\"200\"\} 2\n",
+        )
+        self.assertRegex(
+            body,
+            r"endpoints_request_errors_total\{handler=\"[^\"]+Default.GET\","
+            r"method=\"GET\",status=\"404\"\} 1\n",
+        )
+        self.assertRegex(
+            body,
+            r"endpoints_request_duration_seconds_bucket\{[^}]+status=\"200\","
+            r"le=\"\+Inf\"\} 2\n",
+        )
+        self.assertRegex(
+            body,
+            r"endpoints_response_size_bytes_sum\{[^}]+status=\"200\"\} 6.0\n",
+        )
+        self.assertTrue(
+            "endpoints_stage_duration_seconds_count{stage=\"handler\"} 2\n"
+            in body
+        )
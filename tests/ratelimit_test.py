@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+import os
+import multiprocessing
+
+from endpoints.compat import *
+from endpoints.ratelimit import (
+    RateLimitAlgorithm,
+    FixedWindow,
+    SlidingWindow,
+    TokenBucket,
+    GCRA,
+    MemoryStore,
+    SharedMemoryStore,
+    SQLiteStore,
+)
+
+from . import TestCase, testdata
+
+
+def count(state, now):
+    """Update callback that counts how many times the key was updated"""
+    c = state[0] + 1 if state else 1
+    return (c, now, 0.0), 60, c
+
+
+def count_shared(path, key, n):
+    store = SharedMemoryStore(path)
+    for _ in range(n):
+        store.update(key, count)
+
+
+class RateLimitAlgorithmTest(TestCase):
+    def check(self, algorithm, times, state=None):
+        """Check a request at each time in times
+
+        :returns: the allowed values and the last state and result
+        """
+        allowed = []
+        for now in times:
+            state, keep, result = algorithm.check(state, now)
+            allowed.append(result.allowed)
+
+        return allowed, state, result
+
+    def test_find_class(self):
+        self.assertIs(GCRA, RateLimitAlgorithm.find_class("GCRA"))
+        with self.assertRaises(ValueError):
+            RateLimitAlgorithm.find_class("foo")
+
+    def test_fixed(self):
+        a = FixedWindow(3, 10)
+        allowed, state, result = self.check(a, [0, 1, 2, 3])
+        self.assertEqual([True, True, True, False], allowed)
+        self.assertEqual(7, result.retry_after)
+        self.assertEqual(0, result.remaining)
+
+        # the window started with the first request
+        allowed, state, result = self.check(a, [10, 11], state)
+        self.assertEqual([True, True], allowed)
+        self.assertEqual(1, result.remaining)
+
+    def test_sliding(self):
+        a = SlidingWindow(4, 10)
+        allowed, state, result = self.check(a, [0, 1, 2, 3, 4])
+        self.assertEqual([True, True, True, True, False], allowed)
+        self.assertEqual(6, result.retry_after)
+
+        # half the previous window still counts
+        allowed, state, result = self.check(a, [15, 15, 15], state)
+        self.assertEqual([True, True, False], allowed)
+        self.assertAlmostEqual(2.5, result.retry_after)
+
+        allowed, state, result = self.check(a, [17.5], state)
+        self.assertEqual([True], allowed)
+
+    def test_token_bucket(self):
+        a = TokenBucket(10, 10, burst=2)
+        allowed, state, result = self.check(a, [0, 0, 0])
+        self.assertEqual([True, True, False], allowed)
+        self.assertEqual(1, result.retry_after)
+        self.assertEqual(2, result.reset)
+
+        allowed, state, result = self.check(a, [1, 1], state)
+        self.assertEqual([True, False], allowed)
+
+    def test_gcra(self):
+        a = GCRA(10, 10, burst=2)
+        allowed, state, result = self.check(a, [0, 0, 0])
+        self.assertEqual([True, True, False], allowed)
+        self.assertEqual(1, result.retry_after)
+        self.assertEqual(2, result.reset)
+
+        allowed, state, result = self.check(a, [1, 1], state)
+        self.assertEqual([True, False], allowed)
+
+        allowed, state, result = self.check(GCRA(5, 10), [0])
+        self.assertEqual(4, result.remaining)
+
+    def test_burst(self):
+        for burst in [0, -1]:
+            with self.assertRaises(ValueError):
+                GCRA(3, 60, burst=burst)
+
+        a = GCRA(3, 60, burst=1)
+        allowed, state, result = self.check(a, [0, 0])
+        self.assertEqual([True, False], allowed)
+
+    def test_headers(self):
+        a = FixedWindow(1, 10)
+        state, keep, result = a.check(None, 0)
+        headers = result.get_headers()
+        self.assertEqual("0", headers["RateLimit-Remaining"])
+        self.assertEqual("10", headers["RateLimit-Reset"])
+        self.assertFalse("Retry-After" in headers)
+
+        state, keep, result = a.check(state, 0.5)
+        self.assertEqual("10", result.get_headers()["Retry-After"])
+
+
+class _StoreTestCase(TestCase):
+    def create_store(self, **kwargs):
+        self.skipTest("child classes create the store")
+
+    def test_update(self):
+        store = self.create_store()
+        self.assertEqual(1, store.update("foo", count))
+        self.assertEqual(2, store.update("foo", count))
+        self.assertEqual(1, store.update("bar", count))
+
+        store.delete("foo")
+        self.assertEqual(1, store.update("foo", count))
+
+        store.clear()
+        self.assertEqual(1, store.update("bar", count))
+
+    def test_expires(self):
+        store = self.create_store()
+        store.update("foo", count)
+
+        clock = store.clock
+        store.clock = lambda: clock() + 61
+        self.assertEqual(1, store.update("foo", count))
+
+    def test_remove(self):
+        store = self.create_store()
+        store.update("foo", count)
+        store.update("foo", lambda state, now: (None, 0, None))
+        self.assertEqual(1, store.update("foo", count))
+
+
+class MemoryStoreTest(_StoreTestCase):
+    def create_store(self, **kwargs):
+        return MemoryStore(**kwargs)
+
+    def test_expire(self):
+        store = self.create_store(shards=1)
+        now = store.clock()
+        store.clock = lambda: now
+
+        store.update("foo", count)
+        store.update("bar", lambda state, now: ((1, now, 0.0), 120, 1))
+        self.assertEqual(2, store.info()["keys"])
+
+        # the keys are dropped once their tick has passed
+        store.clock = lambda: now + 62
+        store.update("che", count)
+        info = store.info()
+        self.assertEqual(2, info["keys"])
+        self.assertEqual(1, info["expirations"])
+
+        # bar was updated so it is refiled instead of dropped
+        store.update("bar", count)
+        store.clock = lambda: now + 121
+        store.update("che", count)
+        self.assertEqual(1, store.info()["expirations"])
+        self.assertEqual(3, store.update("bar", count))
+
+    def test_evict(self):
+        store = self.create_store(maxbytes=MemoryStore.key_size * 2, shards=1)
+        store.update("foo", count)
+        store.update("bar", lambda state, now: ((1, now, 0.0), 120, 1))
+        store.update("che", count)
+
+        info = store.info()
+        self.assertEqual(2, info["keys"])
+        self.assertEqual(1, info["evictions"])
+
+        # foo expired first so it was evicted
+        self.assertEqual(2, store.update("bar", count))
+        self.assertEqual(2, store.update("che", count))
+
+
+class SharedMemoryStoreTest(_StoreTestCase):
+    def create_store(self, **kwargs):
+        path = os.path.join(testdata.create_dir(), "ratelimit")
+        return SharedMemoryStore(path, **kwargs)
+
+    def test_processes(self):
+        store = self.create_store()
+
+        ctx = multiprocessing.get_context("fork")
+        processes = [
+            ctx.Process(target=count_shared, args=(store.path, "foo", 50))
+            for _ in range(4)
+        ]
+        for p in processes:
+            p.start()
+
+        for p in processes:
+            p.join()
+
+        self.assertEqual(201, store.update("foo", count))
+
+    def test_full_group(self):
+        store = self.create_store(slots=4, probes=4)
+        for i in range(5):
+            store.update(f"foo{i}", count)
+
+        # the first key's state expired first so it was dropped
+        self.assertEqual(1, store.update("foo0", count))
+        self.assertEqual(2, store.update("foo4", count))
+
+    def test_existing(self):
+        store = self.create_store(slots=16)
+        store.update("foo", count)
+
+        store2 = SharedMemoryStore(store.path, slots=1024)
+        self.assertEqual(16, store2.slots)
+        self.assertEqual(2, store2.update("foo", count))
+
+
+class SQLiteStoreTest(_StoreTestCase):
+    def create_store(self, **kwargs):
+        path = os.path.join(testdata.create_dir(), "ratelimit.db")
+        return SQLiteStore(path, **kwargs)
+
+    def test_prune(self):
+        store = self.create_store(prune_interval=2)
+        store.update("foo", count)
+
+        clock = store.clock
+        store.clock = lambda: clock() + 61
+        store.update("bar", count)
+
+        connection = store.get_connection()
+        rows = connection.execute(f"SELECT key FROM {store.table}").fetchall()
+        self.assertEqual([("bar",)], rows)
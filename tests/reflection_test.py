@@ -343,6 +343,115 @@ class ReflectMethodTest(TestCase):
 
         self.assertEqual("", rm.get_url_name())
 
+    def test_get_argument_binder(self):
+        rm = self.create_reflect_methods("""
+            class Default(Controller):
+                def GET(
+                    self,
+                    foo: int,
+                    /,
+                    *args,
+                    bar: Annotated[list[int], dict(aliases=["bar[]"])],
+                    che: str = "che",
+                    **kwargs,
+                ):
+                    pass
+        """)[0]
+
+        binder = rm.get_argument_binder()
+        self.assertIs(binder, rm.get_argument_binder())
+
+        args, kwargs = binder.bind(["1", "2"], {"bar[]": "3,4", "baz": 5})
+        self.assertEqual([1, "2"], args)
+        self.assertEqual({"bar": [3, 4], "che": "che", "baz": 5}, kwargs)
+
+        # foo is passed as a keyword and a positional so the call will fail
+        args, kwargs = binder.bind(["1"], {"foo": "2"})
+        self.assertEqual(["1"], args)
+        self.assertEqual({"foo": "2"}, kwargs)
+
+        with self.assertRaises(ValueError):
+            binder.bind(["foo"], {})
+
+    def test_get_body_decoder(self):
+        rm = self.create_reflect_methods("""
+            import dataclasses
+
+            @dataclasses.dataclass
+            class Node(object):
+                name: str
+                children: list["Node"] = dataclasses.field(
+                    default_factory=list
+                )
+
+            class Info(TypedDict):
+                count: int
+                tags: set[str]
+
+            class Default(Controller):
+                def POST(
+                    self,
+                    node: Node,
+                    info: Info,
+                    pair: tuple[int, float],
+                    maybe: int|None = None,
+                    checked: Annotated[int, dict(choices=[1, 2])] = 1,
+                    **kwargs,
+                ):
+                    pass
+        """)[0]
+
+        decoder = rm.get_body_decoder()
+        self.assertEqual(
+            set(["node", "info", "pair", "maybe"]),
+            set(decoder.converters.keys()),
+        )
+
+        body = {
+            "node": {"name": "a", "children": [{"name": "b"}]},
+            "info": {"count": "2", "tags": ["x", "x"]},
+            "pair": [1, 2],
+            "maybe": None,
+            "checked": "2",
+        }
+        names = decoder.decode(body)
+        self.assertEqual(set(["node", "info", "pair", "maybe"]), names)
+        self.assertEqual("b", body["node"].children[0].name)
+        self.assertEqual({"count": 2, "tags": {"x"}}, body["info"])
+        self.assertEqual((1, 2.0), body["pair"])
+        self.assertIsNone(body["maybe"])
+        self.assertEqual("2", body["checked"])
+
+        # values that can't be decoded are left to be normalized
+        body = {"info": {"tags": []}, "pair": [1]}
+        self.assertEqual(set(), decoder.decode(body))
+        self.assertEqual([1], body["pair"])
+
+    def test_get_media_type_table(self):
+        rm = self.create_reflect_methods("""
+            class Default(Controller):
+                def GET(self) -> (
+                    Annotated[str, "text/yaml"]
+                    | Annotated[bytes, "image/jpeg"]
+                ): pass
+        """)[0]
+
+        table = rm.get_media_type_table()
+        self.assertIs(table, rm.get_media_type_table())
+
+        self.assertEqual(("text/yaml", "text/html"), table.get("foo"))
+        self.assertEqual(
+            ("image/jpeg", "application/octet-stream"),
+            table.get(b"foo"),
+        )
+        self.assertEqual(("application/json",), table.get({}))
+        self.assertEqual(1, len(table.get(ValueError())))
+
+        # the matches are remembered by type
+        self.assertEqual(4, len(table.media_types))
+        table.get("bar")
+        self.assertEqual(4, len(table.media_types))
+
 
 class ReflectParamTest(TestCase):
     """Test the ReflectParam class
@@ -1,13 +1,29 @@
 # -*- coding: utf-8 -*-
 import json
+import gzip
+import zlib
+import datetime
+import uuid
+import dataclasses
 
 from endpoints.compat import *
 from endpoints.utils import (
     MimeType,
+    WSGIHeaders,
+    ASGIHeaders,
     AcceptHeader,
     JSONEncoder,
+    JSONCodec,
     Url,
     Status,
+    LRUCache,
+    ResponseCache,
+    CachedResponse,
+    ObjectPool,
+    MultipartParser,
+    SpooledFile,
+    Compressor,
+    GzipCompressor,
 )
 
 from . import TestCase
@@ -33,6 +49,62 @@ class MimeTypeTest(TestCase):
         self.assertEqual(test_mt, mt)
 
 
+class HTTPHeadersViewTest(TestCase):
+    def test_wsgi(self):
+        h = WSGIHeaders({
+            "CONTENT_TYPE": "application/json",
+            "HTTP_X_FOO": "1",
+            "PATH_INFO": "/",
+        })
+
+        self.assertEqual("application/json", h.get("Content-Type"))
+        self.assertEqual("1", h["x-foo"])
+        self.assertEqual(["1"], h.get_all("X_FOO"))
+        self.assertTrue("X-Foo" in h)
+        self.assertFalse("Path-Info" in h)
+        self.assertIsNotNone(h.raw)
+
+        h["X-Bar"] = "2"
+        self.assertIsNone(h.raw)
+        self.assertEqual(["Content-Type", "X-Foo", "X-Bar"], h.keys())
+        self.assertEqual("1", h.get("X-Foo"))
+
+    def test_asgi(self):
+        h = ASGIHeaders([
+            (b"content-type", b"application/json"),
+            (b"cookie", b"foo=1"),
+            (b"cookie", b"bar=2"),
+        ])
+
+        self.assertTrue(h.is_json())
+        self.assertEqual("foo=1", h.get("Cookie"))
+        self.assertEqual(["foo=1", "bar=2"], h.get_all("COOKIE"))
+        self.assertIsNone(h.get("X-Foo"))
+        self.assertIsNotNone(h.raw)
+
+        self.assertEqual(3, len(h))
+        self.assertIsNone(h.raw)
+        self.assertEqual(["foo=1", "bar=2"], h.get_all("cookie"))
+
+    def test_asgi_encoded(self):
+        raw = [(b"x-foo", b"1"), (b"x-bar", b"2")]
+        h = ASGIHeaders(raw)
+        self.assertEqual(raw, list(h.asgi()))
+
+        h["X-Bar"] = "3"
+        h["Content-Type"] = "application/json"
+        headers = list(h.asgi())
+        self.assertIs(raw[0][1], headers[0][1])
+        self.assertEqual(
+            [
+                (b"x-foo", b"1"),
+                (b"x-bar", b"3"),
+                (b"content-type", b"application/json"),
+            ],
+            headers,
+        )
+
+
 class AcceptHeaderTest(TestCase):
     def test_init(self):
         ts = [
@@ -122,6 +194,50 @@ class AcceptHeaderTest(TestCase):
         ah = AcceptHeader(ct)
         self.assertEqual(s, ah.media_types[0][2]["boundary"])
 
+    def test_negotiate(self):
+        a = AcceptHeader("text/html;q=0.1, text/*, application/json;q=0.5")
+        self.assertEqual(0.1, a.get_quality("text/html"))
+        self.assertEqual(1.0, a.get_quality("text/plain"))
+        self.assertEqual(0.0, a.get_quality("image/png"))
+
+        self.assertEqual(
+            "text/plain",
+            a.negotiate(["application/json", "text/html", "text/plain"]),
+        )
+        self.assertEqual(
+            "application/json",
+            a.negotiate(["application/json", "text/html"]),
+        )
+        self.assertEqual("", a.negotiate(["image/png"]))
+
+        # ties go to the server's preference
+        a = AcceptHeader("*/*")
+        self.assertEqual(
+            "application/json",
+            a.negotiate(["application/json", "text/html"]),
+        )
+
+        # no Accept header means anything goes
+        a = AcceptHeader("")
+        self.assertEqual("text/html", a.negotiate(["text/html"]))
+
+    def test_get_instance(self):
+        header = "application/json;q=0.5, text/html"
+        a = AcceptHeader.get_instance(header)
+        self.assertIs(a, AcceptHeader.get_instance(header))
+        self.assertEqual("text/html", next(iter(a))[3])
+
+        with self.environ(ENDPOINTS_ACCEPT_HEADER_CACHE_SIZE="0"):
+            cache = AcceptHeader.cache
+            AcceptHeader.cache = None
+            try:
+                a2 = AcceptHeader.get_instance(header)
+                self.assertIsNot(a2, AcceptHeader.get_instance(header))
+                self.assertIsNone(AcceptHeader.cache)
+
+            finally:
+                AcceptHeader.cache = cache
+
 
 class JSONEncoderTest(TestCase):
     def test_string(self):
@@ -130,6 +246,63 @@ class JSONEncoderTest(TestCase):
         self.assertEqual(r1, r2)
 
 
+class JSONCodecTest(TestCase):
+    def test_dumps_loads(self):
+        @dataclasses.dataclass
+        class Foo(object):
+            bar: int
+
+        def create_body():
+            return {
+                "bytes": b"foo",
+                "datetime": datetime.datetime(2020, 1, 2, 3, 4, 5),
+                "uuid": uuid.UUID(int=1),
+                "generator": (i for i in range(2)),
+                "exception": ValueError("foo"),
+                "dataclass": Foo(1),
+            }
+
+        for name, codec_class in JSONCodec.codec_classes.items():
+            if not codec_class.is_available():
+                continue
+
+            with self.subTest(name):
+                codec = codec_class()
+                d = codec.loads(codec.dumps(create_body()))
+                self.assertEqual("2020-01-02T03:04:05", d["datetime"])
+                self.assertEqual(
+                    "00000000-0000-0000-0000-000000000001",
+                    d["uuid"],
+                )
+                self.assertEqual([0, 1], d["generator"])
+                self.assertEqual("foo", d["exception"])
+                self.assertEqual({"bar": 1}, d["dataclass"])
+
+    def test_register(self):
+        class Foo(object):
+            pass
+
+        class Bar(Foo):
+            pass
+
+        codec = JSONCodec.find_class("json")()
+        with self.assertRaises(TypeError):
+            codec.dumps(Bar())
+
+        codec.register(Foo, lambda o: "foo")
+        self.assertEqual(b'"foo"', codec.dumps(Bar()))
+
+        codec.register(Bar, lambda o: "bar")
+        self.assertEqual(b'"bar"', codec.dumps(Bar()))
+
+    def test_find_class(self):
+        codec_class = JSONCodec.find_class("nope, json")
+        self.assertEqual("json", codec_class.name)
+
+        with self.assertRaises(ValueError):
+            JSONCodec.find_class("nope")
+
+
 class UrlTest(TestCase):
     def test_module_and_controller(self):
         c = self.create_server({
@@ -195,3 +368,199 @@ class StatusTest(TestCase):
         s = Status(1001)
         self.assertEqual("Close Going Away", s)
 
+
+
+class MultipartParserTest(TestCase):
+    def test_feed_chunks(self):
+        body = b"\r\n".join([
+            b"--foobar",
+            b'Content-Disposition: form-data; name="foo"',
+            b"",
+            b"bar",
+            b"--foobar",
+            b'Content-Disposition: form-data; name="file"; filename="a.txt"',
+            b"Content-Type: text/plain",
+            b"",
+            b"line 1\r\nline 2 --foo",
+            b"--foobar--",
+            b"",
+        ])
+
+        for size in [1, 3, 11, len(body)]:
+            parser = MultipartParser("foobar", spool_size=4)
+            for i in range(0, len(body), size):
+                parser.feed(body[i:i + size])
+
+            parts = parser.close()
+            self.assertEqual(2, len(parts))
+
+            headers, value = parts[0]
+            self.assertEqual(
+                ("form-data", {"name": "foo"}),
+                headers.parse("Content-Disposition"),
+            )
+            self.assertEqual(b"bar", value)
+
+            headers, value = parts[1]
+            self.assertEqual("text/plain", headers.get_media_type())
+            self.assertTrue(isinstance(value, SpooledFile))
+            self.assertEqual(b"line 1\r\nline 2 --foo", value.read())
+
+    def test_lf_line_endings(self):
+        body = b"\n".join([
+            b"preamble",
+            b"--foobar",
+            b'Content-Disposition: form-data; name="foo"',
+            b"",
+            b"bar",
+            b"--foobar--",
+        ])
+
+        parser = MultipartParser("foobar")
+        parser.feed(body)
+        parts = parser.close()
+        self.assertEqual(b"bar", parts[0][1])
+
+    def test_truncated(self):
+        body = b"\r\n".join([
+            b"--foobar",
+            b'Content-Disposition: form-data; name="foo"',
+            b"",
+            b"bar",
+            b"--foobar",
+            b'Content-Disposition: form-data; name="file"; filename="a.txt"',
+            b"",
+            b"line 1",
+        ])
+
+        # truncated in the body, the headers, and after a delimiter
+        for size in [len(body), body.index(b"--foobar", 1) + 8, 20]:
+            parser = MultipartParser("foobar", spool_size=4)
+            parser.feed(body[:size])
+            with self.assertRaises(ValueError):
+                parser.close()
+
+
+class LRUCacheTest(TestCase):
+    def test_eviction(self):
+        c = LRUCache(2)
+        c.set("foo", 1)
+        c.set("bar", 2)
+        self.assertEqual(1, c.get("foo"))
+
+        c.set("che", 3)
+        self.assertFalse("bar" in c)
+        self.assertTrue("foo" in c)
+        self.assertEqual(2, len(c))
+
+        self.assertIsNone(c.get("bar"))
+        self.assertEqual(
+            {"hits": 1, "misses": 1, "size": 2, "maxsize": 2},
+            c.info(),
+        )
+
+
+class ResponseCacheTest(TestCase):
+    def create_response(self, body, ttl=60):
+        return CachedResponse(200, [], "text/plain", body, ttl=ttl)
+
+    def test_maxbytes(self):
+        c = ResponseCache(maxbytes=10)
+        c.set("foo", self.create_response(b"1234"))
+        c.set("bar", self.create_response(b"1234"))
+        self.assertIsNotNone(c.get("foo"))
+
+        c.set("che", self.create_response(b"1234"))
+        self.assertFalse("bar" in c)
+        self.assertEqual(8, c.info()["bytes"])
+
+        # too big to ever fit
+        c.set("foo", self.create_response(b"x" * 11))
+        self.assertFalse("foo" in c)
+        self.assertEqual(4, c.info()["bytes"])
+
+        c.pop("che")
+        self.assertEqual(0, c.info()["bytes"])
+
+    def test_fresh_stale(self):
+        r = CachedResponse(200, [], None, b"", ttl=10, stale=10)
+        now = r.created
+        self.assertTrue(r.is_fresh(now))
+        self.assertFalse(r.is_stale(now))
+
+        self.assertFalse(r.is_fresh(now + 15))
+        self.assertTrue(r.is_stale(now + 15))
+        self.assertEqual(15, r.get_age(now + 15))
+
+        self.assertFalse(r.is_stale(now + 25))
+
+
+class ObjectPoolTest(TestCase):
+    def test_acquire_release(self):
+        class Foo(object):
+            def __init__(self):
+                self.reset()
+
+            def reset(self):
+                self.bar = None
+
+        pool = ObjectPool(Foo, 1)
+        f1 = pool.acquire()
+        f1.bar = 1
+        f2 = pool.acquire()
+
+        pool.release(f1)
+        pool.release(f2)
+        self.assertEqual(1, len(pool))
+
+        f3 = pool.acquire()
+        self.assertIs(f1, f3)
+        self.assertIsNone(f3.bar)
+        self.assertEqual(
+            {"created": 2, "reused": 1, "size": 0, "maxsize": 1},
+            pool.info(),
+        )
+
+class CompressorTest(TestCase):
+    def test_find_class(self):
+        c = Compressor.find_class("gzip, deflate", ["br", "gzip"])
+        self.assertEqual(GzipCompressor, c)
+
+        c = Compressor.find_class("gzip;q=0, deflate", ["gzip"])
+        self.assertIsNone(c)
+
+        c = Compressor.find_class("*", ["gzip"])
+        self.assertEqual(GzipCompressor, c)
+
+        c = Compressor.find_class("", ["gzip"])
+        self.assertIsNone(c)
+
+        c = Compressor.find_class("gzip", ["foo"])
+        self.assertIsNone(c)
+
+    def test_is_compressible(self):
+        media_types = ["text/*", "application/json", "application/*+json"]
+        self.assertTrue(Compressor.is_compressible("text/html", media_types))
+        self.assertTrue(
+            Compressor.is_compressible("application/ld+json", media_types)
+        )
+        self.assertTrue(
+            Compressor.is_compressible(
+                "application/json;charset=UTF-8",
+                media_types,
+            )
+        )
+        self.assertFalse(Compressor.is_compressible("image/png", media_types))
+        self.assertFalse(Compressor.is_compressible(None, media_types))
+
+    def test_gzip(self):
+        c = GzipCompressor()
+        body = c.compress(b"foo", flush=True)
+        # flushing makes everything so far decompressable
+        self.assertEqual(
+            b"foo",
+            zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(body),
+        )
+
+        body += c.compress(b"bar") + c.flush()
+        self.assertEqual(b"foobar", gzip.decompress(body))